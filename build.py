@@ -14,6 +14,8 @@ def _run(cmd: str) -> None:
 
 
 _run("uv sync")
+# 预解码模板包随 resources 一起发布，首次启动免逐张解码
+_run("uv run python -m jczx.templatePack 2")
 
 version = VERSION if VERSION[-1].isdigit() else VERSION[:-1]
 (_, index), startTime = pick(
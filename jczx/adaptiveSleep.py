@@ -0,0 +1,126 @@
+"""自适应等待：按设备记录每个实体 sleep 字段期间画面实际稳定所需的时间，之后按分位数缩短等待。
+
+- 配置值始终是上限：学习到的值只会让等待变短，不会更长
+- 样本不足 min_samples 时照旧等待配置值（同时采样学习）
+- 画面是否稳定：相邻两次采样的缩小灰度图平均像素差低于阈值
+"""
+import threading
+from logging import Logger
+
+import cv2
+import numpy as np
+
+from .jsonStore import merge_save, read_json
+
+# 相邻帧（1/4 缩小灰度图）平均绝对像素差超过该值视为画面仍在变化
+SETTLE_THRESHOLD = 2.0
+
+
+def frame_delta(a: np.ndarray, b: np.ndarray) -> float:
+    """两帧平均绝对像素差；尺寸不同（分辨率变化）视为完全不同。"""
+    if a is None or b is None or a.shape != b.shape:
+        return float("inf")
+    return float(cv2.absdiff(a, b).mean())
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """最近秩法分位数（样本量小时比插值更保守）。"""
+    ordered = sorted(samples)
+    rank = max(1, int(np.ceil(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class SleepStats:
+    """按 设备 → "实体 key:字段" 记录画面稳定耗时样本（JSON 持久化）。
+
+    - suggest 返回本次应等待的秒数：样本足够时为 min(配置值, 分位数 + margin)，否则为配置值
+    - 每个 key 只保留最近 max_samples 个样本，游戏更新导致变慢时能重新适应
+    - save 只在有新样本时落盘，且只合并本进程改动过的设备（多进程模式下各工作进程共用同一文件）
+    """
+
+    def __init__(self, path: str, percentile: float = 90, min_samples: int = 5, margin: float = 0.2,
+                 max_samples: int = 50, enabled: bool = True, log: Logger = None):
+        self.path = path
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.margin = margin
+        self.max_samples = max_samples
+        self.enabled = enabled
+        self.log = log if log else Logger("SleepStats")
+        self._samples: dict[str, dict[str, list[float]]] = {}
+        # 上次保存后改动过的设备；_cleared 为清除过全部设备
+        self._touched: set[str] = set()
+        self._cleared = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        with self._lock:
+            self._samples = {}
+            self._touched.clear()
+            self._cleared = False
+            try:
+                self._samples = read_json(self.path)
+            except (OSError, ValueError) as e:
+                self.log.warning(f"等待时间统计读取失败，重新学习: {e}")
+                return
+        self.log.debug(f"等待时间统计已加载 {sum(len(v) for v in self._samples.values())} 条: {self.path}")
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._touched and not self._cleared:
+                return
+            changed = {device: dict(self._samples[device]) if device in self._samples else None
+                       for device in self._touched}
+            cleared, self._cleared = self._cleared, False
+            self._touched.clear()
+
+        def merge(current: dict) -> dict:
+            data = {} if cleared else current
+            for device, samples in changed.items():
+                if samples is None:
+                    data.pop(device, None)
+                else:
+                    data[device] = samples
+            return data
+
+        try:
+            merge_save(self.path, merge)
+        except OSError as e:
+            self.log.warning(f"等待时间统计保存失败: {e}")
+            return
+        self.log.debug(f"等待时间统计已保存: {self.path}")
+
+    def clear(self, device: str = None) -> None:
+        """清除某台设备（或全部）的样本。"""
+        with self._lock:
+            if device is None:
+                self._samples.clear()
+                self._touched.clear()
+                self._cleared = True
+            else:
+                self._samples.pop(device, None)
+                self._touched.add(device)
+
+    def samples(self, device: str, key: str) -> list[float]:
+        return list(self._samples.get(device, {}).get(key, ()))
+
+    def suggest(self, device: str, key: str, configured: float) -> float:
+        if not self.enabled or configured <= 0:
+            return configured
+        samples = self._samples.get(device, {}).get(key)
+        if not samples or len(samples) < self.min_samples:
+            return configured
+        return min(configured, round(percentile(samples, self.percentile) + self.margin, 2))
+
+    def learned(self, device: str, key: str) -> bool:
+        return len(self._samples.get(device, {}).get(key, ())) >= self.min_samples
+
+    def record(self, device: str, key: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.setdefault(device, {}).setdefault(key, [])
+            samples.append(round(max(0.0, seconds), 2))
+            del samples[:-self.max_samples]
+            self._touched.add(device)
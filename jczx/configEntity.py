@@ -17,6 +17,7 @@ class SectionType(Enum):
     CONDITION = "condition"
     METHOD = "method"
     CALL = "call"
+    WAIT_ANY = "wait_any"
 
     @classmethod
     def __contains__(cls, value):
@@ -103,6 +104,22 @@ class JczxSectionEntity(BaseEntity):
     log: str = None
     log_level: str = "info"
     screen_cache_ttl: float = -1
+    match_mode: str = None
+    # ocr：full = 检测 + 识别，rec = 单行裁剪图跳过检测直接识别，None = 按裁剪图尺寸自动选择
+    ocr_mode: str = None
+    # 搜索区域（屏幕比例 x0,y0,x1,y1 或网格 cutNxM|x,y），None = 全屏
+    region: str = None
+    testFor_region: str = None
+    wait_target_region: str = None
+    # wait_any：候选图片路径或 match 实体 key
+    targets: list[str] = field(default_factory=list)
+    # 场景导航图的边：从 scene_from（空 = 任意场景）执行本实体到达 scene_to，scene_marker 为到达后的标志图
+    scene_from: list[str] = field(default_factory=list)
+    scene_to: str = None
+    scene_marker: str = None
+    # 画面稳定等待：动作后等到连续两次采样不再变化（最长 settle_timeout 秒，0 = 关闭），可限定采样区域
+    settle_timeout: float = 0
+    settle_region: str = None
     queueable: str = "on"
     # method / call
     fn: str = None
@@ -0,0 +1,76 @@
+"""CPU 预算：限制 OpenCV / OCR 的线程数，多进程模式下把每个设备工作进程绑定到各自的 CPU 核。
+
+多台设备同时运行时，每个进程的 cv2.matchTemplate 与 OCR 推理默认都会占满全部核心，互相抢占导致延迟抖动；
+限制线程数并按设备划分核心后，单台设备的耗时更稳定，一台机器可以多开更多模拟器。
+"""
+import os
+import sys
+import time
+from typing import Optional
+
+import cv2
+
+AFFINITY_OFF = "off"
+AFFINITY_AUTO = "auto"
+
+
+def parse_cpus(text: str) -> list[int]:
+    """核列表文本 → 核编号，如 ``0-3,6`` → [0, 1, 2, 3, 6]；格式错误抛 ValueError。"""
+    cpus: list[int] = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = (int(v) for v in part.split("-", 1))
+            if hi < lo:
+                raise ValueError(f"核范围无效: {part}")
+            cpus.extend(range(lo, hi + 1))
+        else:
+            cpus.append(int(part))
+    if not cpus or min(cpus) < 0:
+        raise ValueError(f"核列表无效: {text}")
+    return sorted(set(cpus))
+
+
+def plan_affinity(spec: str, slot: int, cores: int, cpu_count: int) -> Optional[list[int]]:
+    """第 slot 台设备（从 0 起）应绑定的核，None = 不限制。
+
+    - ``off`` / 空：不限制
+    - ``auto``：按设备顺序每台分配连续 cores 个核，设备多于核组时循环复用
+    - ``0-3;4-7``：按设备顺序取分号分隔的核组，设备多于核组时循环复用
+    """
+    spec = (spec or AFFINITY_OFF).strip()
+    if spec == AFFINITY_OFF or cpu_count <= 0:
+        return None
+    if spec == AFFINITY_AUTO:
+        cores = max(1, min(cores, cpu_count))
+        start = slot * cores % cpu_count
+        return sorted((start + i) % cpu_count for i in range(cores))
+    groups = [g for g in spec.split(";") if g.strip()]
+    return [c for c in parse_cpus(groups[slot % len(groups)]) if c < cpu_count] or None
+
+
+def set_affinity(cpus: list[int]) -> bool:
+    """把当前进程绑定到给定核；平台不支持时返回 False。"""
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+        mask = sum(1 << c for c in cpus)
+        return bool(kernel32.SetProcessAffinityMask(ctypes.c_void_p(kernel32.GetCurrentProcess()), ctypes.c_size_t(mask)))
+    return False
+
+
+def apply_cv_threads(threads: int) -> None:
+    """OpenCV 线程数：负数保持默认（全部核心），0 / 1 为单线程。"""
+    if threads >= 0:
+        cv2.setNumThreads(threads)
+
+
+def cpu_seconds() -> float:
+    """当前进程（全部线程）累计 CPU 时间（秒）。"""
+    return time.process_time()
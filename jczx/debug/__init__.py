@@ -1,2 +1,4 @@
 from .recorder import DebugRecorder
 from .annotator import ScreenAnnotator
+from .tracer import ExecTracer
+from .corpus import OcrCorpus
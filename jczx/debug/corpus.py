@@ -0,0 +1,64 @@
+"""OCR 裁剪图语料：运行时记录 ocr 实体的裁剪图与识别结果，供 OCR 基准对比不同识别方式的耗时与准确率。
+
+目录结构：``<n>.png`` 为裁剪图，``labels.tsv`` 每行 ``文件名<TAB>文本<TAB>识别方式``（rec / full）。
+识别失败（结果为空）的裁剪图同样记录，它们最能体现两种识别方式的准确率差异。
+记录的文本是当时所用识别方式的结果，用作基准前应人工核对（识别错或为空的改成正确文本，无法辨认的整行删除）；
+文本仍为空的行视为未核对，读取时跳过。
+"""
+import os
+import re
+import threading
+from logging import Logger
+
+import cv2
+from cv2.typing import MatLike
+
+LABELS_FILE = "labels.tsv"
+
+
+class OcrCorpus:
+    """多台设备共用一个实例（写入加锁），编号接着目录中已有的文件继续。"""
+
+    _NUMERIC_PNG = re.compile(r"^(\d+)\.png$")
+
+    def __init__(self, output_dir: str, log: Logger):
+        self._output_dir = output_dir
+        self._log = log
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+        numbers = [int(m.group(1)) for f in os.listdir(output_dir) if (m := self._NUMERIC_PNG.match(f))]
+        self._index = max(numbers, default=0) + 1
+
+    def add(self, crop: MatLike, text: str, mode: str = "") -> None:
+        """记录一张裁剪图；text 为空（识别失败）也记录，mode 为本次所用的识别方式。"""
+        # 制表符 / 换行会破坏 labels.tsv 的行格式
+        text = text.replace("\t", " ").replace("\n", " ")
+        with self._lock:
+            name = f"{self._index}.png"
+            self._index += 1
+            cv2.imwrite(os.path.join(self._output_dir, name), crop)
+            with open(os.path.join(self._output_dir, LABELS_FILE), "a", encoding="utf-8") as f:
+                f.write(f"{name}\t{text}\t{mode}\n")
+        self._log.debug(f"OCR 语料 {name} 已记录（{mode or '未知方式'}）: {text}")
+
+
+def load_corpus(corpus_dir: str) -> list[tuple[str, MatLike, str]]:
+    """读取语料，返回 (文件名, 裁剪图, 文本)；labels.tsv 中文本为空（未核对）、缺图或读不出的行跳过。
+
+    识别方式列只供人工核对时参考；只有两列的旧格式同样可读。
+    """
+    path = os.path.join(corpus_dir, LABELS_FILE)
+    if not os.path.isfile(path):
+        return []
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 2 or not fields[1]:
+                continue
+            name, text = fields[0], fields[1]
+            img_path = os.path.join(corpus_dir, name)
+            img = cv2.imread(img_path) if os.path.isfile(img_path) else None
+            if img is not None:
+                samples.append((name, img, text))
+    return samples
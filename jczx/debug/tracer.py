@@ -0,0 +1,114 @@
+"""实体执行追踪：记录嵌套耗时区间，导出 Chrome trace（chrome://tracing / Perfetto）或 speedscope 火焰图。
+
+引擎在未启用追踪时拿到的是共享的空上下文（NO_SPAN），不分配对象、不取时间。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from logging import Logger
+
+FORMAT_CHROME = "chrome"
+FORMAT_SPEEDSCOPE = "speedscope"
+
+NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_cat", "_args", "_start")
+
+    def __init__(self, tracer: "ExecTracer", name: str, cat: str, args: dict):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer._events.append((self._name, self._cat, self._start, end, threading.get_ident(), self._args))
+        return False
+
+
+class ExecTracer:
+    """一次任务 / 队列执行的追踪记录。
+
+    - span(name, cat, **args) 作为 with 上下文记录一个区间，嵌套关系由时间包含关系表达
+    - cat：entity（实体）、stage（实体内阶段）、device（截图 / 匹配 / OCR / 输入）
+    """
+
+    def __init__(self, name: str = "jczx", log: Logger = None):
+        self.name = name
+        self.log = log if log else Logger("ExecTracer")
+        self._events: list[tuple] = []
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, cat: str = "stage", **args) -> _Span:
+        return _Span(self, name, cat, args)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def chrome_trace(self) -> dict:
+        """Trace Event Format：每个区间一个 ph=X 完整事件，时间单位微秒。"""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        for name, cat, start, end, tid, args in self._events:
+            events.append({
+                "name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (start - self._origin) / 1000, "dur": (end - start) / 1000, "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def speedscope(self) -> dict:
+        """speedscope evented 格式：每个线程一个 profile，区间按 开始升序 / 结束降序 展开为 O/C 事件。"""
+        frames: list[dict] = []
+        frame_index: dict[str, int] = {}
+        by_thread: dict[int, list[tuple]] = {}
+        for event in self._events:
+            by_thread.setdefault(event[4], []).append(event)
+        profiles = []
+        for tid, events in by_thread.items():
+            events.sort(key=lambda e: (e[2], -e[3]))
+            opened: list[tuple[int, int]] = []  # (结束时间, frame)
+            items = []
+            for name, cat, start, end, _, args in events:
+                # 实体区间本身以 key 命名，阶段 / 设备区间附上所属实体
+                label = f"{name} [{args['key']}]" if cat != "entity" and args.get("key") else name
+                frame = frame_index.setdefault(label, len(frames))
+                if frame == len(frames):
+                    frames.append({"name": label})
+                while opened and opened[-1][0] <= start:
+                    closed_end, closed = opened.pop()
+                    items.append({"type": "C", "frame": closed, "at": closed_end - self._origin})
+                # 子区间不得超出父区间（同一线程上顺序执行，正常不会发生）
+                end = min(end, opened[-1][0]) if opened else end
+                items.append({"type": "O", "frame": frame, "at": start - self._origin})
+                opened.append((end, frame))
+            while opened:
+                closed_end, closed = opened.pop()
+                items.append({"type": "C", "frame": closed, "at": closed_end - self._origin})
+            profiles.append({
+                "type": "evented", "name": f"{self.name} (thread {tid})", "unit": "nanoseconds",
+                "startValue": items[0]["at"], "endValue": items[-1]["at"], "events": items,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def save(self, path: str, fmt: str = FORMAT_CHROME) -> str:
+        data = self.speedscope() if fmt == FORMAT_SPEEDSCOPE else self.chrome_trace()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        self.log.info(f"执行追踪已保存（{len(self._events)} 个区间）: {path}")
+        return path
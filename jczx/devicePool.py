@@ -0,0 +1,170 @@
+"""多设备池：每个 ADB serial 一个引擎实例，各自独立执行任务 / 队列。
+
+- 每台设备有自己的 JCZXGaming（取消令牌、上下文、截图缓存、调试记录器互不影响）
+- 配置、实体池、模板池（TaskManage）与 OCR 由创建引擎的工厂注入，所有设备共享一份
+- 同一设备同一时间只执行一个任务 / 队列，不同设备可并行
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import Logger, LoggerAdapter
+from typing import Any, Callable, Optional
+
+
+class DeviceLog(LoggerAdapter):
+    """设备日志：消息前加 [serial]，多台设备同时运行时可区分来源。"""
+
+    def __init__(self, logger: Logger, serial: str):
+        super().__init__(logger, {"serial": serial})
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['serial']}] {msg}", kwargs
+
+
+@dataclass
+class DeviceRun:
+    serial: str
+    # 任务 / 队列 id
+    job_id: str
+    started: float
+    # 进度文本（队列为 "队列名 i/n 任务名"）
+    progress: str = ""
+    future: Optional[Future] = None
+    # 执行线程的 ident 与开始时的线程 CPU 时间；cpu 为本次已用 CPU 秒数（进度更新与结束时刷新）
+    thread_id: int = 0
+    cpu_start: float = 0.0
+    cpu: float = 0.0
+
+
+class DevicePool:
+    """
+    Args:
+        factory: serial → 引擎实例（需有 _exec_mgr），首次用到该设备时调用
+        max_devices: 同时执行的设备数上限（执行线程数）
+    """
+
+    def __init__(self, factory: Callable[[str], Any], max_devices: int = 4, log: Logger = None):
+        self._factory = factory
+        self.log = log if log else Logger("DevicePool")
+        self._devices: dict[str, Any] = {}
+        self._runs: dict[str, DeviceRun] = {}
+        # 各设备已结束任务累计的 CPU 秒数
+        self._cpu: dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_devices), thread_name_prefix="jczx-device")
+
+    @property
+    def serials(self) -> list[str]:
+        with self._lock:
+            return list(self._devices)
+
+    def get(self, serial: str):
+        with self._lock:
+            return self._devices.get(serial)
+
+    def add(self, serial: str, device) -> None:
+        """登记已创建的引擎（如启动时连接的默认设备）；引擎换绑 serial 后重新登记会去掉旧 serial。"""
+        with self._lock:
+            for old in [s for s, d in self._devices.items() if d is device and s != serial]:
+                del self._devices[old]
+            self._devices[serial] = device
+
+    def acquire(self, serial: str):
+        """取设备的引擎，不存在时用工厂创建（创建失败抛出工厂的异常）。"""
+        with self._lock:
+            device = self._devices.get(serial)
+            if device is None:
+                device = self._devices[serial] = self._factory(serial)
+                self.log.info(f"设备已加入设备池: {serial}")
+            return device
+
+    def sync(self, connected: list[str]) -> list[str]:
+        """按当前连接的设备列表移除已断开且空闲的引擎，返回被移除的 serial。"""
+        with self._lock:
+            removed = [s for s in self._devices if s not in connected and s not in self._runs]
+            for serial in removed:
+                del self._devices[serial]
+        for serial in removed:
+            self.log.info(f"设备已断开，移出设备池: {serial}")
+        return removed
+
+    def is_running(self, serial: str) -> bool:
+        with self._lock:
+            return serial in self._runs
+
+    def start(self, serial: str, job_id: str, fn: Callable[[Any], None],
+              on_done: Callable[[str, str], None] = None) -> bool:
+        """在设备池线程上执行 fn(引擎)；该设备已有任务在执行时返回 False。
+
+        结束（含取消与异常）后复位设备的执行管理器，再回调 on_done(serial, job_id)。
+        """
+        with self._lock:
+            device = self.acquire(serial)
+            if serial in self._runs or device._exec_mgr.is_running():
+                return False
+            device._exec_mgr.start(job_id)
+            run = self._runs[serial] = DeviceRun(serial, job_id, time.monotonic())
+            run.future = self._executor.submit(self._run, run, device, fn, on_done)
+        return True
+
+    def _run(self, run: DeviceRun, device, fn: Callable[[Any], None], on_done: Callable[[str, str], None]) -> None:
+        run.thread_id, run.cpu_start = threading.get_ident(), time.thread_time()
+        try:
+            fn(device)
+        finally:
+            with self._lock:
+                self._update_cpu(run)
+                self._cpu[run.serial] = self._cpu.get(run.serial, 0.0) + run.cpu
+                if self._runs.get(run.serial) is run:
+                    del self._runs[run.serial]
+                if device._exec_mgr.task_id == run.job_id:
+                    device._exec_mgr.reset()
+            if on_done:
+                on_done(run.serial, run.job_id)
+
+    def stop(self, serial: str = None) -> None:
+        """停止某台设备（或全部设备）当前的任务。"""
+        with self._lock:
+            if serial is None:
+                devices = list(self._devices.values())
+            else:
+                devices = [self._devices[serial]] if serial in self._devices else []
+        for device in devices:
+            device._exec_mgr.stop()
+
+    def set_progress(self, serial: str, text: str) -> None:
+        with self._lock:
+            if run := self._runs.get(serial):
+                run.progress = text
+                self._update_cpu(run)
+
+    @staticmethod
+    def _update_cpu(run: DeviceRun) -> None:
+        """线程 CPU 时间只能在执行线程上读取：由执行线程调用时刷新。"""
+        if threading.get_ident() == run.thread_id:
+            run.cpu = time.thread_time() - run.cpu_start
+
+    def status(self) -> list[dict]:
+        """各设备状态：serial、是否执行中、任务 id、进度、已运行秒数、累计 CPU 秒数。
+
+        同进程多线程时 CPU 只统计执行线程本身（共享的模板匹配线程池不计入），多进程模式见 WorkerSupervisor。
+        """
+        now = time.monotonic()
+        result = []
+        with self._lock:
+            for serial in self._devices:
+                run = self._runs.get(serial)
+                result.append({
+                    "serial": serial,
+                    "running": run is not None,
+                    "job": run.job_id if run else "",
+                    "progress": run.progress if run else "",
+                    "elapsed": round(now - run.started, 1) if run else 0,
+                    "cpu": round(self._cpu.get(serial, 0.0) + (run.cpu if run else 0.0), 2),
+                })
+        return result
+
+    def shutdown(self) -> None:
+        self.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,401 @@
+"""多进程执行模式：每台设备一个工作进程，TUI 进程作为监督者。
+
+- 工作进程独立加载配置与模板（模板包内存映射，只读页由操作系统在进程间共享）与 OCR，只负责一台设备；
+  每次执行任务/队列前重载此后被修改的配置与模板文件（TUI 保存的任务设置、队列编辑等）
+- 监督者经管道下发 启动队列 / 启动任务 / 停止 / 退出 命令，接收日志、进度与结束事件
+- 工作进程异常退出（非监督者要求）时自动重启，连续重启次数有上限；崩溃时执行中的任务/队列视为结束，不自动续跑
+
+管道消息均为元组，首元素为类型：
+    监督者 → 工作进程：("queue", id) / ("task", id) / ("stop",) / ("exit",)
+    工作进程 → 监督者：("ready",) / ("log", 等级, 文本) / ("started", id) / ("progress", 文本)
+                       / ("done", id, 状态) / ("rejected", id, 原因) / ("error", 文本) / ("cpu", 累计 CPU 秒数)
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from logging import Handler, Logger
+from multiprocessing.connection import Connection
+from typing import Callable, Optional
+
+from .cpuBudget import apply_cv_threads, cpu_seconds, plan_affinity, set_affinity
+
+JOB_QUEUE = "queue"
+JOB_TASK = "task"
+
+DONE_OK = "ok"
+DONE_CANCELLED = "cancelled"
+DONE_ERROR = "error"
+DONE_CRASHED = "crashed"
+
+# 工作进程上报 CPU 时间的间隔（秒）
+CPU_REPORT_INTERVAL = 2.0
+
+
+class PipeLogHandler(Handler):
+    """工作进程日志经管道转发给监督者（格式化在监督者侧完成）。"""
+
+    def __init__(self, send: Callable[[tuple], None]):
+        super().__init__()
+        self._send = send
+
+    def emit(self, record):
+        try:
+            self._send(("log", record.levelno, record.getMessage()))
+        except (OSError, ValueError):
+            pass
+
+
+def _create_engine(serial: str, options: dict, log: Logger):
+    """工作进程内创建引擎与 OCR（延迟导入，监督者进程不加载这些依赖）。"""
+    from .jczxCli import JCZXGaming, create_ocr
+    from .ocrService import OcrService
+    from .taskManage import TaskManage
+    task_manage = TaskManage(options.get("config_dir", ""), log)
+    # 工作进程不开监视线程：记下文件快照，每次作业前重载 TUI 保存的设置 / 队列与外部编辑
+    task_manage.track_files()
+    device = JCZXGaming(options.get("adb_path"), device_id=serial, log=log, task_manage=task_manage)
+    device.device_id = serial
+    device.size = device.getScreenSize()
+    try:
+        device._init_u2_device()
+    except Exception as e:
+        log.warning(f"uiautomator2 初始化失败，使用 ADB 截图与点击: {e}")
+    device._init_emu_strategy()
+    threads = options.get("ocr_threads", 0)
+    device.set_ocr(OcrService(lambda: create_ocr(threads), log=log, **options.get("ocr_service", {})))
+    return device
+
+
+def _run_job(device, kind: str, job_id: str, send: Callable[[tuple], None]) -> None:
+    from .jczxCli import TaskCancelledError
+    status = DONE_OK
+    try:
+        try:
+            device.task_manage.reload_changed_files()
+        except Exception as e:
+            device.log.warning(f"重载配置失败，沿用已加载的配置: {e}")
+        if kind == JOB_QUEUE:
+            queue = device.task_manage.get_queue(job_id)
+            with device.task_manage.job_scope(f"job:{job_id}", queue.tasks if queue else []):
+                device.exec_queue(job_id, on_progress=lambda name, i, n, tn: send(("progress", f"{name} {i + 1}/{n} {tn}")))
+        else:
+            with device.task_manage.job_scope(f"job:{job_id}", [job_id]):
+                device.exec_task_raw(job_id)
+    except TaskCancelledError:
+        status = DONE_CANCELLED
+        device.log.info(f"已取消: {job_id}")
+    except Exception as e:
+        status = DONE_ERROR
+        device.log.error(f"执行异常 {job_id}: {e}")
+    finally:
+        device._exec_mgr.reset()
+        send(("done", job_id, status))
+
+
+def _apply_cpu_budget(options: dict, log: Logger) -> None:
+    apply_cv_threads(options.get("cv_threads", -1))
+    if cpus := options.get("cpus"):
+        try:
+            applied = set_affinity(cpus)
+        except OSError as e:
+            log.warning(f"CPU 亲和性设置失败 {cpus}: {e}")
+            return
+        log.info(f"CPU 亲和性: {cpus}" if applied else "当前平台不支持设置 CPU 亲和性")
+
+
+def _report_cpu(send: Callable[[tuple], None]) -> None:
+    while True:
+        time.sleep(CPU_REPORT_INTERVAL)
+        try:
+            send(("cpu", cpu_seconds()))
+        except (OSError, ValueError):
+            return
+
+
+def worker_main(serial: str, options: dict, conn: Connection) -> None:
+    """工作进程入口（spawn 启动，需为模块级函数）。监督者关闭管道时停止当前任务并退出。"""
+    lock = threading.Lock()
+
+    def send(msg: tuple) -> None:
+        with lock:
+            conn.send(msg)
+
+    log = logging.getLogger(f"jczx-worker-{serial}")
+    log.setLevel(options.get("log_level", logging.INFO))
+    log.addHandler(PipeLogHandler(send))
+    log.propagate = False
+    _apply_cpu_budget(options, log)
+    try:
+        device = _create_engine(serial, options, log)
+    except Exception as e:
+        send(("error", f"引擎初始化失败: {e}"))
+        raise SystemExit(2)
+    send(("ready",))
+    threading.Thread(target=_report_cpu, args=(send,), daemon=True).start()
+    job: Optional[threading.Thread] = None
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            msg = ("exit",)
+        match msg[0]:
+            case "queue" | "task":
+                if job is not None and job.is_alive():
+                    send(("rejected", msg[1], "已有任务/队列正在执行"))
+                    continue
+                device._exec_mgr.start(msg[1])
+                send(("started", msg[1]))
+                job = threading.Thread(target=_run_job, args=(device, msg[0], msg[1], send), daemon=True)
+                job.start()
+            case "stop":
+                device._exec_mgr.stop()
+            case "exit":
+                device._exec_mgr.stop()
+                if job is not None:
+                    job.join(timeout=10)
+                if device.task_manage.hot_regions:
+                    device.task_manage.hot_regions.save()
+                if device.task_manage.sleep_stats:
+                    device.task_manage.sleep_stats.save()
+                return
+
+
+@dataclass
+class _Worker:
+    serial: str
+    process: multiprocessing.Process
+    conn: Connection
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+    ready: bool = False
+    job_id: str = ""
+    job_kind: str = ""
+    progress: str = ""
+    started: float = 0.0
+    restarts: int = 0
+    # 监督者主动停止（不重启）
+    closing: bool = False
+    # 工作进程累计 CPU 秒数（定期上报）
+    cpu: float = 0.0
+
+
+class WorkerSupervisor:
+    """
+    Args:
+        options: 传给工作进程的参数（adb_path、config_dir、log_level、cv_threads、ocr_threads、ocr_service 等，需可 pickle）；
+            affinity / affinity_cores 为 CPU 亲和性方案（见 cpuBudget.plan_affinity），按设备槽位换算为每个进程的 cpus
+        on_change: 设备状态 / 进度变化回调 ()（在读取线程上调用）
+        on_done: 任务/队列结束回调 (serial, job_id, kind, status)（在读取线程上调用）
+        max_restarts: 异常退出后的连续重启上限；工作进程正常完成一次任务后计数清零
+        target: 工作进程入口，测试时可替换
+    """
+
+    def __init__(self, options: dict, log: Logger = None, on_change: Callable[[], None] = None,
+                 on_done: Callable[[str, str, str, str], None] = None, max_restarts: int = 3,
+                 restart_delay: float = 2.0, target: Callable = worker_main):
+        self.options = options
+        self.log = log if log else Logger("WorkerSupervisor")
+        self.on_change = on_change
+        self.on_done = on_done
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        self._target = target
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: dict[str, _Worker] = {}
+        # 设备 → 槽位（CPU 亲和性分组序号），重启沿用原槽位
+        self._slots: dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def serials(self) -> list[str]:
+        with self._lock:
+            return list(self._workers)
+
+    def ensure(self, serial: str) -> None:
+        """设备没有工作进程时启动一个。"""
+        with self._lock:
+            if serial not in self._workers:
+                self._spawn(serial, 0)
+
+    def sync(self, connected: list[str]) -> None:
+        """为新连接的设备启动工作进程，关闭已断开设备的空闲工作进程。"""
+        for serial in connected:
+            self.ensure(serial)
+        with self._lock:
+            gone = [w for s, w in self._workers.items() if s not in connected and not w.job_id]
+        for worker in gone:
+            self._close(worker)
+
+    def _worker_options(self, serial: str) -> dict:
+        if serial not in self._slots:
+            used = {self._slots[s] for s in self._workers if s in self._slots}
+            self._slots[serial] = next(i for i in range(len(used) + 1) if i not in used)
+        cpus = plan_affinity(self.options.get("affinity", ""), self._slots[serial],
+                             self.options.get("affinity_cores", 1), os.cpu_count() or 1)
+        return dict(self.options, cpus=cpus)
+
+    def _spawn(self, serial: str, restarts: int) -> None:
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(target=self._target, args=(serial, self._worker_options(serial), child),
+                                    name=f"jczx-worker-{serial}", daemon=True)
+        process.start()
+        child.close()
+        worker = self._workers[serial] = _Worker(serial, process, parent, restarts=restarts)
+        threading.Thread(target=self._read, args=(worker,), daemon=True, name=f"jczx-supervise-{serial}").start()
+        self.log.info(f"[{serial}] 工作进程已启动 pid={process.pid}")
+
+    def _send(self, worker: _Worker, msg: tuple) -> bool:
+        try:
+            with worker.send_lock:
+                worker.conn.send(msg)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def _read(self, worker: _Worker) -> None:
+        while True:
+            try:
+                msg = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            self._handle(worker, msg)
+        worker.process.join(timeout=5)
+        self._on_exit(worker)
+
+    def _handle(self, worker: _Worker, msg: tuple) -> None:
+        serial = worker.serial
+        match msg[0]:
+            case "log":
+                self.log.log(msg[1], f"[{serial}] {msg[2]}")
+                return
+            case "cpu":
+                worker.cpu = msg[1]
+                if not worker.job_id:
+                    return
+            case "ready":
+                worker.ready = True
+                self.log.info(f"[{serial}] 工作进程就绪")
+            case "started":
+                worker.job_id, worker.started = msg[1], time.monotonic()
+            case "progress":
+                worker.progress = msg[1]
+            case "rejected":
+                self.log.warning(f"[{serial}] 拒绝执行 {msg[1]}: {msg[2]}")
+                self._finish(worker, msg[1], DONE_ERROR)
+            case "done":
+                if msg[2] == DONE_OK:
+                    worker.restarts = 0
+                self._finish(worker, msg[1], msg[2])
+            case "error":
+                self.log.error(f"[{serial}] {msg[1]}")
+        if self.on_change:
+            self.on_change()
+
+    def _finish(self, worker: _Worker, job_id: str, status: str) -> None:
+        kind = worker.job_kind
+        with self._lock:
+            if worker.job_id != job_id:
+                return
+            worker.job_id = worker.job_kind = worker.progress = ""
+        if self.on_done:
+            self.on_done(worker.serial, job_id, kind, status)
+
+    def _on_exit(self, worker: _Worker) -> None:
+        code = worker.process.exitcode
+        if worker.job_id:
+            self._finish(worker, worker.job_id, DONE_CRASHED)
+        with self._lock:
+            if self._workers.get(worker.serial) is not worker:
+                return
+            if worker.closing:
+                del self._workers[worker.serial]
+                self._slots.pop(worker.serial, None)
+                return
+            if worker.restarts >= self.max_restarts:
+                del self._workers[worker.serial]
+                self._slots.pop(worker.serial, None)
+                self.log.error(f"[{worker.serial}] 工作进程连续异常退出 {worker.restarts + 1} 次（exitcode={code}），不再重启")
+                restart = False
+            else:
+                restart = True
+        if self.on_change:
+            self.on_change()
+        if not restart:
+            return
+        self.log.warning(f"[{worker.serial}] 工作进程异常退出（exitcode={code}），{self.restart_delay:g}s 后重启")
+        time.sleep(self.restart_delay)
+        with self._lock:
+            if self._workers.get(worker.serial) is worker and not worker.closing:
+                self._spawn(worker.serial, worker.restarts + 1)
+
+    def _start(self, serial: str, kind: str, job_id: str) -> str:
+        with self._lock:
+            if serial not in self._workers:
+                self._spawn(serial, 0)
+            worker = self._workers[serial]
+            if worker.job_id:
+                return f"设备 {serial} 已有任务/队列正在执行，请先停止"
+            # 命令在管道中排队，工作进程就绪后按序处理
+            worker.job_id, worker.job_kind, worker.progress, worker.started = job_id, kind, "", time.monotonic()
+        if not self._send(worker, (kind, job_id)):
+            with self._lock:
+                worker.job_id = worker.job_kind = ""
+            return f"设备 {serial} 的工作进程不可用"
+        return ""
+
+    def start_queue(self, serial: str, queue_id: str) -> str:
+        """成功返回空字符串，失败返回原因。"""
+        return self._start(serial, JOB_QUEUE, queue_id)
+
+    def start_task(self, serial: str, task_id: str) -> str:
+        return self._start(serial, JOB_TASK, task_id)
+
+    def is_running(self, serial: str) -> bool:
+        with self._lock:
+            worker = self._workers.get(serial)
+            return bool(worker and worker.job_id)
+
+    def stop(self, serial: str = None) -> None:
+        """停止某台设备（或全部设备）当前的任务/队列，工作进程保留。"""
+        with self._lock:
+            workers = [w for s, w in self._workers.items() if serial is None or s == serial]
+        for worker in workers:
+            self._send(worker, ("stop",))
+
+    def status(self) -> list[dict]:
+        """字段同 DevicePool.status（cpu 为工作进程全部线程的累计 CPU 秒数），另有 pid、restarts 与 ready。
+
+        ready 为工作进程是否已完成初始化（连接设备、加载 OCR）；未就绪时已下发的任务/队列在管道中排队，progress 显示“启动中”。
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "serial": w.serial,
+                    "running": bool(w.job_id),
+                    "job": w.job_id,
+                    "progress": w.progress or ("" if w.ready else "启动中"),
+                    "elapsed": round(now - w.started, 1) if w.job_id else 0,
+                    "cpu": round(w.cpu, 2),
+                    "pid": w.process.pid,
+                    "restarts": w.restarts,
+                    "ready": w.ready,
+                }
+                for w in self._workers.values()
+            ]
+
+    def _close(self, worker: _Worker, timeout: float = 10) -> None:
+        worker.closing = True
+        self._send(worker, ("exit",))
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.conn.close()
+
+    def shutdown(self, timeout: float = 10) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            self._close(worker, timeout)
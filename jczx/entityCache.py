@@ -0,0 +1,140 @@
+"""实体解析缓存：按文件缓存 trans_entity_dict 结果，按文件组合缓存 extend 解析后的完整实体图（pickle 持久化）。
+
+- 文件版本先比对 (size, mtime_ns)，不一致再比对内容哈希，内容未变只更新 stat
+- 单个文件变化只重新解析该文件，其余文件直接反序列化（跳过 BaseEntity 逐字段类型转换）
+- 反序列化每次都产生新对象：extend 解析会原地修改子实体，缓存里的原始数据不能被污染
+"""
+import hashlib
+import os
+import pickle
+import threading
+from dataclasses import fields
+from logging import Logger
+from typing import Callable
+
+from .configEntity import JczxSectionEntity
+
+CACHE_VERSION = 1
+
+
+def _schema() -> str:
+    """实体字段定义变化（新增字段/改类型）时旧缓存作废。"""
+    sig = ";".join(f"{f.name}:{f.type}" for f in fields(JczxSectionEntity))
+    return f"{CACHE_VERSION}|{hashlib.blake2b(sig.encode('utf-8'), digest_size=8).hexdigest()}"
+
+
+class EntityCache:
+    def __init__(self, path: str, enabled: bool = True, log: Logger = None):
+        self.path = path
+        self.enabled = enabled
+        self.log = log if log else Logger("EntityCache")
+        self._files: dict[str, dict] = {}
+        self._graphs: dict[tuple, bytes] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        self._files, self._graphs, self._dirty = {}, {}, False
+        if not self.enabled or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            self.log.warning(f"实体缓存读取失败，重新解析: {e}")
+            return
+        if not isinstance(data, dict) or data.get("schema") != _schema():
+            self.log.debug("实体缓存版本不符，重新解析")
+            return
+        self._files = data.get("files", {})
+        self._graphs = data.get("graphs", {})
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.enabled or not self._dirty:
+                return
+            data = pickle.dumps({"schema": _schema(), "files": self._files, "graphs": self._graphs},
+                                protocol=pickle.HIGHEST_PROTOCOL)
+            self._dirty = False
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.log.warning(f"实体缓存保存失败: {e}")
+
+    def file_hash(self, path: str) -> str | None:
+        """文件内容哈希（stat 未变时直接复用上次结果），文件不存在返回 None。"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stat = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and entry["stat"] == stat:
+                return entry["hash"]
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and entry["hash"] == digest:
+                entry["stat"] = stat
+                self._dirty = True
+            else:
+                # 新文件或内容已变：旧解析结果作废
+                self._files[path] = {"stat": stat, "hash": digest, "data": None}
+                self._dirty = True
+        return digest
+
+    def file_entities(self, path: str, parse: Callable[[], dict[str, JczxSectionEntity]]) -> dict[str, JczxSectionEntity]:
+        """返回文件的实体字典：未变化的文件反序列化缓存，否则调用 parse 解析并写入缓存。"""
+        if not self.enabled:
+            return parse()
+        digest = self.file_hash(path)
+        with self._lock:
+            entry = self._files.get(path)
+            data = entry["data"] if entry and entry["hash"] == digest else None
+        if data is not None:
+            return pickle.loads(data)
+        entities = parse()
+        data = pickle.dumps(entities, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and entry["hash"] == digest:
+                entry["data"] = data
+                self._dirty = True
+        self.log.debug(f"已解析并缓存实体文件: {path}")
+        return entities
+
+    def _graph_key(self, paths: list[str]) -> tuple | None:
+        key = []
+        for path in paths:
+            digest = self.file_hash(path)
+            if digest is None:
+                return None
+            key.append((path, digest))
+        return tuple(key)
+
+    def get_graph(self, paths: list[str]):
+        """这些文件的当前版本对应的已解析实体图（put_graph 存入的对象的新副本），未命中返回 None。"""
+        if not self.enabled:
+            return None
+        key = self._graph_key(paths)
+        with self._lock:
+            data = self._graphs.get(key) if key else None
+        return pickle.loads(data) if data is not None else None
+
+    def put_graph(self, paths: list[str], graph) -> None:
+        if not self.enabled:
+            return
+        key = self._graph_key(paths)
+        if key is None:
+            return
+        data = pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            # 只保留当前文件组合的实体图，旧组合不再可能命中
+            self._graphs = {key: data}
+            self._dirty = True
@@ -0,0 +1,77 @@
+"""实体执行计划：执行前把实体的分派目标、标量字段、静态 action 链解析一次，之后每次执行直接取用。
+
+- 不含占位符的字段在实体加载时已完成类型转换，计划里直接存值
+- 含 ``${}`` / ``@{}`` / ``%{}`` 的字段编译成闭包，运行时只做占位符解析 + 按字段类型转换
+- action 全部是字面 key 时预先取好实体对象，否则每次执行照旧解析
+- 计划引用的是实体池里的对象：TaskManage.entity_version 变化（刷新 / 热重载）后全部作废
+"""
+from typing import Any, Callable, Iterable, get_type_hints
+
+from .configEntity import JczxSectionEntity
+
+_HINTS = get_type_hints(JczxSectionEntity)
+_PLACEHOLDER_MARKS = ("${", "@{", "%{")
+_UNSET = object()
+
+
+def has_placeholder(value) -> bool:
+    return isinstance(value, str) and any(mark in value for mark in _PLACEHOLDER_MARKS)
+
+
+def compile_scalar(value, name: str, resolve: Callable[[str], str]) -> Callable[[], Any] | None:
+    """含占位符的标量字段 → 闭包（解析后按字段类型转换，转换失败保留字符串）；无占位符返回 None。"""
+    if not has_placeholder(value):
+        return None
+    typ = _HINTS[name]
+
+    def evaluate():
+        val = resolve(value)
+        try:
+            return typ(val)
+        except (ValueError, TypeError):
+            return val
+    return evaluate
+
+
+class ExecPlan:
+    __slots__ = ("entity", "handler", "_resolve", "_static", "_dynamic", "_next")
+
+    def __init__(self, entity: JczxSectionEntity, handler: Callable | None, resolve: Callable[[str], str]):
+        """
+        Args:
+            entity: 实体池中的实体
+            handler: 按 type 预先绑定的 exec_* 方法，未知类型为 None
+            resolve: 以该实体 only_key 为上下文的占位符解析函数
+        """
+        self.entity = entity
+        self.handler = handler
+        self._resolve = resolve
+        self._static: dict[str, Any] = {}
+        self._dynamic: dict[str, Callable[[], Any]] = {}
+        self._next = _UNSET
+
+    def scalar(self, name: str):
+        """标量字段的当前值：静态字段直接返回，动态字段调用编译好的闭包。首次访问时编译。"""
+        if (fn := self._dynamic.get(name)) is not None:
+            return fn()
+        try:
+            return self._static[name]
+        except KeyError:
+            pass
+        value = getattr(self.entity, name)
+        fn = compile_scalar(value, name, self._resolve)
+        if fn is None:
+            self._static[name] = value
+            return value
+        self._dynamic[name] = fn
+        return fn()
+
+    def static_next(self, get_entity: Callable[[str], JczxSectionEntity]) -> tuple | None:
+        """action 全部是字面 key 时返回预先取好的实体元组；含任意占位符返回 None（由调用方逐次解析）。"""
+        if self._next is _UNSET:
+            action: Iterable = self.entity.action or []
+            if any(isinstance(a, str) and "{" in a for a in action):
+                self._next = None
+            else:
+                self._next = tuple(get_entity(a) for a in action)
+        return self._next
@@ -0,0 +1,162 @@
+"""条件 / 上下文表达式编译：``&{...}`` 与 ``%{...}`` 表达式按源文本解析一次成闭包树并缓存，求值时只做变量读取。
+
+语法（优先级从低到高）::
+
+    or   := and ('|' and)*
+    and  := cmp ('&' cmp)*
+    cmp  := primary [('>=' | '<=' | '>' | '<' | '==' | '!=') primary]
+    primary := '(' or ')' | 数字 | 变量
+
+变量含义取决于模式：
+- 条件模式（``&{}``）：``%{k}`` 读上下文，``@{k}`` / 裸名执行实体，``${...}`` 读配置
+- 上下文模式（``%{}`` 内的表达式）：``%{k}`` 与裸名都读上下文
+
+``|`` / ``&`` 短路求值：右侧不满足求值条件时不会执行其中的实体。
+"""
+import re
+from functools import lru_cache
+from typing import Any, Callable
+
+_CONFIG_PATTERN = re.compile(r"\$\{(.+?)\}")
+_EXEC_PATTERN = re.compile(r"@\{(.+?)\}")
+_CTX_PATTERN = re.compile(r"%\{(.+?)\}")
+
+_COMPARE_OPS = (">=", "<=", ">", "<", "==", "!=")
+
+# 求值环境：(上下文变量, 执行实体, 解析 ${} 配置占位符)
+Node = Callable[[dict, Callable[[str], Any], Callable[[str], str]], Any]
+
+
+def tokenize(expr: str) -> list[str]:
+    tokens = []
+    i = 0
+    n = len(expr)
+    while i < n:
+        c = expr[i]
+        if c.isspace():
+            i += 1
+            continue
+        if c in "()&|":
+            tokens.append(c)
+            i += 1
+        elif expr[i: i + 2] in (">=", "<=", "!=", "=="):
+            tokens.append(expr[i: i + 2])
+            i += 2
+        elif c in "><":
+            tokens.append(c)
+            i += 1
+        else:
+            j = i
+            while j < n and not expr[j].isspace() and expr[j] not in "()&|><=!":
+                j += 1
+            tokens.append(expr[i:j])
+            i = j
+    return tokens
+
+
+def is_context_expr(expr: str) -> bool:
+    """``%{...}`` 内容是否为表达式（含运算符），否则按变量名读取。"""
+    if not expr:
+        return False
+    return any(op in expr for op in ("&", "|", ">=", "<=", ">", "<", "==", "!="))
+
+
+def _compare(op: str, left: Node, right: Node) -> Node:
+    match op:
+        case ">=":
+            return lambda c, e, f: float(left(c, e, f)) >= float(right(c, e, f))
+        case "<=":
+            return lambda c, e, f: float(left(c, e, f)) <= float(right(c, e, f))
+        case ">":
+            return lambda c, e, f: float(left(c, e, f)) > float(right(c, e, f))
+        case "<":
+            return lambda c, e, f: float(left(c, e, f)) < float(right(c, e, f))
+        case "==":
+            return lambda c, e, f: str(left(c, e, f)) == str(right(c, e, f))
+        case _:
+            return lambda c, e, f: str(left(c, e, f)) != str(right(c, e, f))
+
+
+def _or(left: Node, right: Node) -> Node:
+    return lambda c, e, f: bool(left(c, e, f)) or bool(right(c, e, f))
+
+
+def _and(left: Node, right: Node) -> Node:
+    return lambda c, e, f: bool(left(c, e, f)) and bool(right(c, e, f))
+
+
+def _const(value) -> Node:
+    return lambda c, e, f: value
+
+
+def _variable(token: str, condition_mode: bool) -> Node:
+    if ctx := _CTX_PATTERN.match(token):
+        key = ctx.group(1)
+        return lambda c, e, f: c.get(key, "")
+    if not condition_mode:
+        return lambda c, e, f: c.get(token, "")
+    if exe := _EXEC_PATTERN.match(token):
+        key = exe.group(1)
+        return lambda c, e, f: e(key)
+    if _CONFIG_PATTERN.match(token):
+        return lambda c, e, f: f(token)
+    return lambda c, e, f: e(token)
+
+
+class _Parser:
+    def __init__(self, tokens: list[str], condition_mode: bool):
+        self.tokens = tokens
+        self.pos = 0
+        self.condition_mode = condition_mode
+
+    def _peek(self, *values) -> bool:
+        return self.pos < len(self.tokens) and self.tokens[self.pos] in values
+
+    def parse_or(self) -> Node:
+        node = self.parse_and()
+        while self._peek("|"):
+            self.pos += 1
+            node = _or(node, self.parse_and())
+        return node
+
+    def parse_and(self) -> Node:
+        node = self.parse_cmp()
+        while self._peek("&"):
+            self.pos += 1
+            node = _and(node, self.parse_cmp())
+        return node
+
+    def parse_cmp(self) -> Node:
+        node = self.parse_primary()
+        if self._peek(*_COMPARE_OPS):
+            op = self.tokens[self.pos]
+            self.pos += 1
+            node = _compare(op, node, self.parse_primary())
+        return node
+
+    def parse_primary(self) -> Node:
+        if self.pos >= len(self.tokens):
+            return _const(False)
+        token = self.tokens[self.pos]
+        self.pos += 1
+        if token == "(":
+            node = self.parse_or()
+            if self._peek(")"):
+                self.pos += 1
+            return node
+        try:
+            return _const(float(token) if "." in token else int(token))
+        except ValueError:
+            pass
+        return _variable(token, self.condition_mode)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expr: str, condition_mode: bool) -> Callable[[dict, Callable[[str], Any], Callable[[str], str]], bool]:
+    """编译表达式（按 (源文本, 模式) 缓存），返回 ``evaluate(context, exec_fn, config_fn) -> bool``。"""
+    node = _Parser(tokenize(expr), condition_mode).parse_or()
+
+    def evaluate(context: dict, exec_fn: Callable[[str], Any], config_fn: Callable[[str], str]) -> bool:
+        result = node(context, exec_fn, config_fn)
+        return bool(result) if result is not None else False
+    return evaluate
@@ -0,0 +1,94 @@
+"""轮询式文件监视：定期 stat 目录树，把新增 / 修改 / 删除的文件批量回调。
+
+不依赖 watchdog 等第三方库；配置与模板目录文件数在千级以内，一次轮询只做 os.scandir + stat。
+编辑器保存时常常分多次写入（先截断再写、写临时文件再改名），检测到变化后等一个轮询周期内不再变化才回调。
+"""
+import os
+import threading
+from logging import Logger
+from typing import Callable
+
+
+class FileWatcher:
+    def __init__(self, roots: list[tuple[str, tuple[str, ...]]], on_change: Callable[[set[str]], None],
+                 interval: float = 1.0, log: Logger = None):
+        """
+        Args:
+            roots: [(目录, 后缀元组)]，只监视这些后缀（小写比较）的文件
+            on_change: 变化文件的绝对路径集合（在监视线程中调用）
+            interval: 轮询间隔（秒）
+        """
+        self.roots = roots
+        self.on_change = on_change
+        self.interval = interval
+        self.log = log if log else Logger("FileWatcher")
+        self._snapshot: dict[str, tuple[int, int]] = self.scan()
+        self._pending: set[str] = set()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        """路径 → (size, mtime_ns)。"""
+        result: dict[str, tuple[int, int]] = {}
+        for root, suffixes in self.roots:
+            stack = [root]
+            while stack:
+                try:
+                    entries = list(os.scandir(stack.pop()))
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(suffixes):
+                            st = entry.stat()
+                            result[entry.path] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        return result
+
+    def _diff(self) -> set[str]:
+        snapshot = self.scan()
+        changed = {p for p in snapshot.keys() | self._snapshot.keys() if snapshot.get(p) != self._snapshot.get(p)}
+        self._snapshot = snapshot
+        return changed
+
+    def poll(self) -> set[str]:
+        """比对上次快照，返回已稳定（本轮无新变化）的变化文件；仍在变化时返回空集合继续等待。"""
+        changed = self._diff()
+        if changed:
+            self._pending |= changed
+            return set()
+        ready, self._pending = self._pending, set()
+        return ready
+
+    def sync(self) -> set[str]:
+        """不开监视线程时按需调用：立即返回上次快照以来的全部变化文件（不等待写入稳定）。"""
+        changed = self._diff() | self._pending
+        self._pending = set()
+        return changed
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        self.log.debug(f"开始监视 {', '.join(root for root, _ in self.roots)}（间隔 {self.interval}s）")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            changed = self.poll()
+            if not changed:
+                continue
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                self.log.error(f"文件变化处理失败: {e}")
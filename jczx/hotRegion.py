@@ -0,0 +1,140 @@
+"""模板热区索引：记录每张模板实际命中过的位置，下次优先在该区域内匹配。"""
+import threading
+from logging import Logger
+
+from .jsonStore import merge_save, read_json
+
+
+class HotRegionIndex:
+    """按 分辨率 → 模板 key 记录历史命中的外接框（JSON 持久化）。
+
+    - lookup 返回外接框 + margin 后的 cutPoints；未学习过或不可用返回 None（全屏匹配）
+    - 曾一次命中多处的模板（列表、队伍等）标记 multi，不走热区，避免 index 选择结果变化
+    - 热区内命中多处时同样标记 multi（之前只命中过一处的模板出现多个实例）
+    - save 只在有新记录时落盘，且只合并本进程改动过的条目（多进程模式下各工作进程共用同一文件）
+    """
+
+    def __init__(self, path: str, margin: int = 40, enabled: bool = True, log: Logger = None):
+        self.path = path
+        self.margin = margin
+        self.enabled = enabled
+        self.log = log if log else Logger("HotRegionIndex")
+        self._regions: dict[str, dict[str, dict]] = {}
+        # 上次保存后改动过的 (分辨率, 模板)、被清除的模板；_cleared 为清除过全部模板
+        self._touched: set[tuple[str, str]] = set()
+        self._removed: set[str] = set()
+        self._cleared = False
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _size_key(width: int, height: int) -> str:
+        return f"{width}x{height}"
+
+    def load(self) -> None:
+        with self._lock:
+            self._regions = {}
+            self._touched.clear()
+            self._removed.clear()
+            self._cleared = False
+            try:
+                self._regions = read_json(self.path)
+            except (OSError, ValueError) as e:
+                self.log.warning(f"热区索引读取失败，重新学习: {e}")
+                return
+        self.log.debug(f"热区索引已加载 {sum(len(v) for v in self._regions.values())} 条: {self.path}")
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._touched and not self._removed and not self._cleared:
+                return
+            changed = {(size, name): dict(self._regions[size][name]) for size, name in self._touched
+                       if name in self._regions.get(size, {})}
+            removed, cleared = set(self._removed), self._cleared
+            self._touched.clear()
+            self._removed.clear()
+            self._cleared = False
+
+        def merge(current: dict) -> dict:
+            data = {} if cleared else current
+            for regions in data.values():
+                for name in removed:
+                    regions.pop(name, None)
+            for (size, name), entry in changed.items():
+                regions = data.setdefault(size, {})
+                regions[name] = self._merge_entry(regions.get(name), entry)
+            return data
+
+        try:
+            merge_save(self.path, merge)
+        except OSError as e:
+            self.log.warning(f"热区索引保存失败: {e}")
+            return
+        self.log.debug(f"热区索引已保存: {self.path}")
+
+    @staticmethod
+    def _merge_entry(saved: dict, entry: dict) -> dict:
+        """磁盘上已有（其他进程学到的）条目与本进程条目合并：外接框取并集，multi 任一为真即真。"""
+        if not saved:
+            return entry
+        a, b = saved["box"], entry["box"]
+        return {"box": [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])],
+                "hits": max(saved.get("hits", 0), entry["hits"]),
+                "multi": bool(saved.get("multi")) or entry["multi"]}
+
+    def clear(self, name: str = None) -> None:
+        """清除某个模板（或全部）的学习记录，模板图片变更时调用。"""
+        with self._lock:
+            for regions in self._regions.values():
+                if name is None:
+                    regions.clear()
+                else:
+                    regions.pop(name, None)
+            if name is None:
+                self._touched.clear()
+                self._removed.clear()
+                self._cleared = True
+            else:
+                self._touched = {key for key in self._touched if key[1] != name}
+                self._removed.add(name)
+
+    def lookup(self, name: str, width: int, height: int):
+        """返回 ((x0, y0), (x1, y1)) 热区（已加 margin 并裁剪到屏幕内），不可用返回 None。"""
+        if not self.enabled or not name:
+            return None
+        entry = self._regions.get(self._size_key(width, height), {}).get(name)
+        if not entry or entry.get("multi"):
+            return None
+        x0, y0, x1, y1 = entry["box"]
+        m = self.margin
+        x0, y0 = max(0, x0 - m), max(0, y0 - m)
+        x1, y1 = min(width, x1 + m), min(height, y1 + m)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return ((x0, y0), (x1, y1))
+
+    def record(self, name: str, width: int, height: int, points: list) -> None:
+        """记录一次命中（全屏匹配，或热区内命中多处）；points 为 MatchTemplete.matchTempletePoints（四角点列表）。"""
+        if not self.enabled or not name or not points:
+            return
+        xs = [p[0] for pts in points for p in pts]
+        ys = [p[1] for pts in points for p in pts]
+        box = [min(xs), min(ys), max(xs), max(ys)]
+        with self._lock:
+            regions = self._regions.setdefault(self._size_key(width, height), {})
+            entry = regions.get(name)
+            if entry is None:
+                entry = regions[name] = {"box": box, "hits": 0, "multi": False}
+                changed = True
+            else:
+                old = entry["box"]
+                entry["box"] = [min(old[0], box[0]), min(old[1], box[1]),
+                                max(old[2], box[2]), max(old[3], box[3])]
+                changed = entry["box"] != old
+            entry["hits"] += 1
+            if len(points) > 1 and not entry["multi"]:
+                entry["multi"] = True
+                changed = True
+            if changed:
+                self._touched.add((self._size_key(width, height), name))
+                self._removed.discard(name)
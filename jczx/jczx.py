@@ -22,6 +22,7 @@ from .jczxMainInfo import *
 from .Ui_jczxTaskCreater import Ui_jczxTaskCreater
 from .jczxTyping import _OCR
 from .jczxCli import JCZXGaming
+from .templateMatch import match_locations, sort_row_major
 
 import subprocess
 import logging
@@ -2344,22 +2345,10 @@ class JCZXGame(JCZXGaming):
             x0, y0 = 0, 0
         screenshot_gray = self.grayScreenshot(cutPoints)
         template_gray = cv2.imread(button_path, cv2.IMREAD_GRAYSCALE)
-        matcher = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(matcher > 0.9)
-        if any(locations[0]):
-            tmp_x = [locations[0][0]]
-            tmp_y = [locations[1][0]]
-            for x,y in zip(*locations):
-                if y-10 >= tmp_y[-1]:
-                    tmp_x.append(x)
-                    tmp_y.append(y)
-                    continue
-                if x-10 >= tmp_x[-1]:
-                    tmp_x.append(x)
-                    tmp_y.append(y)
-                    continue
-            result = [(x+x0, y+y0) for x,y in zip(tmp_x, tmp_y)]
-            return result
+        hits = sort_row_major(match_locations(screenshot_gray, template_gray, 0.9))
+        if hits:
+            # 保持原有 (行, 列) 返回顺序，findRawNumbers 依赖
+            return [(y+x0, x+y0) for x,y,_ in hits]
         else:
             return None
     
@@ -2377,23 +2366,11 @@ class JCZXGame(JCZXGaming):
             screenshot_gray = self.cutScreenshot(grayScreenshot, cutPoints)
         assert exists(button_path), f"未找到 {button_path}"
         template_gray = cv2.imread(button_path, cv2.IMREAD_GRAYSCALE)
-        matcher = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(matcher > per)
+        hits = sort_row_major(match_locations(screenshot_gray, template_gray, per))
         templeteHeight, temleteWidth = template_gray.shape[0:2]
-        if any(locations[0]):
-            tmp_y = [locations[0][0]]
-            tmp_x = [locations[1][0]]
-            for y,x in zip(*locations):
-                if x-10 >= tmp_x[-1]:
-                    tmp_x.append(x)
-                    tmp_y.append(y)
-                    continue
-                if y-10 >= tmp_y[-1]:
-                    tmp_x.append(x)
-                    tmp_y.append(y)
-                    continue
-            matchTempletePoints = [((x+x0, y+y0), (x+x0+temleteWidth, y+y0), (x+x0, y+y0+templeteHeight), (x+x0+temleteWidth, y+y0+templeteHeight)) for x,y in zip(tmp_x,tmp_y)]
-            matchTempleteCenterPoints = [((x+temleteWidth//2)+x0,(y+templeteHeight//2)+y0) for x,y in zip(tmp_x,tmp_y)]
+        if hits:
+            matchTempletePoints = [((x+x0, y+y0), (x+x0+temleteWidth, y+y0), (x+x0, y+y0+templeteHeight), (x+x0+temleteWidth, y+y0+templeteHeight)) for x,y,_ in hits]
+            matchTempleteCenterPoints = [((x+temleteWidth//2)+x0,(y+templeteHeight//2)+y0) for x,y,_ in hits]
             return self.MatchTempleteDetailInfo(
                 baseGrayScreenshot = baseGrayScreenshot,
                 grayScreenshot = screenshot_gray,
@@ -2439,22 +2416,10 @@ class JCZXGame(JCZXGaming):
             screenshot_gray = self.cutScreenshot(grayScreenshot, cutPoints)
         assert exists(button_path), f"未找到 {button_path}"
         template_gray = cv2.imread(button_path, cv2.IMREAD_GRAYSCALE)
-        matcher = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(matcher > per)
+        hits = sort_row_major(match_locations(screenshot_gray, template_gray, per))
         h, w= template_gray.shape[0:2]
-        if any(locations[0]):
-            tmp_y = [locations[0][0]]
-            tmp_x = [locations[1][0]]
-            for y,x in zip(*locations):
-                if x-10 >= tmp_x[-1]:
-                    tmp_x.append(x)
-                    tmp_y.append(y)
-                    continue
-                if y-10 >= tmp_y[-1]:
-                    tmp_x.append(x)
-                    tmp_y.append(y)
-                    continue
-            result = [((x+w//2)+x0,(y+h//2)+y0) for x,y in zip(tmp_x,tmp_y)]
+        if hits:
+            result = [((x+w//2)+x0,(y+h//2)+y0) for x,y,_ in hits]
             return result
         else:
             return None
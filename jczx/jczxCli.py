@@ -5,12 +5,15 @@ import time
 import re
 
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from logging import Logger, Formatter, Handler, getLevelName
+from contextlib import contextmanager
+from copy import deepcopy
+from logging import DEBUG, Logger, Formatter, Handler, getLevelName
 from logging.handlers import RotatingFileHandler
-from typing import Callable, Any, Optional, Union, get_type_hints
+from typing import Callable, Any, Optional, Union
 from datetime import datetime
 
 import cv2
+import numpy as np
 from cv2.typing import MatLike
 from textual.app import App, ComposeResult
 from textual.widgets import RichLog, Footer, Header
@@ -22,10 +25,22 @@ from .CommonBuilder.CommonBuilder.Android.Adb import Device, MatchTemplete
 from .CommonBuilder.CommonBuilder.FileTools.ConfigUtils import Config, TxtConfig
 from .CommonBuilder.CommonBuilder.FileTools.File import FileManage
 from .CommonBuilder.CommonBuilder.Ocr.typing import OCR
-from .debug import DebugRecorder
+from .debug import DebugRecorder, ExecTracer, OcrCorpus
+from .debug.tracer import FORMAT_CHROME, FORMAT_SPEEDSCOPE, NO_SPAN
 from .translate import Lang, translate
+from .adaptiveSleep import SETTLE_THRESHOLD, frame_delta
 from .configEntity import JczxSectionEntity, SectionType
+from .cpuBudget import AFFINITY_OFF, apply_cv_threads
+from .devicePool import DeviceLog, DevicePool
+from .deviceWorker import JOB_TASK, WorkerSupervisor
+from .execPlan import ExecPlan
+from .navGraph import NavGraph
+from .ocrService import OCR_FULL, OCR_REC, OcrService, recognize_batch
+from .sceneIndex import SCENE_DIR, Scene, build_scenes
+from .exprCompiler import compile_expression, is_context_expr
 from .taskManage import TaskManage
+from .templateMatch import (MATCH_PYRAMID, downscale, frame_signature, match_locations, parse_match_mode,
+                            pyramid_match, sort_row_major)
 from .widgets import (
     DeviceBar,
     TaskCard,
@@ -40,7 +55,11 @@ from .widgets import (
 LANGUAGE = Lang.ZH_CN
 
 class ScreenshotCache:
-    """截图缓存，TTL + 脏标记，避免同帧重复截图。"""
+    """截图缓存，TTL + 脏标记，避免同帧重复截图。
+
+    每次刷新帧版本号 +1；同版本帧上的模板匹配结果可按 (版本, 模板, ROI, 阈值) 复用，
+    刷新或 invalidate（click/swipe 后）时清空。
+    """
 
     def __init__(self, screenshot_fn, ttl_ms=200, log=None):
         self._capture = screenshot_fn
@@ -50,6 +69,26 @@ class ScreenshotCache:
         self._color: NDArray = None
         self._timestamp: float = 0.0
         self._dirty: bool = True
+        self._version: int = 0
+        self._matches: dict[tuple, tuple] = {}
+        self._downscaled: dict[int, NDArray] = {}
+        self._signature: Optional[bytes] = None
+
+    @property
+    def version(self) -> int:
+        """当前帧版本号，每次重新截图递增。"""
+        return self._version
+
+    @property
+    def ttl_ms(self) -> float:
+        return self._ttl_ms
+
+    def signature(self) -> bytes:
+        """当前帧签名（frame_signature），同帧只计算一次。"""
+        gray = self.gray_screenshot()
+        if self._signature is None:
+            self._signature = frame_signature(gray)
+        return self._signature
 
     def screenshot(self):
         if self._stale():
@@ -61,8 +100,43 @@ class ScreenshotCache:
             self._refresh()
         return self._gray
 
+    @contextmanager
+    def hold(self):
+        """期间不因 TTL 过期重新截图（click 等 invalidate 仍生效），保证多个模板在同一帧上匹配。"""
+        self.gray_screenshot()
+        ttl, self._ttl_ms = self._ttl_ms, -1
+        try:
+            yield
+        finally:
+            self._ttl_ms = ttl
+
+    def prefetch(self):
+        """立即截取新帧（如等待 OCR 识别期间），之后 TTL 内的读取直接复用。"""
+        self._refresh()
+
     def invalidate(self):
         self._dirty = True
+        self._matches.clear()
+        self._downscaled.clear()
+
+    def gray_downscaled(self, scale: int):
+        """当前帧灰度图缩小 1/scale（金字塔匹配粗搜索用），同帧多模板共享。"""
+        gray = self.gray_screenshot()
+        small = self._downscaled.get(scale)
+        if small is None:
+            small = self._downscaled[scale] = downscale(gray, scale)
+        return small
+
+    def get_match(self, key: tuple, template):
+        """取同帧匹配结果；template 必须是同一对象（防止 id 复用误命中）。未命中返回 (False, None)。"""
+        entry = self._matches.get(key)
+        if entry is None or entry[0] is not template:
+            return False, None
+        return True, entry[1]
+
+    def put_match(self, key: tuple, template, result) -> None:
+        if key[0] == self._version:
+            self._matches[key] = (template, result)
 
     def set_ttl(self, ttl_ms: float):
         if self._log and self._ttl_ms != ttl_ms:
@@ -74,6 +148,10 @@ class ScreenshotCache:
         self._gray = cv2.cvtColor(self._color, cv2.COLOR_BGR2GRAY)
         self._timestamp = time.monotonic()
         self._dirty = False
+        self._version += 1
+        self._matches.clear()
+        self._downscaled.clear()
+        self._signature = None
         if self._log:
             self._log.debug(f"截图缓存已刷新")
 
@@ -82,6 +160,38 @@ class ScreenshotCache:
             return True  # 0 = 禁用缓存：每次读取都重新截图
         return self._dirty or (self._ttl_ms > 0 and (time.monotonic() - self._timestamp) * 1000 > self._ttl_ms)
 
+class PollGate:
+    """轮询等待的帧变化门控：画面签名与上次未命中时相同则跳过本轮匹配，并逐步拉长轮询间隔。
+
+    - 画面变化（签名不同）后立即恢复匹配和基础间隔
+    - 连续跳过超过 max_gap 秒强制匹配一次，防止签名过粗漏掉小图标的出现
+    """
+    __slots__ = ("_cache", "base", "max_interval", "max_gap", "interval", "_missed", "_matched_at")
+
+    def __init__(self, cache: ScreenshotCache, base: float = 0.3, max_interval: float = 1.0, max_gap: float = 2.0):
+        self._cache = cache
+        self.base = base
+        self.max_interval = max_interval
+        self.max_gap = max_gap
+        self.interval = base
+        self._missed: Optional[bytes] = None
+        self._matched_at = time.monotonic()
+
+    def should_match(self) -> bool:
+        sig = self._cache.signature()
+        if sig != self._missed:
+            self.interval = self.base
+        elif time.monotonic() - self._matched_at < self.max_gap:
+            self.interval = min(self.interval * 1.5, self.max_interval)
+            return False
+        self._matched_at = time.monotonic()
+        return True
+
+    def missed(self) -> None:
+        """本轮匹配未命中：记录当前帧签名。"""
+        self._missed = self._cache.signature()
+
+
 class TaskCancelledError(Exception):
     pass
 
@@ -159,6 +269,8 @@ class PlaceholderResolver:
         return [self.resolve(i, after_key) if isinstance(i, str) else i for i in items]
 
     def _resolve_config(self, text: str, after_key: str) -> str:
+        if "${" not in text:
+            return text
         result = text
         for m in self._CONFIG_PATTERN.findall(text):
             val = self._gaming.task_manage._resolve_placeholder("${" + m + "}", after_key)
@@ -216,136 +328,86 @@ class PlaceholderResolver:
         return f"{condition} → {result}"
 
     def _eval_condition_expr(self, expr: str, after_key: str) -> bool:
-        tokens = self._tokenize(expr)
-        return self._parse_expression(tokens, condition_mode=True, after_key=after_key)
+        return compile_expression(expr, True)(
+            self._gaming._context,
+            self._gaming.exec,
+            lambda token: self._gaming.task_manage._resolve_placeholder(token, after_key),
+        )
 
     def _eval_context_expr(self, expr: str):
-        tokens = self._tokenize(expr)
-        return self._parse_expression(tokens, condition_mode=False)
-
-    def _parse_expression(self, tokens: list, *, condition_mode: bool, after_key: str = ""):
-        pos = [0]
-
-        def parse_or():
-            left = parse_and()
-            while pos[0] < len(tokens) and tokens[pos[0]] == "|":
-                pos[0] += 1
-                left = bool(left) or bool(parse_and())
-            return left
-
-        def parse_and():
-            left = parse_cmp()
-            while pos[0] < len(tokens) and tokens[pos[0]] == "&":
-                pos[0] += 1
-                left = bool(left) and bool(parse_cmp())
-            return left
-
-        def parse_cmp():
-            left = parse_primary()
-            if pos[0] < len(tokens) and tokens[pos[0]] in (">=", "<=", ">", "<", "==", "!="):
-                op_token = tokens[pos[0]]
-                pos[0] += 1
-                right = parse_primary()
-                if op_token == ">=": return float(left) >= float(right)
-                if op_token == "<=": return float(left) <= float(right)
-                if op_token == ">":  return float(left) > float(right)
-                if op_token == "<":  return float(left) < float(right)
-                if op_token == "==": return str(left) == str(right)
-                if op_token == "!=": return str(left) != str(right)
-            return left
-
-        def parse_primary():
-            if pos[0] >= len(tokens):
-                return False
-            token = tokens[pos[0]]
-            pos[0] += 1
-            if token == "(":
-                result = parse_or()
-                if pos[0] < len(tokens) and tokens[pos[0]] == ")":
-                    pos[0] += 1
-                return result
-            try:
-                if "." in token:
-                    return float(token)
-                return int(token)
-            except (ValueError, TypeError):
-                pass
-            if condition_mode:
-                if self._CTX_PATTERN.match(token):
-                    return self._gaming._context.get(
-                        self._CTX_PATTERN.match(token).group(1), "")
-                if self._EXEC_PATTERN.match(token):
-                    return self._gaming.exec(
-                        self._EXEC_PATTERN.match(token).group(1))
-                if self._CONFIG_PATTERN.match(token):
-                    return self._gaming.task_manage._resolve_placeholder(token, after_key)
-                return self._gaming.exec(token)
-            else:
-                if self._CTX_PATTERN.match(token):
-                    return self._gaming._context.get(
-                        self._CTX_PATTERN.match(token).group(1), "")
-                return self._gaming._context.get(token, "")
+        return compile_expression(expr, False)(self._gaming._context, self._gaming.exec, str)
 
-        result = parse_or()
-        return bool(result) if result is not None else False
-
-    @staticmethod
-    def _tokenize(expr: str) -> list:
-        tokens = []
-        i = 0
-        n = len(expr)
-        while i < n:
-            c = expr[i]
-            if c.isspace():
-                i += 1
-                continue
-            if c in "()":
-                tokens.append(c)
-                i += 1
-            elif c == "&":
-                tokens.append("&")
-                i += 1
-            elif c == "|":
-                tokens.append("|")
-                i += 1
-            elif expr[i : i + 2] in (">=", "<=", "!=", "=="):
-                tokens.append(expr[i : i + 2])
-                i += 2
-            elif c in "><":
-                tokens.append(c)
-                i += 1
-            else:
-                j = i
-                while j < n and not expr[j].isspace() and expr[j] not in "()&|><=!":
-                    j += 1
-                tokens.append(expr[i:j])
-                i = j
-        return tokens
-
-    @staticmethod
-    def _is_context_expr(expr: str) -> bool:
-        if not expr:
-            return False
-        return any(op in expr for op in ("&", "|", ">=", "<=", ">", "<", "==", "!="))
+    _is_context_expr = staticmethod(is_context_expr)
 
 class JCZXGaming(Device):
     # 提供一些内置的方法
-    def __init__(self, adb_path: str = None, device_id: str = None, connect_port = 7555, max_workers = 10, log = None, config_dir: str = ""):
+    def __init__(self, adb_path: str = None, device_id: str = None, connect_port = 7555, max_workers = 10, log = None, config_dir: str = "",
+                 task_manage: TaskManage = None):
         self.log = log if log else Logger(__file__)
         super().__init__(adb_path, device_id, connect_port, max_workers, log=self.log)
         self.fm = FileManage()
-        self.task_manage = TaskManage(config_dir, log)
+        # TUI 传入自身的 TaskManage 共用（配置/实体/图片池只加载一份），独立使用时自建
+        self.task_manage = task_manage if task_manage is not None else TaskManage(config_dir, log)
         self.ocr: OCR = None
         self._context: dict[str, str] = {}
         self._exec_mgr = TaskExecutionManager()
         self._resolver = PlaceholderResolver(self)
         self._screen_cache = ScreenshotCache(
-            screenshot_fn=lambda: Device.screenshot(self),
+            screenshot_fn=self._capture_screen,
             ttl_ms=500,
             log=self.log,
         )
         self._recorder: Optional[DebugRecorder] = None
         self._emu_strategy = None
+        self._match_mode: str = self.task_manage.get_main_option("match.mode", "full")
+        self._frame_gate = self.task_manage.get_main_option("match.frame_gate", "on") == "on"
+        self._ocr_prefetch = self.task_manage.get_main_option("ocr.prefetch", "on") == "on"
+        try:
+            self._ocr_rec_max_height = int(self.task_manage.get_main_option("ocr.rec_only.max_height", "48"))
+        except ValueError:
+            self._ocr_rec_max_height = 0
+        # 实体执行计划：id(实体) → ExecPlan，字面实体名 → 实体；实体池版本变化时清空
+        self._plans: dict[int, ExecPlan] = {}
+        self._named_entities: dict[str, JczxSectionEntity] = {}
+        self._plan_version = -1
+
+    # 执行追踪（JczxCli 按 debug.trace 每次运行设置），None 时各处只多一次属性判断
+    _tracer: Optional[ExecTracer] = None
+
+    # 为 True 时全屏匹配不走热区索引（见 _find_detail_hot）
+    _hot_bypass: bool = False
+
+    # 异步 OCR（OcrService）识别期间截取下一帧（ocr.prefetch，初始化时读取）
+    _ocr_prefetch: bool = False
+    # 未指定 ocr_mode 时高度不超过该值（px）的横向裁剪图只做识别（ocr.rec_only.max_height），0 = 总是完整流程
+    _ocr_rec_max_height: int = 0
+    # OCR 裁剪图语料（debug.ocr_corpus），None = 不记录
+    _ocr_corpus: Optional[OcrCorpus] = None
+
+    # 轮询等待的帧变化门控（match.frame_gate，初始化时读取）与基础轮询间隔（秒）
+    _frame_gate: bool = False
+    _POLL_INTERVAL = 0.3
+
+    def _poll_gate(self) -> Optional[PollGate]:
+        """截图缓存禁用（TTL=0）时每次取签名都会重新截图，不启用门控。"""
+        if not self._frame_gate or self._screen_cache.ttl_ms == 0:
+            return None
+        return PollGate(self._screen_cache, self._POLL_INTERVAL)
+
+    def _span(self, name: str, entity: JczxSectionEntity = None, cat: str = "stage"):
+        tracer = self._tracer
+        if tracer is None:
+            return NO_SPAN
+        if entity is None:
+            return tracer.span(name, cat)
+        return tracer.span(name, cat, key=entity.only_key, type=entity.type)
+
+    def _capture_screen(self):
+        """ScreenshotCache 过期时的真实截图。"""
+        if self._tracer is None:
+            return Device.screenshot(self)
+        with self._tracer.span("screenshot", "device"):
+            return Device.screenshot(self)
 
     def screenshot(self):
         img = self._screen_cache.screenshot()
@@ -364,21 +426,121 @@ class JCZXGaming(Device):
     def click(self, x, y):
         if self._recorder:
             self._recorder.on_click(self.screenshot(), x, y)
-        super().click(x, y)
+        with self._span("click", cat="device"):
+            super().click(x, y)
         self._screen_cache.invalidate()
 
     def swipe(self, x1, y1, x2, y2, duration=200):
         if self._recorder:
             self._recorder.on_swipe(self.screenshot(), x1, y1, x2, y2, "滑动")
-        super().swipe(x1, y1, x2, y2, duration)
+        with self._span("swipe", cat="device"):
+            super().swipe(x1, y1, x2, y2, duration)
         self._screen_cache.invalidate()
 
     def dragAndDrop(self, x1, y1, x2, y2, duration=200):
         if self._recorder:
             self._recorder.on_swipe(self.screenshot(), x1, y1, x2, y2, "拖动")
-        super().dragAndDrop(x1, y1, x2, y2, duration)
+        with self._span("dragAndDrop", cat="device"):
+            super().dragAndDrop(x1, y1, x2, y2, duration)
         self._screen_cache.invalidate()
-    
+
+    def findImageDetail(self, img, cutPoints=None, per: float = 0.9, grayScreenshot=None):
+        """同帧匹配记忆化：键 (帧版本, 模板, ROI, 阈值)；全屏匹配先查热区索引。
+
+        findImageCenterLocations / clickResource 内部都走 findImageDetail，故一并命中。
+        外部传入 grayScreenshot 时帧版本未知，不走缓存。
+        """
+        if self._tracer is None:
+            return self._find_detail(img, cutPoints, per, grayScreenshot)
+        with self._tracer.span("findImageDetail", "device", template=self.task_manage.get_img_name(img)):
+            return self._find_detail(img, cutPoints, per, grayScreenshot)
+
+    def _find_detail(self, img, cutPoints, per: float, grayScreenshot):
+        if grayScreenshot is not None or img is None:
+            return super().findImageDetail(img, cutPoints, per, grayScreenshot)
+        gray = self.grayScreenshot()
+        if cutPoints is None:
+            return self._find_detail_hot(img, gray, per)
+        return self._find_detail_memo(img, gray, cutPoints, per)
+
+    def _find_detail_memo(self, img, gray, cutPoints, per: float):
+        key = (self._screen_cache.version, id(img), self._freeze_points(cutPoints), float(per), self._match_mode)
+        hit, mt = self._screen_cache.get_match(key, img)
+        if not hit:
+            mt = self._match_detail(img, gray, cutPoints, per)
+            self._screen_cache.put_match(key, img, mt)
+        return self._copy_match(mt)
+
+    def _match_detail(self, img, gray, cutPoints, per: float):
+        """按当前匹配模式执行一次模板匹配：full 全分辨率 + NMS，pyramid 粗到细（不适用时回退 full）。"""
+        if isinstance(img, str):
+            return super().findImageDetail(img, cutPoints, per, gray)
+        mode, scale = parse_match_mode(self._match_mode, self._pyramid_scale())
+        (x0, y0), (x1, y1) = cutPoints if cutPoints else ((0, 0), gray.shape[1::-1])
+        roi = gray[y0:y1, x0:x1]
+        hits = None
+        if mode == MATCH_PYRAMID:
+            small = self._screen_cache.gray_downscaled(scale)[y0 // scale:y1 // scale, x0 // scale:x1 // scale]
+            hits = pyramid_match(roi, img, per, scale, small_gray=small,
+                                 small_template=self.task_manage.get_img_scaled(img, scale))
+        if hits is None:
+            hits = match_locations(roi, img, per)
+        points = [(x + x0, y + y0) for x, y, _ in sort_row_major(hits)]
+        return self._build_match(gray, roi, img.shape[1::-1], points)
+
+    def _pyramid_scale(self) -> int:
+        try:
+            return int(self.task_manage.get_main_option("match.pyramid.scale", "2"))
+        except ValueError:
+            return 2
+
+    @staticmethod
+    def _build_match(gray, roi, size: tuple[int, int], points: list[tuple[int, int]]) -> MatchTemplete:
+        """左上角坐标列表 → MatchTemplete（与设备层 findImageDetail 的结构一致）。"""
+        w, h = size
+        return MatchTemplete(
+            baseGrayScreenshot=gray,
+            grayScreenshot=roi,
+            templeteSize=(w, h),
+            matchTempletePoints=[((x, y), (x + w, y), (x, y + h), (x + w, y + h)) for x, y in points] or None,
+            matchTempleteCenterPoints=[(x + w // 2, y + h // 2) for x, y in points] or None,
+        )
+
+    def _find_detail_hot(self, img, gray, per: float):
+        """先在学习到的热区内匹配，未命中回退全屏；全屏命中后更新热区索引。
+
+        热区内命中多处时记入索引（标记 multi，之后不再走热区）；_hot_bypass 期间（点击第 index>0 个匹配）直接全屏，
+        避免热区只框住已学到的那一处而回退到第 0 个。
+        """
+        hot = self.task_manage.hot_regions if not self._hot_bypass else None
+        name = self.task_manage.get_img_name(img)
+        height, width = gray.shape[:2]
+        region = hot.lookup(name, width, height) if hot else None
+        if region:
+            mt = self._find_detail_memo(img, gray, region, per)
+            if mt is not None and mt.matched:
+                if len(mt.matchTempletePoints) > 1:
+                    hot.record(name, width, height, mt.matchTempletePoints)
+                return mt
+        mt = self._find_detail_memo(img, gray, None, per)
+        if hot and mt is not None and mt.matched:
+            hot.record(name, width, height, mt.matchTempletePoints)
+        return mt
+
+    @staticmethod
+    def _freeze_points(points):
+        if not points:
+            return None
+        return tuple(tuple(p) for p in points)
+
+    @staticmethod
+    def _copy_match(mt: MatchTemplete):
+        """深拷贝匹配结果但共享截图数组：transform() 原地修改坐标，缓存对象不能外泄。"""
+        if mt is None:
+            return None
+        memo = {id(v): v for v in vars(mt).values() if isinstance(v, np.ndarray)}
+        return deepcopy(mt, memo)
+
     def set_ocr(self, ocr):
         self.ocr = ocr
 
@@ -462,7 +624,7 @@ class JCZXGaming(Device):
                 if img is None:
                     self.log.debug(f"match 图片未找到: {e.target}")
                     return None
-                result = self.findImageDetail(img, per=self._resolve_scalar(e, "per"))
+                result = self.findImageDetail(img, cutPoints=self._resolve_region(e), per=self._resolve_scalar(e, "per"))
                 if not result or not result.matched:
                     self.log.debug(f"match 未匹配到: {e.target}")
                     return None
@@ -479,6 +641,188 @@ class JCZXGaming(Device):
             return result
         return self._exec_entity(entity, _on_exec, testFor=True, action_chain=False)
 
+    def exec_wait_any(self, section: Union[JczxSectionEntity, str]):
+        """执行 wait_any 类型实体：每轮截图一次，所有 targets 在同一帧上匹配，返回按列表顺序第一个命中的候选名。
+
+        候选为 match 实体 key 时取其 target / region / per，否则按图片路径使用本实体的 region / per。
+        第 i 个候选命中时执行 condition_then[i]（若有）；max_wait 内都未命中执行 condition_else 并返回 None。
+        max_wait 为 0 时只匹配一轮。
+        """
+        entity = self._get_entity(section)
+        def _on_exec(e: JczxSectionEntity):
+            candidates = self._wait_any_candidates(e)
+            if not candidates:
+                self.log.warning(f"[{e.get_task_name()}] wait_any 没有可用的 targets")
+                return None
+            max_wait = self._resolve_scalar(e, "max_wait")
+            start = time.monotonic()
+            gate = self._poll_gate()
+            while True:
+                self._exec_mgr.token.check()
+                if gate is None or gate.should_match():
+                    if hits := self._match_candidates(candidates):
+                        pos, name = hits[0][:2]
+                        self.log.debug(f"wait_any 命中 {name}")
+                        if pos < len(e.condition_then):
+                            self.exec(e.condition_then[pos])
+                        return name
+                    if gate is not None:
+                        gate.missed()
+                if time.monotonic() - start >= max_wait:
+                    break
+                self._exec_mgr.token.sleep(gate.interval if gate is not None else self._POLL_INTERVAL)
+            self.log.debug(f"wait_any {max_wait}s 内未命中 {[c[1] for c in candidates]}")
+            for s in e.condition_else:
+                self.exec(s)
+            return None
+        return self._exec_entity(entity, _on_exec, testFor=True)
+
+    def _wait_any_candidates(self, e: JczxSectionEntity) -> list[tuple[int, str, Any, Any, float]]:
+        """targets → [(在 targets 中的位置, 候选名, 模板, cutPoints, 阈值)]，图片缺失的候选跳过。"""
+        candidates = []
+        for pos, name in enumerate(self._resolver.resolve_list(e.targets, e.only_key)):
+            ref = self.task_manage.get_entity(name)
+            if ref is not None and ref.type == SectionType.MATCH.value:
+                if ref.match:
+                    self.log.warning(f"wait_any 不支持级联 match 实体 {name}，只匹配其 target")
+                img = self.task_manage.get_img(self._resolver.resolve(ref.target, ref.only_key)) if ref.target else None
+                region, per = self._resolve_region(ref), self._resolve_scalar(ref, "per")
+            else:
+                img = self.task_manage.get_img(name)
+                region, per = self._resolve_region(e), self._resolve_scalar(e, "per")
+            if img is None:
+                self.log.debug(f"wait_any 候选图片未找到: {name}")
+                continue
+            candidates.append((pos, name, img, region, per))
+        return candidates
+
+    # wait_any 多模板并行匹配的线程池（match.workers，首次使用时创建，各引擎实例共享）
+    _match_pool: Optional[ThreadPoolExecutor] = None
+    _match_pool_lock = threading.Lock()
+
+    def _match_executor(self) -> Optional[ThreadPoolExecutor]:
+        try:
+            workers = int(self.task_manage.get_main_option("match.workers", "4"))
+        except ValueError:
+            workers = 1
+        if workers <= 1:
+            return None
+        with JCZXGaming._match_pool_lock:
+            if JCZXGaming._match_pool is None:
+                JCZXGaming._match_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="match")
+        return JCZXGaming._match_pool
+
+    def _match_candidates(self, candidates: list[tuple], first: bool = True) -> list[tuple]:
+        """同一帧上匹配候选 (位置, 名称, 模板, cutPoints, 阈值)，按列表顺序返回命中的候选。
+
+        cv2.matchTemplate 执行期间释放 GIL，多候选时在线程池并行；调试记录开启时串行（记录器非线程安全），
+        串行且 first=True 时命中第一个即停止。
+        """
+        def matched(candidate) -> bool:
+            _, _, img, region, per = candidate
+            mt = self.findImageDetail(img, cutPoints=region, per=per)
+            return mt is not None and mt.matched
+
+        with self._screen_cache.hold():
+            pool = self._match_executor() if len(candidates) > 1 and self._recorder is None else None
+            if pool is None:
+                hits = []
+                for c in candidates:
+                    if matched(c):
+                        hits.append(c)
+                        if first:
+                            break
+                return hits
+            flags = list(pool.map(matched, candidates))
+        return [c for c, hit in zip(candidates, flags) if hit]
+
+    def _scene_candidates(self, scenes: list[Scene]) -> list[tuple]:
+        height, width = self._screen_cache.gray_screenshot().shape[:2]
+        candidates = []
+        for pos, scene in enumerate(scenes):
+            img = self.task_manage.get_img(scene.target)
+            if img is None:
+                continue
+            region = self._parse_region(scene.region, width, height) if scene.region else None
+            candidates.append((pos, scene.id, img, region, scene.per))
+        return candidates
+
+    def classify_scene(self) -> str:
+        """识别当前界面：resources/locations 的全部场景模板在同一帧上批量匹配，返回优先级最高的命中场景 id
+        （未识别返回空字符串）。结果同时写入上下文变量 scene，全部命中的场景（逗号分隔）写入 scenes。"""
+        scenes = build_scenes(self.task_manage.list_resources(SCENE_DIR))
+        with self._span("classify_scene"):
+            hits = self._match_candidates(self._scene_candidates(scenes), first=False)
+        ids = [c[1] for c in hits]
+        scene = ids[0] if ids else ""
+        self.context_set("scene", scene)
+        self.context_set("scenes", ",".join(ids))
+        self.log.debug(f"当前界面 {scene or '未识别'}（命中 {ids}）")
+        return scene
+
+    # 导航图缓存 (实体池版本, 图)，实体热重载后重建
+    _nav_cache: Optional[tuple[int, NavGraph]] = None
+    _NAV_MARKER_PER = 0.9
+
+    def _nav_graph(self) -> NavGraph:
+        version = self.task_manage.entity_version
+        if self._nav_cache is None or self._nav_cache[0] != version:
+            scenes = build_scenes(self.task_manage.list_resources(SCENE_DIR))
+            graph = NavGraph.from_entities(self.task_manage.entity_pool.items(), {s.id: s.target for s in scenes})
+            self._nav_cache = (version, graph)
+        return self._nav_cache[1]
+
+    def _locate(self, graph: NavGraph, scenes: list[str]) -> Optional[str]:
+        """按给定顺序返回第一个标志图可见的场景（同一帧批量匹配）。"""
+        candidates = []
+        for pos, scene in enumerate(scenes):
+            for marker in graph.markers.get(scene, ()):
+                img = self.task_manage.get_img(marker)
+                if img is not None:
+                    candidates.append((pos, scene, img, None, self._NAV_MARKER_PER))
+        hits = self._match_candidates(candidates)
+        return hits[0][1] if hits else None
+
+    def locate_scene(self) -> str:
+        """按导航图各场景的标志图识别当前所在场景，无法识别返回空字符串。"""
+        graph = self._nav_graph()
+        return self._locate(graph, graph.locate_order()) or ""
+
+    def goto_scene(self, scene: str) -> bool:
+        """从当前场景沿导航图最短路线前往目标场景，已在目标场景时不执行任何动作。
+
+        目标有标志图时到达后校验；校验失败（起点识别错误等）按未知场景重新规划一次（先走任意场景可达的边，如 goto-home）。
+        """
+        graph = self._nav_graph()
+        current = self._locate(graph, graph.locate_order())
+        for _ in range(2):
+            path = graph.plan(current, scene)
+            if path is None:
+                self.log.warning(f"导航：无法从 {current or '未知场景'} 到达 {scene}")
+                return False
+            self.log.info(f"导航 {current or '未知场景'} → {scene}: {[e.key for e in path] or '已在目标场景'}")
+            with self._span("goto_scene"):
+                for edge in path:
+                    self.exec(edge.key)
+            if not graph.markers.get(scene) or self._locate(graph, [scene]) == scene:
+                return True
+            if current is None:
+                break
+            self.log.warning(f"导航：未确认到达 {scene}，按未知场景重新规划")
+            current = None
+        self.log.warning(f"导航：未能到达 {scene}")
+        return False
+
+    def in_scene(self, *scene_ids: str) -> bool:
+        """当前界面是否为给定场景之一：只匹配这些场景模板（同一帧批量）。"""
+        wanted = {s.strip() for s in scene_ids if s and s.strip()}
+        scenes = [s for s in build_scenes(self.task_manage.list_resources(SCENE_DIR)) if s.id in wanted]
+        if missing := wanted - {s.id for s in scenes}:
+            self.log.warning(f"未知场景 {sorted(missing)}，可用场景见 resources\\{SCENE_DIR}")
+        hits = self._match_candidates(self._scene_candidates(scenes))
+        self.log.debug(f"检测场景 {sorted(wanted)} {bool(hits)}")
+        return bool(hits)
+
     @staticmethod
     def _transform_match(mt: MatchTemplete, action: str):
         """对 MatchTemplete 结果应用变换操作（如 down-1.5、reW-2.0 等）。"""
@@ -493,14 +837,14 @@ class JCZXGaming(Device):
             if e.match:
                 mt = self.exec(e.match)
                 if mt is not None and getattr(mt, "matched", False):
-                    result = self._ocr_match_region(mt)
+                    result = self._ocr_match_region(mt, self._resolve_scalar(e, "ocr_mode"))
             elif e.target:
                 target = self._resolver.resolve(e.target, e.only_key)
                 img = self.task_manage.get_img(target) if target else None
                 if img is not None:
-                    mt = self.findImageDetail(img, per=self._resolve_scalar(e, "per"))
+                    mt = self.findImageDetail(img, cutPoints=self._resolve_region(e), per=self._resolve_scalar(e, "per"))
                     if mt and mt.matched and mt.matchTempletePointRange:
-                        result = self._ocr_match_region(mt)
+                        result = self._ocr_match_region(mt, self._resolve_scalar(e, "ocr_mode"))
                         self.log.info(f"OCR 识别 {e.get_task_name()}: {result}") if e.get_task_name() else None
             if not result and e.raise_value:
                 result = self._resolver.resolve(e.raise_value, e.only_key)
@@ -587,6 +931,16 @@ class JCZXGaming(Device):
         点击优先级：pos > match > target（模板匹配循环）。"""
         entity = self._get_entity(section)
         def _on_exec(e: JczxSectionEntity):
+            if e.index <= 0 or self._hot_bypass:
+                return _click(e)
+            # 点击第 index 个匹配：热区只覆盖学到过的位置，可能漏掉其他实例
+            self._hot_bypass = True
+            try:
+                return _click(e)
+            finally:
+                self._hot_bypass = False
+
+        def _click(e: JczxSectionEntity):
             startTime = datetime.now()
             result = None
             if e.pos:
@@ -612,6 +966,8 @@ class JCZXGaming(Device):
             else:
                 target = self._resolver.resolve(e.target, e.only_key) if e.target else None
                 img = self.task_manage.get_img(target) if target else None
+                region = self._resolve_region(e) if img is not None else None
+                gate = self._poll_gate() if img is not None else None
                 while True:
                     self._exec_mgr.token.check()
                     if e.condition_not:
@@ -633,16 +989,23 @@ class JCZXGaming(Device):
                             for s in e.condition_else: result = self.exec(s)
                         break
                     result = self.exec(e.wait_sec)
-                    self.log.debug(f"匹配资源 {target}")
-                    if img is not None and self._recorder:
-                        # 记录debug记录匹配结果
-                        mt = self.findImageDetail(img, per=self._resolve_scalar(e, "per"))
-                        if mt and mt.matched:
-                            self._recorder.on_match(self.screenshot(), mt)
-                    if img is not None and (result := self.clickResource(img, per=self._resolve_scalar(e, "per"), index=e.index)):
-                        self.log.debug(f"匹配并点击资源 {target}")
-                        self.log.info(f"执行点击 {e.get_task_name()}") if e.get_task_name() else None
-                        break
+                    if gate is not None and not gate.should_match():
+                        # 画面与上次未命中时相同：跳过匹配，按退避间隔等待
+                        result = None
+                        self._exec_mgr.token.sleep(gate.interval)
+                    else:
+                        self.log.debug(f"匹配资源 {target}")
+                        if img is not None and self._recorder:
+                            # 记录debug记录匹配结果
+                            mt = self.findImageDetail(img, cutPoints=region, per=self._resolve_scalar(e, "per"))
+                            if mt and mt.matched:
+                                self._recorder.on_match(self.screenshot(), mt)
+                        if img is not None and (result := self.clickResource(img, per=self._resolve_scalar(e, "per"), index=e.index, cutPoints=region)):
+                            self.log.debug(f"匹配并点击资源 {target}")
+                            self.log.info(f"执行点击 {e.get_task_name()}") if e.get_task_name() else None
+                            break
+                        if gate is not None:
+                            gate.missed()
                     runTime = (datetime.now() - startTime).seconds
                     if runTime >= e.max_wait:
                         self.log.debug(f"最大等待时间 {e.max_wait}s 结束, 未匹配到资源 {target}")
@@ -661,7 +1024,9 @@ class JCZXGaming(Device):
         log_fn = self.log.info if is_task else self.log.debug
         def _on_exec(e: JczxSectionEntity):
             result = None
-            next_entities = self.task_manage.get_next(e)
+            next_entities = self._plan(e).static_next(self.task_manage.get_entity)
+            if next_entities is None:
+                next_entities = self.task_manage.get_next(e)
             log_fn(f"开始执行{prefix} {e.get_task_name()}") if e.get_task_name() else None
             for i in next_entities:
                 self._exec_mgr.token.check()
@@ -728,20 +1093,103 @@ class JCZXGaming(Device):
         return self.exec(fn)
 
     def _get_entity(self, section: Union[JczxSectionEntity, str]) -> JczxSectionEntity:
-        if isinstance(section, str):
-            section = self._resolver.resolve(section, section)
-        return section if isinstance(section, JczxSectionEntity) else self.task_manage.get_entity(section)
+        return self._named_entity(section) if isinstance(section, str) else section
 
     def _resolve_scalar(self, entity: JczxSectionEntity, name: str):
-        val = getattr(entity, name)
-        if isinstance(val, str) and ("${" in val or "@{" in val or "%{" in val):
-            val = self._resolver.resolve(val, entity.only_key)
-            hints = get_type_hints(JczxSectionEntity)
-            try:
-                val = hints[name](val)
-            except (ValueError, TypeError):
-                pass
-        return val
+        return self._plan(entity).scalar(name)
+
+    _HANDLERS = {
+        SectionType.TASK.value: "exec_task",
+        SectionType.FUNC.value: "exec_func",
+        SectionType.CLICK.value: "exec_click",
+        SectionType.DYNAMIC.value: "exec_dynamic",
+        SectionType.MATCH.value: "exec_match",
+        SectionType.OCR.value: "exec_ocr",
+        SectionType.CONTEXT.value: "exec_context",
+        SectionType.CONDITION.value: "exec_condition",
+        SectionType.METHOD.value: "exec_method",
+        SectionType.CALL.value: "exec_call",
+        SectionType.WAIT_ANY.value: "exec_wait_any",
+    }
+
+    def _check_plan_version(self) -> None:
+        version = self.task_manage.entity_version
+        if version != self._plan_version:
+            self._plans.clear()
+            self._named_entities.clear()
+            self._plan_version = version
+
+    def _plan(self, entity: JczxSectionEntity) -> ExecPlan:
+        """实体的执行计划：实体池中的实体编译一次后复用，池外的临时实体（call 参数、测试构造）每次新建。"""
+        self._check_plan_version()
+        plan = self._plans.get(id(entity))
+        if plan is not None and plan.entity is entity:
+            return plan
+        name = self._HANDLERS.get(entity.type)
+        key = entity.only_key
+        plan = ExecPlan(entity, getattr(self, name) if name else None,
+                        lambda text: self._resolver.resolve(text, key))
+        if key and self.task_manage.get_entity(key) is entity:
+            self._plans[id(entity)] = plan
+        return plan
+
+    def _named_entity(self, name: str) -> JczxSectionEntity:
+        """exec 传入实体名：字面 key 的查找结果按实体池版本缓存，含占位符的每次解析。"""
+        if "{" in name:
+            return self.task_manage.get_entity(self._resolver.resolve(name, name))
+        self._check_plan_version()
+        entity = self._named_entities.get(name)
+        if entity is None:
+            entity = self.task_manage.get_entity(name)
+            if entity is not None:
+                self._named_entities[name] = entity
+        return entity
+
+    def _resolve_region(self, entity: JczxSectionEntity, name: str = "region"):
+        """解析实体的搜索区域字段为 cutPoints（按当前帧分辨率换算），未设置返回 None（全屏）。"""
+        text = getattr(entity, name)
+        if not text:
+            return None
+        text = self._resolver.resolve(text, entity.only_key)
+        height, width = self._screen_cache.gray_screenshot().shape[:2]
+        region = self._parse_region(text, width, height)
+        if region is None:
+            self.log.warning(f"[{entity.get_task_name() or entity.only_key}] {name} 格式错误: {text}，使用全屏匹配")
+        return region
+
+    _GRID_PATTERN = re.compile(r"^cut(\d+)x(\d+)$")
+
+    @classmethod
+    def _parse_region(cls, text: str, width: int, height: int):
+        """区域字符串 → ((x0, y0), (x1, y1))，非法返回 None。
+
+        - 比例：``x0,y0,x1,y1``，取值 0~1，如 ``0.5,0,1,0.5`` = 右上四分之一
+        - 网格：``cutNxM|x,y`` 与旧版 ScreenCut.cutNxM(x, y) 相同（横 N 列、纵 M 行）；
+          ``cutNxM|x0,y0|x1,y1`` 跨越从 (x0,y0) 到 (x1,y1) 的多个格子
+        """
+        parts = [p.strip() for p in text.split("|")]
+        try:
+            if grid := cls._GRID_PATTERN.match(parts[0]):
+                cx, cy = int(grid.group(1)), int(grid.group(2))
+                cells = [tuple(int(v) for v in p.split(",")) for p in parts[1:]]
+                if not cx or not cy or len(cells) not in (1, 2) or any(len(c) != 2 for c in cells):
+                    return None
+                (gx0, gy0), (gx1, gy1) = cells[0], cells[-1]
+                cw, ch = width // cx, height // cy
+                x0, y0, x1, y1 = cw * gx0, ch * gy0, cw * (gx1 + 1), ch * (gy1 + 1)
+            else:
+                values = [float(v) for v in text.split(",")]
+                if len(values) != 4:
+                    return None
+                x0, y0 = int(values[0] * width), int(values[1] * height)
+                x1, y1 = int(values[2] * width), int(values[3] * height)
+        except ValueError:
+            return None
+        x0, x1 = max(0, x0), min(width, x1)
+        y0, y1 = max(0, y0), min(height, y1)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return ((x0, y0), (x1, y1))
 
     def _exec_entity(self, entity: JczxSectionEntity, on_exec: Callable, *, testFor=False, action_chain=True, default_max_wait=0):
         """Template Method：封装实体执行的通用流程（times / testFor / sleep / log / action 链）。"""
@@ -751,60 +1199,156 @@ class JCZXGaming(Device):
                 test_before = self.task_manage.get_img(entity.testFor_before)
             if entity.testFor_after:
                 test_after = self.task_manage.get_img(entity.testFor_after)
-        times = self._resolve_scalar(entity, "times")
+        plan = self._plan(entity)
+        times = plan.scalar("times")
         for _ in range(times):
             self._exec_mgr.token.check()
             old_ttl = self._screen_cache._ttl_ms
-            screen_ttl = self._resolve_scalar(entity, "screen_cache_ttl")
+            screen_ttl = plan.scalar("screen_cache_ttl")
             if screen_ttl >= 0:
                 self._screen_cache.set_ttl(screen_ttl)
+            old_mode = self._match_mode
+            match_mode = plan.scalar("match_mode")
+            if match_mode:
+                self._match_mode = match_mode
             try:
                 if test_before is not None:
-                    self._exec_mgr.token.sleep(self._resolve_scalar(entity, "testFor_pre_sleep"))
-                    test_wait = self._resolve_scalar(entity, "testFor_max_wait")
-                    if test_wait <= 0:
-                        test_wait = default_max_wait
-                    self.log.debug(f"开始等待 testFor_before {entity.testFor_before}")
-                    if not self._wait_for_image(test_before, test_wait, per=self._resolve_scalar(entity, "testFor_per")):
-                        self.log.debug(f"testFor_before 未匹配到 {entity.testFor_before}")
-                        return None
-                    self.log.debug(f"testFor_before 匹配到 {entity.testFor_before}")
-                    self._exec_mgr.token.sleep(self._resolve_scalar(entity, "testFor_sleep"))
-                self._exec_mgr.token.sleep(self._resolve_scalar(entity, "pre_sleep"))
-                self.log.debug(f"开始执行实体 {entity.get_task_name()} {entity}")
-                result = on_exec(entity)
-                self._exec_mgr.token.sleep(self._resolve_scalar(entity, "sleep"))
+                    with self._span("testFor_before", entity):
+                        self._exec_mgr.token.sleep(plan.scalar("testFor_pre_sleep"))
+                        test_wait = plan.scalar("testFor_max_wait")
+                        if test_wait <= 0:
+                            test_wait = default_max_wait
+                        self.log.debug(f"开始等待 testFor_before {entity.testFor_before}")
+                        test_region = self._resolve_region(entity, "testFor_region")
+                        if not self._wait_for_image(test_before, test_wait, per=plan.scalar("testFor_per"), cutPoints=test_region):
+                            self.log.debug(f"testFor_before 未匹配到 {entity.testFor_before}")
+                            return None
+                        self.log.debug(f"testFor_before 匹配到 {entity.testFor_before}")
+                        self._entity_sleep(plan, entity, "testFor_sleep")
+                with self._span("pre_sleep", entity):
+                    self._entity_sleep(plan, entity, "pre_sleep")
+                if self.log.isEnabledFor(DEBUG):
+                    self.log.debug(f"开始执行实体 {entity.get_task_name()} {entity}")
+                with self._span("on_exec", entity):
+                    result = on_exec(entity)
+                settle_timeout = plan.scalar("settle_timeout")
+                if settle_timeout > 0:
+                    self._settle(entity, settle_timeout)
+                with self._span("sleep", entity):
+                    self._entity_sleep(plan, entity, "sleep")
                 if entity.wait_target:
-                    wait_img = self.task_manage.get_img(self._resolver.resolve(entity.wait_target, entity.only_key))
-                    if wait_img is not None:
-                        wait_max = self._resolve_scalar(entity, "max_wait")
-                        self.log.debug(f"开始等待 wait_target {entity.wait_target}，超时 {wait_max}s")
-                        if self._wait_for_image(wait_img, wait_max, per=self._resolve_scalar(entity, "wait_target_per")):
-                            self.log.debug(f"wait_target 匹配到 {entity.wait_target}")
-                            self._exec_mgr.token.sleep(self._resolve_scalar(entity, "wait_target_sleep"))
+                    with self._span("wait_target", entity):
+                        wait_img = self.task_manage.get_img(self._resolver.resolve(entity.wait_target, entity.only_key))
+                        if wait_img is not None:
+                            wait_max = plan.scalar("max_wait")
+                            self.log.debug(f"开始等待 wait_target {entity.wait_target}，超时 {wait_max}s")
+                            wait_region = self._resolve_region(entity, "wait_target_region")
+                            if self._wait_for_image(wait_img, wait_max, per=plan.scalar("wait_target_per"), cutPoints=wait_region):
+                                self.log.debug(f"wait_target 匹配到 {entity.wait_target}")
+                                if settle_timeout > 0:
+                                    self._settle(entity, settle_timeout)
+                                self._entity_sleep(plan, entity, "wait_target_sleep")
+                            else:
+                                self.log.debug(f"wait_target 未匹配到 {entity.wait_target}，超时继续执行")
                         else:
-                            self.log.debug(f"wait_target 未匹配到 {entity.wait_target}，超时继续执行")
-                    else:
-                        self.log.debug(f"wait_target 图片不存在: {entity.wait_target}")
+                            self.log.debug(f"wait_target 图片不存在: {entity.wait_target}")
                 self._log_message(entity)
                 if action_chain and entity.action:
-                    resolved = self._resolver.resolve_list(entity.action, entity.only_key)
-                    next_entities = [self.task_manage.get_entity(i) for i in resolved]
+                    next_entities = plan.static_next(self.task_manage.get_entity)
+                    if next_entities is None:
+                        resolved = self._resolver.resolve_list(entity.action, entity.only_key)
+                        next_entities = [self.task_manage.get_entity(i) for i in resolved]
                     if next_entities:
                         self.log.debug(f"获取下一执行链 {[i.only_key for i in next_entities]}")
-                    for i in next_entities:
-                        result = self.exec(i)
+                    with self._span("action", entity):
+                        for i in next_entities:
+                            result = self.exec(i)
                 if test_after is not None:
-                    if not self.in_location(entity.testFor_after):
+                    if settle_timeout > 0:
+                        self._settle(entity, settle_timeout)
+                    with self._span("testFor_after", entity):
+                        visible = self.in_location(entity.testFor_after, cutPoints=self._resolve_region(entity, "testFor_region"))
+                    if not visible:
                         self.log.debug(f"testFor_after {entity.testFor_after} 不可见，重新执行")
                         continue
                     self.log.debug(f"testFor_after {entity.testFor_after} 可见")
             finally:
                 self._screen_cache.set_ttl(old_ttl)
+                self._match_mode = old_mode
         return result
 
-    def _ocr_match_region(self, mt: MatchTemplete) -> str:
-        """从 MatchTemplete 结果中裁剪区域并执行 OCR，返回识别文本。"""
+    def _entity_sleep(self, plan: ExecPlan, entity: JczxSectionEntity, field: str) -> None:
+        """实体的 sleep 类字段。sleep.adaptive 开启时边等边采样画面：记录画面稳定耗时，
+        样本足够后按学习值提前结束等待（配置值为上限）。"""
+        seconds = plan.scalar(field)
+        stats = self.task_manage.sleep_stats
+        if seconds <= 0 or stats is None or not stats.enabled or not entity.only_key:
+            self._exec_mgr.token.sleep(seconds)
+            return
+        device = self.device_id or "default"
+        key = f"{entity.only_key}:{field}"
+        target = stats.suggest(device, key, seconds)
+        settled_at, settled = self._wait_settle(target, seconds)
+        # 等满配置值仍未稳定：按配置值记录，不能用最后一次变化的时刻（会把学习值拉低）
+        stats.record(device, key, settled_at if settled else seconds)
+        if target < seconds:
+            self.log.debug(f"自适应等待 {key}: 配置 {seconds}s → {target}s，"
+                           + (f"本次画面 {settled_at:.2f}s 后稳定" if settled else "本次画面未稳定"))
+
+    # 画面稳定检测的采样间隔（秒）与采样图缩小倍数
+    _SETTLE_STEP = 0.2
+    _SETTLE_SCALE = 4
+
+    def wait_settle(self, timeout: float, cutPoints=None) -> bool:
+        """等待画面（或 cutPoints 区域）稳定：相邻两次采样不再变化即返回 True，timeout 秒内未稳定返回 False。"""
+        _, settled = self._wait_settle(0, float(timeout), cutPoints)
+        return settled
+
+    def _settle(self, entity: JczxSectionEntity, timeout: float) -> None:
+        """实体 settle_timeout：动作后 / wait_target 命中后 / testFor_after 复检前等待画面稳定。"""
+        with self._span("settle", entity):
+            if self.wait_settle(timeout, self._resolve_region(entity, "settle_region")):
+                self.log.debug(f"画面已稳定 {entity.get_task_name()}")
+            else:
+                self.log.debug(f"画面 {timeout}s 内未稳定，继续执行 {entity.get_task_name()}")
+
+    def _settle_frame(self, cutPoints):
+        self._screen_cache.invalidate()
+        small = self._screen_cache.gray_downscaled(self._SETTLE_SCALE)
+        if cutPoints is None:
+            return small
+        s = self._SETTLE_SCALE
+        (x0, y0), (x1, y1) = cutPoints
+        return small[y0 // s:max(y1 // s, y0 // s + 1), x0 // s:max(x1 // s, x0 // s + 1)]
+
+    def _wait_settle(self, target: float, limit: float, cutPoints=None) -> tuple[float, bool]:
+        """至少等待 target 秒且画面已稳定，最长 limit 秒。
+
+        Returns:
+            (最后一次观察到画面变化的时刻（秒）, 是否在 limit 内稳定)
+        """
+        token = self._exec_mgr.token
+        step = self._SETTLE_STEP
+        start = time.monotonic()
+        prev = self._settle_frame(cutPoints)
+        changed_at = 0.0
+        # 真机一次截图就要 0.2~0.5s（不短于采样间隔），至少比较过一对画面才能判定稳定
+        compared = False
+        while True:
+            elapsed = time.monotonic() - start
+            if compared and elapsed >= target and elapsed - changed_at >= step:
+                return changed_at, True
+            if elapsed >= limit:
+                return changed_at, False
+            token.sleep(min(step, limit - elapsed))
+            frame = self._settle_frame(cutPoints)
+            if frame_delta(prev, frame) > SETTLE_THRESHOLD:
+                changed_at = time.monotonic() - start
+            prev = frame
+            compared = True
+
+    def _ocr_match_region(self, mt: MatchTemplete, mode: str = None) -> str:
+        """从 MatchTemplete 结果中裁剪区域并执行 OCR，返回识别文本。mode 见 _ocr_rec_only。"""
         pt_range = mt.matchTempletePointRange
         if pt_range is None:
             self.log.debug("OCR 裁剪失败: matchTempletePointRange 为 None")
@@ -823,14 +1367,38 @@ class JCZXGaming(Device):
         if self.ocr is None:
             self.log.warning("OCR 未初始化，无法识别")
             return ""
-        texts = self.ocr.readtext(cropped)
+        rec_only = self._ocr_rec_only(mode, cropped)
+        with self._span("ocr", cat="device"):
+            texts = self._ocr_recognize(cropped, rec_only)
         result = "".join(texts) if texts else ""
+        if self._ocr_corpus is not None:
+            # 识别为空的也记录：失败的裁剪图对准确率对比最有价值，标注由人工核对补全
+            self._ocr_corpus.add(cropped, result, OCR_REC if rec_only else OCR_FULL)
         if result:
-            self.log.debug(f"OCR 识别结果: {result}")
+            self.log.debug(f"OCR 识别结果{'（仅识别）' if rec_only else ''}: {result}")
         else:
             self.log.warning(f"OCR 识别为空: 裁剪区域 ({x0},{y0})-({x1},{y1}) 尺寸 {cropped.shape[1]}x{cropped.shape[0]}, 检查 target 坐标和 per 阈值是否正确")
         return result
 
+    def _ocr_rec_only(self, mode: Optional[str], cropped: MatLike) -> bool:
+        """ocr_mode 为 rec / full 时按指定；为空时矮于 ocr.rec_only.max_height 的横向裁剪图（单行文字）跳过检测。"""
+        if mode == OCR_REC:
+            return True
+        if mode == OCR_FULL:
+            return False
+        height, width = cropped.shape[:2]
+        return height <= self._ocr_rec_max_height and width >= height
+
+    def _ocr_recognize(self, cropped: MatLike, rec_only: bool = False) -> list[str]:
+        """OCR 为 OcrService 时提交后在等待识别期间截取下一帧（调试记录开启时不预取，保证记录的是识别所用的帧）。"""
+        submit = getattr(self.ocr, "submit", None)
+        if submit is None:
+            return recognize_batch(self.ocr, [cropped], rec_only)[0]
+        future = submit(cropped, rec_only)
+        if self._ocr_prefetch and self._recorder is None and self._screen_cache.ttl_ms > 0:
+            self._screen_cache.prefetch()
+        return future.result()
+
     @staticmethod
     def _convert_output(result, context_type: str):
         match context_type:
@@ -916,32 +1484,15 @@ class JCZXGaming(Device):
         if not section:
             return None
         self._exec_mgr.token.check()
-        if isinstance(section, str):
-            section = self._resolver.resolve(section, section)
-        entity = section if isinstance(section, JczxSectionEntity) else self.task_manage.get_entity(section)
-        match entity.type:
-            case SectionType.TASK.value:
-                result = self.exec_task(entity)
-            case SectionType.FUNC.value:
-                result = self.exec_func(entity)
-            case SectionType.CLICK.value:
-                result = self.exec_click(entity)
-            case SectionType.DYNAMIC.value:
-                result = self.exec_dynamic(entity)
-            case SectionType.MATCH.value:
-                result = self.exec_match(entity)
-            case SectionType.OCR.value:
-                result = self.exec_ocr(entity)
-            case SectionType.CONTEXT.value:
-                result = self.exec_context(entity)
-            case SectionType.CONDITION.value:
-                result = self.exec_condition(entity)
-            case SectionType.METHOD.value:
-                result = self.exec_method(entity)
-            case SectionType.CALL.value:
-                result = self.exec_call(entity)
-            case _:
-                return None
+        entity = self._named_entity(section) if isinstance(section, str) else section
+        handler = self._plan(entity).handler
+        if handler is None:
+            return None
+        if self._tracer is None:
+            result = handler(entity)
+        else:
+            with self._tracer.span(entity.only_key or entity.type, "entity", key=entity.only_key, type=entity.type):
+                result = handler(entity)
         if entity.context_key and entity.type != SectionType.CONTEXT.value and entity.type != SectionType.CONDITION.value:
             try:
                 match entity.context_type:
@@ -958,15 +1509,19 @@ class JCZXGaming(Device):
                 self.context_set(entity.context_key, str(result))
         return result
 
-    def _wait_for_image(self, img, max_wait: int, per: float = 0.8) -> bool:
+    def _wait_for_image(self, img, max_wait: int, per: float = 0.8, cutPoints=None) -> bool:
         start = time.monotonic()
+        gate = self._poll_gate()
         while True:
             self._exec_mgr.token.check()
-            if self.findImageCenterLocations(img, per=per):
-                return True
+            if gate is None or gate.should_match():
+                if self.findImageCenterLocations(img, cutPoints=cutPoints, per=per):
+                    return True
+                if gate is not None:
+                    gate.missed()
             if max_wait > 0 and time.monotonic() - start >= max_wait:
                 break
-            self._exec_mgr.token.sleep(0.3)
+            self._exec_mgr.token.sleep(gate.interval if gate is not None else self._POLL_INTERVAL)
         return False
 
     def get_resources_target(self, target: str):
@@ -980,6 +1535,10 @@ class JCZXGaming(Device):
             return self.exec_task(section)
         finally:
             self._context.clear()
+            if self.task_manage.hot_regions:
+                self.task_manage.hot_regions.save()
+            if self.task_manage.sleep_stats:
+                self.task_manage.sleep_stats.save()
 
     def exec_queue(self, queue_id: str, on_progress=None) -> None:
         queue = self.task_manage.get_queue(queue_id)
@@ -1001,9 +1560,9 @@ class JCZXGaming(Device):
             self.exec_task_raw(task_key)
         self.log.info(f"队列 [{queue.name}] 执行完毕")
 
-    def in_location(self, target: str, per: float = 0.8):
-        """检测指定图片是否在当前屏幕上可见，返回 bool。"""
-        list_pos = self.findImageCenterLocations(self.task_manage.get_img(target), per = float(per))
+    def in_location(self, target: str, per: float = 0.8, cutPoints=None):
+        """检测指定图片是否在当前屏幕上可见（cutPoints 限定搜索区域），返回 bool。"""
+        list_pos = self.findImageCenterLocations(self.task_manage.get_img(target), cutPoints=cutPoints, per = float(per))
         self.log.debug(f"查找资源 {target} 位置 {list_pos}")
         return bool(list_pos)
 
@@ -1083,6 +1642,23 @@ class JCZXGaming(Device):
     def string_concat(self, *args):
         return "".join(args)
 
+def create_ocr(cpu_threads: int = 0) -> OCR:
+    """创建 OCR 实例（TUI 进程与多进程模式的设备工作进程共用同一套参数）。
+
+    cpu_threads > 0 时限制推理线程数（cpu.ocr_threads），0 保持推理库默认。
+    """
+    from .CommonBuilder.CommonBuilder.Ocr.Ocr import OCR as OcrImpl
+    kwargs = {"cpu_threads": cpu_threads} if cpu_threads > 0 else {}
+    return OcrImpl(
+        use_textline_orientation = False,
+        use_doc_orientation_classify = False,
+        lang = 'ch',
+        device = 'cpu',
+        engine = 'onnxruntime',
+        **kwargs,
+    )
+
+
 class RichLogHandler(Handler):
     """仅当 RichLog 已在底部时自动滚动；高频日志写入合并到一个定时回调中处理。"""
 
@@ -1144,6 +1720,24 @@ class JczxCli:
         debug_dir = os.path.join(self._program_dir(), "screenHistory")
         self._debug_recorder = DebugRecorder(mode, debug_dir, self.logger)
         self._debug_recorder.ensure_dir()
+        # OCR 裁剪图语料：所有设备共用，多进程模式的工作进程不记录
+        self._ocr_corpus: Optional[OcrCorpus] = None
+        if (self.config.get_config(opt="debug.ocr_corpus") or "off") == "on":
+            self._ocr_corpus = OcrCorpus(os.path.join(self._program_dir(), "ocrCorpus"), self.logger)
+        # 多设备：每个 serial 一个引擎，共享 task_manage / OCR；默认设备（self.adb）初始化后登记
+        try:
+            pool_size = int(self.config.get_config(opt="device.pool.size") or "4")
+        except (TypeError, ValueError):
+            pool_size = 4
+        self.pool = DevicePool(self._create_device, pool_size, self.logger)
+        # CPU 预算：OpenCV 线程数对本进程全部设备生效，多进程模式另行传给工作进程
+        try:
+            self._cv_threads = int(self.config.get_config(opt="cpu.cv_threads") or "-1")
+        except (TypeError, ValueError):
+            self._cv_threads = -1
+        apply_cv_threads(self._cv_threads)
+        # 多进程模式（device.mode : process）：任务/队列在每台设备各自的工作进程中执行，本进程只做监督
+        self.supervisor: Optional[WorkerSupervisor] = None
         self.rich_log = RichLog(id="console", highlight=True, auto_scroll=False)
         self._running_future: Optional[Future] = None
         self._settings_task_id: Optional[str] = None
@@ -1166,8 +1760,8 @@ class JczxCli:
     @error_exception
     def _init_something(self):
         self.thread_pool_run(self._init_device, self._init_ocr, self._init_mcp)
-        if self.device:
-            self.device.set_ocr(self.ocr)
+        for serial in self.pool.serials:
+            self.pool.get(serial).set_ocr(self.ocr)
 
     def thread_pool_run(self, *args: Callable):
         futures = [self.executor.submit(i) for i in args]
@@ -1208,6 +1802,55 @@ class JczxCli:
     def _running_task_id(self) -> str | None:
         return self.device._exec_mgr.task_id if self.device else None
 
+    _FILE_NAME_PATTERN = re.compile(r'[\\/:*?"<>|\s]+')
+
+    def _bind_serial(self, device: JCZXGaming, serial: str) -> None:
+        """把引擎绑定到 serial：更新 device_id，取分辨率与 u2 连接；取不到分辨率抛 RuntimeError（不能留下 size=None 的引擎）。"""
+        device.device_id = serial
+        try:
+            device.size = device.getScreenSize()
+        except Exception as e:
+            raise RuntimeError(f"设备 {serial} 获取分辨率失败: {e}") from e
+        if not device.size:
+            raise RuntimeError(f"设备 {serial} 获取分辨率失败")
+        try:
+            device._init_u2_device()
+        except Exception as e:
+            device.log.warning(f"uiautomator2 初始化失败，使用 ADB 截图与点击: {e}")
+
+    def connected_serials(self) -> list[str]:
+        """ADB 当前连接的设备 serial，获取失败返回空列表。"""
+        if self.adb is None:
+            return []
+        try:
+            return self.adb.get_device_names()
+        except Exception as e:
+            self.logger.warning(f"获取设备列表失败: {e}")
+            return []
+
+    def _create_device(self, serial: str) -> JCZXGaming:
+        """设备池工厂：为默认设备以外的 serial 新建引擎，共享 task_manage 与 OCR，日志带 [serial] 前缀，调试截图按设备分目录。
+
+        serial 不在 ADB 已连接列表中或绑定失败时抛 RuntimeError，不进设备池。
+        """
+        if self.adb is None:
+            raise RuntimeError("ADB 未初始化")
+        if serial not in self.connected_serials():
+            raise RuntimeError(f"设备 {serial} 未连接")
+        log = DeviceLog(self.logger, serial)
+        device = JCZXGaming(self.adb.adb_path, device_id=serial, log=log, task_manage=self.task_manage)
+        self._bind_serial(device, serial)
+        device._init_emu_strategy()
+        if self.ocr:
+            device.set_ocr(self.ocr)
+        device._ocr_corpus = self._ocr_corpus
+        mode = self.config.get_config(opt="debug.screenshot.mode") or "off"
+        if mode != DebugRecorder.MODE_OFF:
+            debug_dir = os.path.join(self._program_dir(), "screenHistory", self._FILE_NAME_PATTERN.sub("_", serial))
+            device._recorder = DebugRecorder(mode, debug_dir, log)
+            device._recorder.ensure_dir()
+        return device
+
     def _reconnect_adb(self) -> None:
         """adb 对象已存在时重新建立连接（模拟器重启后旧 TCP 传输失效）。
 
@@ -1256,9 +1899,9 @@ class JczxCli:
             if self.adb:
                 self._reconnect_adb()
             elif self.fm.isfile(adb_path):
-                self.adb = JCZXGaming(adb_path, log = self.logger)
+                self.adb = JCZXGaming(adb_path, log = self.logger, task_manage = self.task_manage)
             else:
-                self.adb = JCZXGaming(log = self.logger)
+                self.adb = JCZXGaming(log = self.logger, task_manage = self.task_manage)
                 self.config.set_config(opt="adb.path", val=self.adb.adb_path)
                 self.config.save()
         except IndexError:
@@ -1271,14 +1914,21 @@ class JczxCli:
                 self.adb.device_id = device_names[0]
                 self.adb.size = self.adb.getScreenSize()
                 self.adb._init_u2_device()
-            self.device = self.adb
+            # 当前选中的是设备池中的其他设备且仍在线时保持选中
+            if self.device is None or self.device is self.adb or self.device.device_id not in device_names:
+                self.device = self.adb
         else:
             self.logger.info("ADB当前无可连接设备")
             return
         self.logger.info(f"ADB加载完成 {self.device.device_id}")
+        self.pool.add(self.adb.device_id, self.adb)
+        self.pool.sync(device_names)
+        self._init_supervisor(device_names)
         if self.ocr:
             self.device.set_ocr(self.ocr)
-        self.device._recorder = self._debug_recorder
+        # 共享的 DebugRecorder 只属于默认设备；设备池中的其他设备在 _create_device 中各有按 serial 分目录的记录器与同一份 OCR 语料
+        self.adb._recorder = self._debug_recorder
+        self.adb._ocr_corpus = self._ocr_corpus
         if self.device.u2_device:
             self.logger.debug(f"截图方式: U2 Screenshot")
         else:
@@ -1288,19 +1938,72 @@ class JczxCli:
         else:
             self.logger.debug("设备分辨率未知")
 
+    def _init_supervisor(self, device_names: list[str]) -> None:
+        if (self.config.get_config(opt="device.mode") or "thread") != "process":
+            return
+        if self.supervisor is None:
+            try:
+                max_restarts = int(self.config.get_config(opt="device.worker.max_restarts") or "3")
+            except (TypeError, ValueError):
+                max_restarts = 3
+            try:
+                cores = int(self.config.get_config(opt="cpu.affinity.cores") or "2")
+            except (TypeError, ValueError):
+                cores = 2
+            options = {"adb_path": self.adb.adb_path, "config_dir": "", "log_level": self.logger.level,
+                       "cv_threads": self._cv_threads, "ocr_threads": self._ocr_threads(),
+                       "ocr_service": self._ocr_service_options(),
+                       "affinity": self.config.get_config(opt="cpu.affinity") or AFFINITY_OFF, "affinity_cores": cores}
+            self.supervisor = WorkerSupervisor(options, self.logger, on_change=self._on_workers_changed,
+                                               on_done=self._on_worker_done, max_restarts=max_restarts)
+            self.logger.info("多进程模式：每台设备在独立工作进程中执行任务/队列")
+        self.supervisor.sync(device_names)
+
+    def _on_workers_changed(self) -> None:
+        """工作进程状态 / 进度变化（监督线程上调用），TUI 覆盖以刷新界面。"""
+
+    def _on_worker_done(self, serial: str, job_id: str, kind: str, status: str) -> None:
+        """工作进程中的任务/队列结束（监督线程上调用），TUI 覆盖以复位按钮。"""
+
+    def device_status(self) -> list[dict]:
+        """各设备执行状态（多进程模式取自工作进程，否则取自设备池）。"""
+        return self.supervisor.status() if self.supervisor else self.pool.status()
+
+    def device_busy(self, serial: str) -> bool:
+        return self.supervisor.is_running(serial) if self.supervisor else self.pool.is_running(serial)
+
+    def stop_device(self, serial: str = None) -> None:
+        """停止某台设备（或全部设备）上的任务/队列。"""
+        if self.supervisor:
+            self.supervisor.stop(serial)
+        self.pool.stop(serial)
+
     def _init_ocr(self):
         if self.ocr:
             return
         self.logger.info("初始化OCR...")
-        from .CommonBuilder.CommonBuilder.Ocr.Ocr import OCR
-        self.ocr = OCR(
-            use_textline_orientation = False,
-            use_doc_orientation_classify = False,
-            lang = 'ch',
-            device = 'cpu',
-            engine = 'onnxruntime',
-        )
-        self.logger.info("OCR初始化完成")
+        threads = self._ocr_threads()
+        options = self._ocr_service_options()
+        self.ocr = OcrService(lambda: create_ocr(threads), log=self.logger, **options)
+        self.logger.info(f"OCR初始化完成 会话数 {self.ocr.sessions}")
+
+    def _ocr_service_options(self) -> dict:
+        """OCR 服务参数（ocr.sessions / ocr.queue.size / ocr.batch.size / ocr.batch.wait），多进程模式同样传给工作进程。"""
+        options = {}
+        for opt, key, default in (("ocr.sessions", "sessions", 1), ("ocr.queue.size", "max_queue", 32),
+                                  ("ocr.batch.size", "batch_size", 8), ("ocr.batch.wait", "batch_wait", 10)):
+            try:
+                options[key] = int(self.config.get_config(opt=opt) or default)
+            except (TypeError, ValueError):
+                options[key] = default
+        options["batch_wait"] /= 1000
+        return options
+
+    def _ocr_threads(self) -> int:
+        try:
+            return int(self.config.get_config(opt="cpu.ocr_threads") or "0")
+        except (TypeError, ValueError):
+            return 0
 
     def _init_mcp(self):
         try:
@@ -1352,6 +2055,12 @@ class JczxTUI(App, JczxCli):
 
     def action_quit(self) -> None:
         self._stop_running_task()
+        self.pool.shutdown()
+        if self.supervisor:
+            self.supervisor.shutdown(timeout=3)
+        if isinstance(self.ocr, OcrService):
+            self.ocr.shutdown(timeout=3)
+        self.task_manage.stop_watch()
         self.executor.shutdown(wait=False, cancel_futures=True)
         self.exit()
 
@@ -1372,6 +2081,7 @@ class JczxTUI(App, JczxCli):
     def _init_after_mount(self) -> None:
         """在后台线程执行 初始化，完成后回主线程刷新 UI."""
         self._init_something()
+        self.task_manage.start_watch(self._on_files_reloaded)
         self.call_from_thread(self._update_device_bar)
         self.call_from_thread(lambda: setattr(self, '_initialized', True))
 
@@ -1413,22 +2123,19 @@ class JczxTUI(App, JczxCli):
         )
         self.config.set_config(opt="adb.port", val=event.port)
         self.config.save()
-        # 真正切换设备：更新 device_id，重取分辨率与 u2 连接（此前只存端口、不切换）
-        if self.adb and event.device and event.device != self.adb.device_id:
-            old = self.adb.device_id
-            self.adb.device_id = event.device
-            old_size = self.adb.size
-            self.adb.size = None
+        # 切换当前设备：取设备池中该 serial 的引擎（首次选中时创建），原设备上执行中的任务/队列不受影响
+        if self.adb and event.device and event.device != "__none__" and (
+                self.device is None or event.device != self.device.device_id):
+            old = self.device.device_id if self.device else ""
             try:
-                self.adb.size = self.adb.getScreenSize()
+                self.device = self.pool.acquire(event.device)
             except Exception as e:
-                self.adb.size = old_size  # 失败保留旧值，避免 size=None 崩溃
-                self.logger.warning(f"刷新设备分辨率失败: {e}")
-            try:
-                self.adb._init_u2_device()
-            except Exception:
-                pass
-            self.logger.info(f"设备已切换: {old} → {self.adb.device_id}")
+                self.logger.error(f"切换设备失败 {event.device}: {e}")
+                return
+            self.logger.info(f"设备已切换: {old} → {self.device.device_id}")
+            self._refresh_queue_progress()
+            if not self.device_busy(self.device.device_id):
+                self.query_one("#queue-panel", QueuePanel).reset_toggle()
         self.logger.info("配置已保存到文件")
 
     def on_device_bar_refresh_pressed(self, event: DeviceBar.RefreshPressed) -> None:
@@ -1471,8 +2178,11 @@ class JczxTUI(App, JczxCli):
         config_path = self.fm.get_obj_relative_path("Config/Config.txt", self)
         self.config = Config(config_path).Config
         self.task_manage.refresh_config()
-        if self.device:
-            self.device.task_manage.refresh_config()
+
+    def _on_files_reloaded(self, paths: set[str]) -> None:
+        """监视线程回调：任务 / 队列配置热重载后刷新面板（图片变化无需刷新 UI）。"""
+        if any(p.lower().endswith(".txt") for p in paths):
+            self.call_from_thread(self._refresh_all_panels)
 
     def _refresh_all_panels(self) -> None:
         self._populate_task_list()
@@ -1521,48 +2231,92 @@ class JczxTUI(App, JczxCli):
                 self.logger.warning("OCR 未初始化完成，无法启动任务")
                 return False
         executor = self.device or self.adb
-        if executor._exec_mgr.is_running():
-            self.logger.warning("已有任务/队列正在执行，请先停止")
+        if executor._exec_mgr.is_running() or (executor.device_id and self.device_busy(executor.device_id)):
+            self.logger.warning("当前设备已有任务/队列正在执行，请先停止")
             return False
         entity = self.task_manage.get_task(task_id)
         if not entity:
             self.logger.error("任务实体不存在: %s", task_id)
             return False
-        executor._exec_mgr.start(task_id)
+        if self.supervisor and executor is self.device:
+            if error := self.supervisor.start_task(executor.device_id, task_id):
+                self.logger.warning(error)
+                return False
+        elif executor is self.device:
+            # 在设备池线程上执行，不同设备的任务可并行
+            if not self.pool.start(executor.device_id, task_id, lambda device: self._run_task(device, entity, task_id),
+                                   on_done=lambda serial, job: self.call_from_thread(self._on_task_finished, job)):
+                self.logger.warning("当前设备已有任务/队列正在执行，请先停止")
+                return False
+        else:
+            executor._exec_mgr.start(task_id)
+            self._running_future = self.executor.submit(self._run_emu_task, executor, entity, task_id)
         self.logger.info("任务启动: %s", entity.get_task_name())
-        self._running_future = self.executor.submit(self._run_task, entity, task_id, is_emu)
+        self._refresh_queue_progress()
         return True
 
     def _stop_running_task(self) -> None:
         if self.device:
-            self.device._exec_mgr.stop()
+            self.stop_device(self.device.device_id)
         elif self.adb:
             self.adb._exec_mgr.stop()
         self.logger.info("任务已停止")
         try:
-            panel = self.query_one("#queue-panel", QueuePanel)
-            panel.clear_progress()
-            panel.reset_toggle()
+            self.query_one("#queue-panel", QueuePanel).reset_toggle()
         except Exception:
             pass
 
-    def _run_task(self, entity: JczxSectionEntity, task_id: str, is_emu: bool = False) -> None:
-        executor = self.device or (self.adb if is_emu else None)
+    def _run_task(self, executor: JCZXGaming, entity: JczxSectionEntity, task_id: str) -> None:
+        tracer = self._start_trace(executor, task_id)
+        # 运行期间该任务的模板按设备登记常驻，结束后才释放，不受其他设备启动/选中影响
+        scope = self.task_manage.job_scope(f"job:{executor.device_id}", [task_id])
         try:
-            executor.exec_task_raw(entity)
+            with scope:
+                executor.exec_task_raw(entity)
         except TaskCancelledError:
-            self.logger.info("任务已取消: %s", entity.get_task_name())
+            executor.log.info("任务已取消: %s", entity.get_task_name())
         except Exception as e:
-            self.logger.error("任务执行异常: %s", e)
+            executor.log.error("任务执行异常: %s", e)
+        finally:
+            self._save_trace(executor, tracer, task_id)
+
+    def _run_emu_task(self, executor: JCZXGaming, entity: JczxSectionEntity, task_id: str) -> None:
+        """设备未连接时在 ADB 对象上执行的任务（启动模拟器），不经设备池。"""
+        try:
+            self._run_task(executor, entity, task_id)
         finally:
             self.call_from_thread(self._on_task_finished, task_id)
 
+    def _start_trace(self, executor: JCZXGaming, name: str) -> Optional[ExecTracer]:
+        """debug.trace 为 chrome / speedscope 时为本次运行挂上追踪器。"""
+        fmt = self.config.get_config(opt="debug.trace") or "off"
+        if executor is None or fmt not in (FORMAT_CHROME, FORMAT_SPEEDSCOPE):
+            return None
+        tracer = ExecTracer(name, self.logger)
+        executor._tracer = tracer
+        return tracer
+
+    def _save_trace(self, executor: JCZXGaming, tracer: Optional[ExecTracer], name: str) -> None:
+        if tracer is None:
+            return
+        executor._tracer = None
+        fmt = self.config.get_config(opt="debug.trace") or FORMAT_CHROME
+        suffix = ".speedscope.json" if fmt == FORMAT_SPEEDSCOPE else ".trace.json"
+        if executor.device_id:
+            name = f"{name}-{executor.device_id}"
+        file_name = f"{datetime.now():%Y%m%d-%H%M%S}-{self._FILE_NAME_PATTERN.sub('_', name)}{suffix}"
+        try:
+            tracer.save(os.path.join(self._program_dir(), "traces", file_name), fmt)
+        except OSError as e:
+            self.logger.warning(f"执行追踪保存失败: {e}")
+
     def _on_task_finished(self, task_id: str) -> None:
+        """任务结束回调（主线程）：设备池中的任务由设备池复位执行状态，此处只处理模拟器重连与按钮复位。"""
         is_emu = (task_id == "emu")
-        executor = self.device or self.adb
-        if executor and executor._exec_mgr.task_id != task_id:
-            return
-        if executor:
+        executor = self.adb
+        if not self.device and executor:
+            if executor._exec_mgr.task_id != task_id:
+                return
             executor._exec_mgr.reset()
         if is_emu:
             self.logger.info("模拟器启动完成，重启 ADB 服务...")
@@ -1578,6 +2332,7 @@ class JczxTUI(App, JczxCli):
             if card._task_id == task_id:
                 card.reset_toggle()
         self._running_future = None
+        self._refresh_queue_progress()
 
     def on_task_card_settings_pressed(self, event: TaskCard.SettingsPressed) -> None:
         if not getattr(self, '_initialized', False):
@@ -1625,12 +2380,7 @@ class JczxTUI(App, JczxCli):
         self.task_manage.save_task_values(self._settings_task_id, event.values)
         self.logger.info("任务设置已保存: task=%s, values=%s",
                          self._settings_task_id, event.values)
-        if self.device is not None:
-            self.device.task_manage.menu_config = self.task_manage.menu_config
-            self.logger.debug("已同步配置到设备端")
-            self.device._init_emu_strategy()
-        elif self.adb is not None:
-            self.adb.task_manage.menu_config = self.task_manage.menu_config
+        if self.adb is not None:
             self.adb._init_emu_strategy()
 
     # ── QueuePanel handlers ──────────────────────────────
@@ -1649,6 +2399,10 @@ class JczxTUI(App, JczxCli):
         else:
             self._stop_running_task()
 
+    def on_queue_panel_selected(self, event: QueuePanel.Selected) -> None:
+        """选中队列即在后台预加载其任务可达的模板，开始执行时无需再逐张解码。"""
+        self.task_manage.preload_queue(event.queue_id)
+
     def on_queue_panel_edit_requested(self, event: QueuePanel.EditRequested) -> None:
         if not getattr(self, '_initialized', False):
             return
@@ -1673,9 +2427,6 @@ class JczxTUI(App, JczxCli):
             queue_id = self._editing_queue_id
             self.task_manage.delete_queue(queue_id)
             self.logger.info("队列已删除: %s", queue_id)
-            if self.device is not None:
-                self.device.task_manage.queue_config = self.task_manage.queue_config
-                self.device.task_manage.load_queues()
             self._refresh_queue_panel()
             return
         name = result.get("name", "")
@@ -1686,10 +2437,6 @@ class JczxTUI(App, JczxCli):
         queue_id = self._editing_queue_id or f"queue-{name}"
         self.task_manage.save_queue(queue_id, name, task_keys)
         self.logger.info("队列已保存: %s (%d 个任务)", name, len(task_keys))
-        if self.device is not None:
-            self.device.task_manage.queue_config = self.task_manage.queue_config
-            self.device.task_manage.load_queues()
-            self.logger.debug("已同步队列配置到设备端")
         self._refresh_queue_panel()
         self.query_one("#queue-panel", QueuePanel).select_queue(queue_id)
 
@@ -1698,50 +2445,85 @@ class JczxTUI(App, JczxCli):
         panel.set_queues(self._get_queue_options())
 
     def _start_queue(self, queue_id: str) -> bool:
-        if not self.device:
-            self.logger.warning("设备未就绪，无法启动队列")
-            return False
+        error = self.start_queue(queue_id)
+        if error:
+            self.logger.warning(error)
+        return not error
+
+    def start_queue(self, queue_id: str, serial: str = None) -> str:
+        """在指定设备（默认当前设备）上启动队列，成功返回空字符串，失败返回原因。TUI 与 MCP 共用，可在任意线程调用。"""
+        if self.supervisor:
+            return self._start_worker_queue(queue_id, serial or (self.device.device_id if self.device else None))
         if not self.ocr:
-            self.logger.warning("OCR 未初始化完成，无法启动队列")
-            return False
-        if self.device._exec_mgr.is_running():
-            self.logger.warning("已有任务/队列正在执行，请先停止")
-            queue_panel = self.query_one("#queue-panel", QueuePanel)
-            queue_panel.reset_toggle()
-            return False
+            return "OCR 未初始化完成，无法启动队列"
+        try:
+            device = self.pool.acquire(serial) if serial else self.device
+        except Exception as e:
+            return f"设备 {serial} 连接失败: {e}"
+        if not device:
+            return "设备未就绪，无法启动队列"
         queue = self.task_manage.get_queue(queue_id)
         if not queue:
-            self.logger.error("队列不存在: %s", queue_id)
-            return False
-        self.device._exec_mgr.start(queue_id)
-        self.logger.info("队列启动: %s", queue.name)
-        self._running_future = self.executor.submit(self._run_queue, queue_id)
-        return True
+            return f"队列不存在: {queue_id}"
+        if not self.pool.start(device.device_id, queue_id, lambda d: self._run_queue(d, queue_id),
+                               on_done=lambda s, job: self.call_from_thread(self._on_queue_finished, s)):
+            return f"设备 {device.device_id} 已有任务/队列正在执行，请先停止"
+        self.logger.info("队列启动: %s（设备 %s）", queue.name, device.device_id)
+        return ""
+
+    def _start_worker_queue(self, queue_id: str, serial: Optional[str]) -> str:
+        if not serial:
+            return "设备未就绪，无法启动队列"
+        if serial not in self.connected_serials():
+            return f"设备 {serial} 未连接"
+        queue = self.task_manage.get_queue(queue_id)
+        if not queue:
+            return f"队列不存在: {queue_id}"
+        if error := self.supervisor.start_queue(serial, queue_id):
+            return error
+        self.logger.info("队列启动: %s（设备 %s，工作进程）", queue.name, serial)
+        return ""
+
+    def _on_workers_changed(self) -> None:
+        self.call_from_thread(self._refresh_queue_progress)
+
+    def _on_worker_done(self, serial: str, job_id: str, kind: str, status: str) -> None:
+        if kind == JOB_TASK:
+            self.call_from_thread(self._on_task_finished, job_id)
+        else:
+            self.call_from_thread(self._on_queue_finished, serial)
 
-    def _run_queue(self, queue_id: str) -> None:
+    def _run_queue(self, device: JCZXGaming, queue_id: str) -> None:
+        tracer = self._start_trace(device, queue_id)
+        serial = device.device_id
+        queue = self.task_manage.get_queue(queue_id)
+        scope = self.task_manage.job_scope(f"job:{serial}", queue.tasks if queue else [])
         try:
-            self.device.exec_queue(queue_id, on_progress=lambda name, i, n, tn:
-                self.call_from_thread(self._on_queue_progress, name, i, n, tn))
+            with scope:
+                device.exec_queue(queue_id, on_progress=lambda name, i, n, tn:
+                    self._on_device_progress(serial, f"{name} {i + 1}/{n} {tn}"))
         except TaskCancelledError:
-            self.logger.info("队列已取消: %s", queue_id)
+            device.log.info("队列已取消: %s", queue_id)
         except Exception as e:
-            self.logger.error("队列执行异常: %s", e)
+            device.log.error("队列执行异常: %s", e)
         finally:
-            self.call_from_thread(self._on_queue_finished, queue_id)
+            self._save_trace(device, tracer, queue_id)
 
-    def _on_queue_finished(self, queue_id: str) -> None:
-        if self.device and self.device._exec_mgr.task_id != queue_id:
-            return
-        if self.device:
-            self.device._exec_mgr.reset()
-        panel = self.query_one("#queue-panel", QueuePanel)
-        panel.reset_toggle()
-        panel.clear_progress()
-        self._running_future = None
+    def _on_device_progress(self, serial: str, text: str) -> None:
+        self.pool.set_progress(serial, text)
+        self.call_from_thread(self._refresh_queue_progress)
+
+    def _on_queue_finished(self, serial: str) -> None:
+        self._refresh_queue_progress()
+        if self.device and self.device.device_id == serial:
+            self.query_one("#queue-panel", QueuePanel).reset_toggle()
 
-    def _on_queue_progress(self, name: str, idx: int, total: int, task_name: str) -> None:
+    def _refresh_queue_progress(self) -> None:
+        """队列面板显示所有执行中设备的进度，当前设备在前。"""
+        current = self.device.device_id if self.device else None
+        runs = sorted((st for st in self.device_status() if st["running"]), key=lambda st: st["serial"] != current)
         try:
             panel = self.query_one("#queue-panel", QueuePanel)
-            panel.update_progress(name, idx, total, task_name)
         except Exception:
-            pass
+            return
+        panel.update_progress([f"{st['serial']}: {st['progress'] or st['job']}  CPU {st['cpu']:.1f}s" for st in runs])
@@ -0,0 +1,60 @@
+"""多进程共用的 JSON 文件：合并写入。
+
+多进程模式下每个工作进程各自加载同一个 JSON（等待时间统计、热区索引），
+整文件覆盖写会让最后退出的进程抹掉其他进程学到的数据。保存时在文件锁内重新读取磁盘上的内容，
+只把本进程改动过的部分合并进去，再原子替换。
+"""
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Callable
+
+
+@contextmanager
+def file_lock(path: str):
+    """以 path + ".lock" 为锁文件的进程间互斥锁（阻塞等待）。"""
+    with open(path + ".lock", "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            # LK_LOCK 失败会重试 10 次（约 10 秒）后抛 OSError
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def read_json(path: str) -> dict:
+    """读取 JSON 对象；文件不存在返回空字典，内容损坏抛 ValueError。"""
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"不是 JSON 对象: {path}")
+    return data
+
+
+def merge_save(path: str, merge: Callable[[dict], dict]) -> dict:
+    """文件锁内读取磁盘上的当前内容（损坏视为空），merge(当前内容) 返回要写入的内容，原子替换后返回该内容。"""
+    with file_lock(path):
+        try:
+            current = read_json(path)
+        except (OSError, ValueError):
+            current = {}
+        data = merge(current)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    return data
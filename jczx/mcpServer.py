@@ -14,7 +14,7 @@ from mcp.server.mcpserver.utilities.types import Image
 class JczxMcpServer:
     """包装 MCPServer，注册 4 个设备操作工具，复用 JczxCli/设备现有实现。
 
-    host 需提供: ``host.device``（JCZXGaming 或 None）、``host.logger``。
+    host 需提供: ``host.device``（JCZXGaming 或 None）、``host.logger``；多设备工具另需 ``host.pool``（DevicePool）与 ``host.start_queue``。
     """
 
     def __init__(self, host, port: int, logger: logging.Logger):
@@ -24,7 +24,8 @@ class JczxMcpServer:
         self._mcp = MCPServer(
             "jczx-tui",
             instructions=(
-                "管理交错战线游戏设备的工具集（需 TUI 运行且设备已连接，所有操作作用于 TUI 当前选中的设备）。\n"
+                "管理交错战线游戏设备的工具集（需 TUI 运行且设备已连接）。设备类工具的 device 参数为 ADB serial，"
+                "缺省作用于 TUI 当前选中的设备；list_devices 列出设备与各自的执行进度，不同设备可用 run_queue 并行执行队列。\n"
                 "当 debug.screenshot.mode 为 annotated 时，click/swipe/drag 会额外保存标注截图到 screenHistory 目录，"
                 "操作未生效时可在其中查看操作位置历史。"
             ),
@@ -35,41 +36,41 @@ class JczxMcpServer:
 
     def _register_tools(self):
         @self._mcp.tool()
-        def screenshot() -> Image:
+        def screenshot(device: str | None = None) -> Image:
             """截取当前设备屏幕并返回 PNG 图片。"""
-            return self._do_screenshot()
+            return self._do_screenshot(device=device)
 
         @self._mcp.tool()
-        def click(target: str, per: float = 0.8) -> str:
+        def click(target: str, per: float = 0.8, device: str | None = None) -> str:
             """点击设备屏幕上的目标图片：先用 crop_screenshot 裁切 + save_screenshot 保存的区域截图路径作为 target，工具会模板匹配该图并点击其中心，无需预估坐标。
             当 debug.screenshot.mode 为 annotated 时，会保存标注截图到 screenHistory 目录，显式标出点击位置，可在其中查看操作历史（操作未生效时用于排查）。"""
-            return self._do_click(target, per)
+            return self._do_click(target, per, device=device)
 
         @self._mcp.tool()
-        def swipe(x1: int, y1: int, x2: int, y2: int, duration: int = 200) -> str:
+        def swipe(x1: int, y1: int, x2: int, y2: int, duration: int = 200, device: str | None = None) -> str:
             """从 (x1,y1) 滑动到 (x2,y2)，duration 毫秒。当 debug.screenshot.mode 为 annotated 时，会保存标注滑动轨迹的截图到 screenHistory 目录，可在其中查看操作历史（操作未生效时用于排查）。"""
-            return self._do_swipe(x1, y1, x2, y2, duration)
+            return self._do_swipe(x1, y1, x2, y2, duration, device=device)
 
         @self._mcp.tool()
-        def drag(x1: int, y1: int, x2: int, y2: int, duration: int = 200) -> str:
+        def drag(x1: int, y1: int, x2: int, y2: int, duration: int = 200, device: str | None = None) -> str:
             """从 (x1,y1) 拖拽到 (x2,y2)，duration 毫秒。当 debug.screenshot.mode 为 annotated 时，会保存标注拖动轨迹的截图到 screenHistory 目录，可在其中查看操作历史（操作未生效时用于排查）。"""
-            return self._do_drag(x1, y1, x2, y2, duration)
+            return self._do_drag(x1, y1, x2, y2, duration, device=device)
 
         @self._mcp.tool()
-        def get_resolution() -> dict:
+        def get_resolution(device: str | None = None) -> dict:
             """获取当前设备分辨率（宽/高）。"""
-            return self._do_get_resolution()
+            return self._do_get_resolution(device=device)
 
         @self._mcp.tool()
-        def crop_screenshot(x1: int, y1: int, x2: int, y2: int) -> Image:
+        def crop_screenshot(x1: int, y1: int, x2: int, y2: int, device: str | None = None) -> Image:
             """裁切当前设备画面：左上角 (x1,y1) 到右下角 (x2,y2)，返回裁切后的 PNG 图片。"""
-            return self._do_crop_screenshot(x1, y1, x2, y2)
+            return self._do_crop_screenshot(x1, y1, x2, y2, device=device)
 
         @self._mcp.tool()
         def save_screenshot(name: str, x1: int | None = None, y1: int | None = None,
-                            x2: int | None = None, y2: int | None = None) -> str:
+                            x2: int | None = None, y2: int | None = None, device: str | None = None) -> str:
             """保存当前画面为 PNG 到 template 目录（与截图任务保存路径一致）。name 为文件名（不含扩展名）；可选 x1,y1,x2,y2 裁切区域，缺省保存全屏。"""
-            return self._do_save_screenshot(name, x1, y1, x2, y2)
+            return self._do_save_screenshot(name, x1, y1, x2, y2, device=device)
 
         @self._mcp.tool()
         def get_screenshot_mode() -> str:
@@ -77,7 +78,7 @@ class JczxMcpServer:
             return self._do_get_screenshot_mode()
 
         @self._mcp.tool()
-        def run_entity(args: list[str]) -> str:
+        def run_entity(args: list[str], device: str | None = None) -> str:
             """按 section 名称执行一个或多个实体（task/click/match/func/method/call 等），按列表顺序依次执行。
 
 常用实体（均可直接作为 args 元素）：
@@ -100,12 +101,27 @@ class JczxMcpServer:
 - screenshot-task：截图
 
 执行任务实体时无需关注中间过程：大多数任务实体会自行完成导航与操作，并在执行完成后自动返回主界面；直接执行即可。"""
-            return self._do_run_entity(*args)
+            return self._do_run_entity(*args, device=device)
+
+        @self._mcp.tool()
+        def list_devices() -> list[dict]:
+            """列出已连接的设备：serial、是否为 TUI 当前设备、是否执行中、任务/队列 id、进度、已运行秒数。"""
+            return self._do_list_devices()
+
+        @self._mcp.tool()
+        def run_queue(queue_id: str, device: str | None = None) -> str:
+            """在指定设备（缺省为 TUI 当前设备）上后台启动队列并立即返回，进度用 list_devices 查看。不同设备的队列可同时执行。"""
+            return self._do_run_queue(queue_id, device=device)
+
+        @self._mcp.tool()
+        def stop_device(device: str | None = None) -> str:
+            """停止指定设备（缺省为 TUI 当前设备）上正在执行的任务/队列。"""
+            return self._do_stop_device(device=device)
 
     # ── 工具实现（可直接单测）──
 
-    def _do_screenshot(self) -> Image:
-        device = self._device()
+    def _do_screenshot(self, device=None) -> Image:
+        device = self._device(device)
         self._logger.debug("MCP 工具调用 [screenshot]")
         ok, buf = cv2.imencode(".png", device.screenshot())
         if not ok:
@@ -113,10 +129,10 @@ class JczxMcpServer:
         self._logger.debug(f"MCP 工具调用 [screenshot] 完成 -> {len(buf)} 字节 PNG")
         return Image(data=buf.tobytes(), format="png")
 
-    def _do_click(self, target, per=0.8) -> str:
-        device = self._device()
+    def _do_click(self, target, per=0.8, device=None) -> str:
+        device = self._device(device)
         self._logger.debug(f"MCP 工具调用 [click] target={target} per={per}")
-        self._warn_if_busy("点击")
+        self._warn_if_busy(device, "点击")
         path = self._resolve_target_path(target)
         img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
         if img is None:
@@ -136,24 +152,24 @@ class JczxMcpServer:
         fm = getattr(self._host, "fm", None)
         return fm.join_p(target) if fm is not None else os.path.join(os.getcwd(), target)
 
-    def _do_swipe(self, x1, y1, x2, y2, duration=200) -> str:
-        device = self._device()
+    def _do_swipe(self, x1, y1, x2, y2, duration=200, device=None) -> str:
+        device = self._device(device)
         self._logger.debug(f"MCP 工具调用 [swipe] ({x1},{y1}) -> ({x2},{y2}) duration={duration}")
-        self._warn_if_busy("滑动")
+        self._warn_if_busy(device, "滑动")
         device.swipe(x1, y1, x2, y2, duration)
         self._logger.debug(f"MCP 工具调用 [swipe] 完成 -> 已滑动 ({x1},{y1}) -> ({x2},{y2})")
         return f"已滑动 ({x1},{y1}) -> ({x2},{y2})"
 
-    def _do_drag(self, x1, y1, x2, y2, duration=200) -> str:
-        device = self._device()
+    def _do_drag(self, x1, y1, x2, y2, duration=200, device=None) -> str:
+        device = self._device(device)
         self._logger.debug(f"MCP 工具调用 [drag] ({x1},{y1}) -> ({x2},{y2}) duration={duration}")
-        self._warn_if_busy("拖动")
+        self._warn_if_busy(device, "拖动")
         device.dragAndDrop(x1, y1, x2, y2, duration)
         self._logger.debug(f"MCP 工具调用 [drag] 完成 -> 已拖动 ({x1},{y1}) -> ({x2},{y2})")
         return f"已拖动 ({x1},{y1}) -> ({x2},{y2})"
 
-    def _do_get_resolution(self) -> dict:
-        device = self._device()
+    def _do_get_resolution(self, device=None) -> dict:
+        device = self._device(device)
         self._logger.debug("MCP 工具调用 [get_resolution]")
         size = getattr(device, "size", None)
         if not size or len(size) < 2:
@@ -161,8 +177,8 @@ class JczxMcpServer:
         self._logger.debug(f"MCP 工具调用 [get_resolution] 完成 -> {size[0]}x{size[1]}")
         return {"width": int(size[0]), "height": int(size[1])}
 
-    def _do_crop_screenshot(self, x1, y1, x2, y2) -> Image:
-        device = self._device()
+    def _do_crop_screenshot(self, x1, y1, x2, y2, device=None) -> Image:
+        device = self._device(device)
         self._logger.debug(f"MCP 工具调用 [crop_screenshot] ({x1},{y1}) -> ({x2},{y2})")
         img = device.screenshot()
         h, w = img.shape[:2]
@@ -178,8 +194,8 @@ class JczxMcpServer:
         self._logger.debug(f"MCP 工具调用 [crop_screenshot] 完成 -> {len(buf)} 字节 PNG ({x2-x1}x{y2-y1})")
         return Image(data=buf.tobytes(), format="png")
 
-    def _do_save_screenshot(self, name: str, x1=None, y1=None, x2=None, y2=None) -> str:
-        device = self._device()
+    def _do_save_screenshot(self, name: str, x1=None, y1=None, x2=None, y2=None, device=None) -> str:
+        device = self._device(device)
         self._logger.debug(f"MCP 工具调用 [save_screenshot] name={name} crop=({x1},{y1})-({x2},{y2})")
         img = device.screenshot()
         has_crop = any(v is not None for v in (x1, y1, x2, y2))
@@ -217,10 +233,10 @@ class JczxMcpServer:
         self._logger.debug(f"MCP 工具调用 [get_screenshot_mode] 完成 -> {mode}")
         return mode
 
-    def _do_run_entity(self, *names: str) -> str:
-        device = self._device()
+    def _do_run_entity(self, *names: str, device=None) -> str:
+        device = self._device(device)
         self._logger.debug(f"MCP 工具调用 [run_entity] names={names}")
-        self._warn_if_busy("执行实体")
+        self._warn_if_busy(device, "执行实体")
         for name in names:
             if not name or not isinstance(name, str):
                 raise RuntimeError(f"实体名称无效: {name!r}")
@@ -229,16 +245,72 @@ class JczxMcpServer:
         self._logger.debug(f"MCP 工具调用 [run_entity] 完成 -> {names}")
         return f"已执行实体: {', '.join(names)}"
 
+    def _do_list_devices(self) -> list[dict]:
+        self._logger.debug("MCP 工具调用 [list_devices]")
+        current = getattr(self._host, "device", None)
+        current_id = current.device_id if current is not None else None
+        # 多进程模式下状态来自工作进程（host.device_status），否则来自设备池
+        status = getattr(self._host, "device_status", None) or self._pool().status
+        devices = [dict(st, current=st["serial"] == current_id) for st in status()]
+        self._logger.debug(f"MCP 工具调用 [list_devices] 完成 -> {len(devices)} 台")
+        return devices
+
+    def _do_run_queue(self, queue_id: str, device=None) -> str:
+        self._logger.debug(f"MCP 工具调用 [run_queue] queue={queue_id} device={device}")
+        start_queue = getattr(self._host, "start_queue", None)
+        if start_queue is None:
+            raise RuntimeError("当前宿主不支持队列执行")
+        if device:
+            self._check_connected(device)
+        error = start_queue(queue_id, device)
+        if error:
+            raise RuntimeError(error)
+        return f"队列 {queue_id} 已在设备 {device or self._device().device_id} 上启动"
+
+    def _do_stop_device(self, device=None) -> str:
+        serial = device or self._device().device_id
+        self._logger.debug(f"MCP 工具调用 [stop_device] device={serial}")
+        stop = getattr(self._host, "stop_device", None)
+        if stop is not None:
+            stop(serial)
+        else:
+            self._device(serial)._exec_mgr.stop()
+        return f"已停止设备 {serial} 上的任务"
+
     # ── 辅助 ──
 
-    def _device(self):
+    def _pool(self):
+        pool = getattr(self._host, "pool", None)
+        if pool is None:
+            raise RuntimeError("当前宿主不支持多设备")
+        return pool
+
+    def _check_connected(self, serial: str) -> None:
+        """serial 须在 ADB 已连接设备列表中：写错或离线的 serial 不创建引擎、不进设备池。"""
+        connected = getattr(self._host, "connected_serials", None)
+        if connected is None:
+            return
+        serials = connected()
+        if serial not in serials:
+            raise RuntimeError(f"设备 {serial} 未连接，已连接设备: {', '.join(serials) or '无'}")
+
+    def _device(self, serial: str | None = None):
+        """serial 为空时取 TUI 当前设备，否则取设备池中该 serial 的引擎（首次使用时创建，须已连接）。"""
+        if serial:
+            self._check_connected(serial)
+            try:
+                return self._pool().acquire(serial)
+            except RuntimeError:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"设备 {serial} 连接失败: {e}") from e
         device = getattr(self._host, "device", None)
         if device is None:
             raise RuntimeError("设备未连接")
         return device
 
-    def _warn_if_busy(self, action: str) -> None:
-        mgr = getattr(self._device(), "_exec_mgr", None)
+    def _warn_if_busy(self, device, action: str) -> None:
+        mgr = getattr(device, "_exec_mgr", None)
         if mgr is not None and getattr(mgr, "is_running", lambda: False)():
             self._logger.warning(f"agent 在任务执行期间调用 MCP 工具[{action}]，可能干扰自动化")
 
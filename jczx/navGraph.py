@@ -0,0 +1,120 @@
+"""场景导航图：带 scene_to 的实体（多为 click-*）是图上的边，从当前场景规划到目标场景的最短执行序列。
+
+- scene_from 为空或 ``*`` 的边可从任意场景（含无法识别的场景）出发，如 goto-home
+- 边的代价 = 1 + pre_sleep + sleep（秒），优先选耗时短的路线
+- 场景标志图：指向该场景的边的 scene_marker / wait_target，以及同名的 locations 场景模板
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .configEntity import JczxSectionEntity
+
+ANY_SCENE = "*"
+
+
+@dataclass(frozen=True)
+class Edge:
+    src: str
+    dst: str
+    # 执行该边的实体 key
+    key: str
+    cost: float
+
+
+def _static(value) -> Optional[str]:
+    """不含占位符的字符串值（占位符值无法在建图时确定）。"""
+    return value if isinstance(value, str) and value and "{" not in value else None
+
+
+def _cost(entity: JczxSectionEntity) -> float:
+    cost = 1.0
+    for name in ("pre_sleep", "sleep"):
+        value = getattr(entity, name)
+        if isinstance(value, (int, float)):
+            cost += value
+    return cost
+
+
+class NavGraph:
+    def __init__(self, edges: list[Edge], markers: dict[str, list[str]]):
+        self.edges = edges
+        self.markers = markers
+        self._out: dict[str, list[Edge]] = {}
+        for edge in edges:
+            self._out.setdefault(edge.src, []).append(edge)
+
+    @classmethod
+    def from_entities(cls, entities: Iterable[tuple[str, object]], scene_targets: dict[str, str] = None) -> "NavGraph":
+        """
+        Args:
+            entities: 实体池 (key, 实体)，非 JczxSectionEntity 的条目忽略
+            scene_targets: 场景索引 id → 模板 key，场景名与之同名时作为标志图
+        """
+        edges: list[Edge] = []
+        markers: dict[str, list[str]] = {}
+        for key, entity in entities:
+            if not isinstance(entity, JczxSectionEntity) or not (dst := _static(entity.scene_to)):
+                continue
+            sources = [s.strip() for s in entity.scene_from or () if s and s.strip()]
+            for src in sources or [ANY_SCENE]:
+                edges.append(Edge(src, dst, key, _cost(entity)))
+            found = markers.setdefault(dst, [])
+            for value in (entity.scene_marker, entity.wait_target):
+                if (marker := _static(value)) and marker not in found:
+                    found.append(marker)
+        for scene, target in (scene_targets or {}).items():
+            if scene in markers and target not in markers[scene]:
+                markers[scene].append(target)
+        return cls(edges, markers)
+
+    @property
+    def scenes(self) -> list[str]:
+        return list(self.markers)
+
+    def depth(self) -> dict[str, int]:
+        """从任意场景可直达的场景（如主界面）深度为 0，逐层加 1；不可达的场景不在结果中。"""
+        depth = {edge.dst: 0 for edge in self._out.get(ANY_SCENE, [])}
+        frontier = list(depth)
+        while frontier:
+            nxt = []
+            for scene in frontier:
+                for edge in self._out.get(scene, []):
+                    if edge.dst not in depth:
+                        depth[edge.dst] = depth[scene] + 1
+                        nxt.append(edge.dst)
+            frontier = nxt
+        return depth
+
+    def locate_order(self) -> list[str]:
+        """识别当前场景时的优先级：深层菜单通常仍显示上层的导航按钮，越深越优先。"""
+        depth = self.depth()
+        return sorted((s for s in self.markers if self.markers[s]), key=lambda s: -depth.get(s, -1))
+
+    def plan(self, start: Optional[str], goal: str) -> Optional[list[Edge]]:
+        """Dijkstra 最短路径；start 为 None 表示当前场景未知（第一步只能走任意场景出发的边）。不可达返回 None。"""
+        if start == goal:
+            return []
+        any_edges = self._out.get(ANY_SCENE, [])
+        best: dict[Optional[str], float] = {start: 0.0}
+        prev: dict[str, tuple[Optional[str], Edge]] = {}
+        heap: list[tuple[float, int, Optional[str]]] = [(0.0, 0, start)]
+        counter = 1
+        while heap:
+            cost, _, scene = heapq.heappop(heap)
+            if scene == goal:
+                path = []
+                while scene != start:
+                    scene, edge = prev[scene]
+                    path.append(edge)
+                return path[::-1]
+            if cost > best.get(scene, float("inf")):
+                continue
+            for edge in (self._out.get(scene, []) if scene is not None else []) + any_edges:
+                total = cost + edge.cost
+                if total < best.get(edge.dst, float("inf")):
+                    best[edge.dst] = total
+                    prev[edge.dst] = (scene, edge)
+                    heapq.heappush(heap, (total, counter, edge.dst))
+                    counter += 1
+        return None
@@ -0,0 +1,179 @@
+"""OCR 服务：有界队列 + 若干 OCR 会话（推理实例）的识别线程，同一进程内所有设备共享。
+
+- 提交裁剪图返回 Future，调用方可在识别期间做别的事（如截取下一帧）
+- 识别线程取到一张图后在 batch_wait 内继续收集，最多 batch_size 张合并为一次识别调用
+- 队列满时提交方阻塞等待（背压），不会无限堆积裁剪图
+- 实现了 readtext，可直接作为引擎的 ocr 使用（同步调用 = 提交后等待结果）
+- 仅识别模式（rec_only）：单行裁剪图跳过检测与方向分类，直接送入识别模型
+
+onnxruntime 推理期间释放 GIL，识别线程可与任务线程、其他会话并行，因此用线程而非进程（免去模型在进程间复制与图像序列化）。
+"""
+import inspect
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from logging import Logger
+from typing import Any, Callable, Optional
+
+from cv2.typing import MatLike
+
+# ocr 实体的 ocr_mode：full = 检测 + 识别，rec = 跳过检测直接识别（单行裁剪图），为空按裁剪图尺寸自动选择
+OCR_FULL = "full"
+OCR_REC = "rec"
+
+def supports_rec_only(ocr) -> bool:
+    """OCR 实例的 readtext 是否有 det 参数（jczxTyping._OCR 接口，det=False 时跳过检测只做识别）。"""
+    try:
+        return "det" in inspect.signature(ocr.readtext).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+def recognize_batch(ocr, images: list[MatLike], rec_only: bool = False) -> list[list[str]]:
+    """一次识别多张图，返回每张图的文本列表。
+
+    rec_only 且 OCR 支持时逐张 readtext(det=False, cls=False)（不支持时走完整流程）；
+    否则 OCR 实例有 predict（PaddleOCR 管线，可接收图片列表）时整批调用，没有时逐张 readtext。
+    """
+    if rec_only and supports_rec_only(ocr):
+        return [ocr.readtext(img, det=False, cls=False) for img in images]
+    predict = getattr(ocr, "predict", None)
+    if callable(predict) and len(images) > 1:
+        data = predict(images)
+        if data is not None and len(data) == len(images):
+            return [list(item.get("rec_texts", [])) if item else [] for item in data]
+    return [ocr.readtext(img) for img in images]
+
+
+class OcrService:
+    """
+    Args:
+        factory: 创建一个 OCR 会话（如 create_ocr），每个识别线程一个
+        sessions: 会话数（识别线程数），每个会话各占一份模型内存
+        max_queue: 排队中的裁剪图上限
+        batch_size: 单次识别调用最多合并的图片数，1 = 不合并
+        batch_wait: 取到第一张图后等待更多图片合并的时间（秒）
+    """
+
+    def __init__(self, factory: Callable[[], Any], sessions: int = 1, max_queue: int = 32,
+                 batch_size: int = 8, batch_wait: float = 0.01, log: Logger = None):
+        self.log = log if log else Logger("OcrService")
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait)
+        self.max_queue = max(1, max_queue)
+        # 队列本身不设上限：排队上限由 submit 在 _not_full 内检查，关闭标记（None）入队不会被阻塞
+        self._queue: queue.Queue = queue.Queue()
+        # 关闭检查与入队在同一把锁内完成，shutdown 之后不会再有图片排到关闭标记后面
+        self._not_full = threading.Condition()
+        self._closed = False
+        # 会话在构造时依次创建：加载失败直接抛出，与直接创建 OCR 实例一致
+        self._sessions = [factory() for _ in range(max(1, sessions))]
+        self._threads = [threading.Thread(target=self._worker, args=(ocr,), daemon=True, name=f"jczx-ocr-{i}")
+                         for i, ocr in enumerate(self._sessions)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def pending(self) -> int:
+        """排队中（尚未被识别线程取走）的图片数。"""
+        return self._queue.qsize()
+
+    def submit(self, img: MatLike, rec_only: bool = False) -> Future:
+        """提交一张图，Future 结果为文本列表（同 readtext）；队列满时阻塞，服务关闭后抛 RuntimeError。
+
+        rec_only: 单行裁剪图跳过检测，直接识别（会话不支持时走完整流程）
+        """
+        future = Future()
+        with self._not_full:
+            while not self._closed and self._queue.qsize() >= self.max_queue:
+                self._not_full.wait()
+            if self._closed:
+                raise RuntimeError("OCR 服务已关闭")
+            self._queue.put((img, bool(rec_only), future))
+        return future
+
+    def readtext(self, img: MatLike, det: bool = True, *args, **kwargs) -> list[str]:
+        """同步识别（兼容 OCR 接口），det=False 为仅识别模式，其余参数忽略。"""
+        return self.submit(img, rec_only=not det).result()
+
+    def _taken(self) -> None:
+        """识别线程取走一张图，唤醒一个等待队列空位的提交方。"""
+        with self._not_full:
+            self._not_full.notify()
+
+    def _take_batch(self) -> Optional[list[tuple[MatLike, bool, Future]]]:
+        item = self._queue.get()
+        if item is None:
+            return None
+        self._taken()
+        batch = [item]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # 关闭标记留给下一次取批（或其他识别线程）
+                self._queue.put(None)
+                break
+            self._taken()
+            batch.append(item)
+        return batch
+
+    def _worker(self, ocr) -> None:
+        while (batch := self._take_batch()) is not None:
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            for rec_only in (True, False):
+                group = [(img, future) for img, mode, future in batch if mode is rec_only]
+                if group:
+                    self._recognize(ocr, group, rec_only)
+
+    def _recognize(self, ocr, group: list[tuple[MatLike, Future]], rec_only: bool) -> None:
+        try:
+            results = recognize_batch(ocr, [img for img, _ in group], rec_only)
+        except Exception as e:
+            self.log.error(f"OCR 识别异常: {e}")
+            for _, future in group:
+                future.set_exception(e)
+            return
+        for (_, future), texts in zip(group, results):
+            future.set_result(texts)
+
+    def shutdown(self, timeout: float = 0) -> None:
+        """停止接收新图片，取消排队中的图片，识别中的批次完成后线程退出。
+
+        timeout: 等待识别线程退出的总时长（秒），0 = 不等待
+        """
+        with self._not_full:
+            self._closed = True
+            self._not_full.notify_all()
+        self._cancel_pending()
+        for _ in self._threads:
+            self._queue.put_nowait(None)
+        deadline = time.monotonic() + max(0.0, timeout)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        # 线程退出后再清一次：不应再有遗留，有则取消，保证每个 Future 都有结果
+        self._cancel_pending()
+
+    def _cancel_pending(self) -> None:
+        """取消排队中的图片；取出的关闭标记放回，留给尚未退出的识别线程。"""
+        stops = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stops += 1
+            else:
+                item[2].cancel()
+        for _ in range(stops):
+            self._queue.put_nowait(None)
@@ -0,0 +1,53 @@
+"""界面识别索引：resources/locations 下的全部位置模板即场景，一帧内批量匹配得到当前场景 id。
+
+场景 id 为模板文件名（不含扩展名）。旧版 inLocation* 中写死了搜索区域与阈值的模板沿用这些区域并优先判定，
+其余模板全屏匹配（命中过的模板由热区索引收窄搜索范围）。
+"""
+from dataclasses import dataclass
+from typing import Iterable
+
+SCENE_DIR = "locations"
+DEFAULT_PER = 0.9
+
+# 旧版 jczx.py inLocation* 的区域（网格写法同实体 region）与阈值，按表顺序决定多个场景同时命中时的优先级
+KNOWN_REGIONS: dict[str, tuple[str, float]] = {
+    "onFight": ("cut4x3|0,0", 0.5),
+    "fightWin": ("cut2x2|0,0", DEFAULT_PER),
+    "fightLoss1": ("cut2x2|0,0", DEFAULT_PER),
+    "illusionAward": ("cut9x2|8,0", DEFAULT_PER),
+    "inIllusions": ("cut4x3|0,2", DEFAULT_PER),
+    "illusions": ("cut3x4|0,3", DEFAULT_PER),
+    "enoughSmallCrytal": ("cut3x7|0,6", DEFAULT_PER),
+    "choiceFriendTP": ("cut3x3|0,0", DEFAULT_PER),
+    "whateverTradingPost": ("cut7x2|0,1", DEFAULT_PER),
+    "friendTradingPost": ("cut7x2|0,1", DEFAULT_PER),
+    "tradingPost": ("cut7x2|0,1", DEFAULT_PER),
+    "gladiatorialArena": ("cut3x1|2,0", DEFAULT_PER),
+    "assaultPlan": ("cut3x7|2,6", DEFAULT_PER),
+    "levels": ("cut3x3|1,1", DEFAULT_PER),
+    "activities": ("cut3x3|1,0", DEFAULT_PER),
+}
+
+
+@dataclass(frozen=True)
+class Scene:
+    id: str
+    # 资源 key，如 locations\fightWin.png
+    target: str
+    # 搜索区域文本（同实体 region），None = 全屏 / 热区
+    region: str | None
+    per: float
+
+
+def scene_id(file_name: str) -> str:
+    return file_name.rsplit(".", 1)[0]
+
+
+def build_scenes(file_names: Iterable[str]) -> list[Scene]:
+    """locations 目录下的文件名 → 按优先级排列的场景：有已知区域的按 KNOWN_REGIONS 顺序在前，其余按 id 排序。"""
+    by_id = {scene_id(name): name for name in file_names if name.lower().endswith(".png")}
+    scenes = [Scene(sid, f"{SCENE_DIR}\\{by_id[sid]}", region, per)
+              for sid, (region, per) in KNOWN_REGIONS.items() if sid in by_id]
+    scenes += [Scene(sid, f"{SCENE_DIR}\\{by_id[sid]}", None, DEFAULT_PER)
+               for sid in sorted(by_id) if sid not in KNOWN_REGIONS]
+    return scenes
@@ -1,16 +1,42 @@
+from .adaptiveSleep import SleepStats
 from .configEntity import JczxConfigFileEntity, JczxSectionEntity, JczxSettingEntity, SectionType
 from .CommonBuilder.CommonBuilder.FileTools.ConfigUtils import Config, TxtConfig, FileManage
 from .CommonBuilder.CommonBuilder.FileTools.Base.Variable import DictVariable
-
+from .entityCache import EntityCache
+from .fileWatcher import FileWatcher
+from .hotRegion import HotRegionIndex
+from .templatePack import PACK_NAME, TemplatePack, parse_levels
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
 from logging import Logger
-from typing import Optional
+from typing import Callable, Iterable, Optional
+import os
 import re
+import threading
 
 import cv2
 
 from cv2.typing import MatLike
 from dataclasses import dataclass
 
+# TUI 选中任务/队列时的常驻范围；运行中的作业以设备序列号等为 owner 另行登记
+SCOPE_SELECTED = "selected"
+
+def _synchronized(method):
+    """TUI 与设备引擎共用同一个 TaskManage：配置读写与刷新互斥。
+
+    引擎每步都调用的 get_task / get_entity / _resolve_placeholder（缓存命中）不加锁：
+    实体池、设置索引、解析缓存只在锁内整体替换，读取方拿到的引用要么是完整的旧对象，要么是完整的新对象。
+    """
+    @wraps(method)
+    def wrapper(self: "TaskManage", *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 @dataclass
 class QueueEntity:
     id: str
@@ -19,6 +45,7 @@ class QueueEntity:
 
 class TaskManage:
     def __init__(self, config_dir: str, log: Logger = None):
+        self._lock = threading.RLock()
         # 创建默认配置
         self.fm = FileManage(FileManage(__file__).work_path)
         self.default_config_dir = self.fm.get_obj_relative_path("Config", self)
@@ -34,12 +61,40 @@ class TaskManage:
         # 图片池
         self._entity_source: dict[str, str] = {}
         self._external_configs: list = []
-        self.img_pool = DictVariable()
+        # 图片池：选中任务/队列可达的图片常驻（_img_pinned），其余按需加载的走 LRU（_img_lru）
+        self.img_pool: OrderedDict[str, MatLike] = OrderedDict()
+        self._img_names: dict[int, tuple[MatLike, str]] = {}
+        self._img_pinned: set[str] = set()
+        self._img_lru: OrderedDict[str, None] = OrderedDict()
+        self._img_lock = threading.RLock()
+        self._img_loader: Optional[ThreadPoolExecutor] = None
+        # 常驻范围：TUI 选中（SCOPE_SELECTED）与各设备运行中的作业分别登记，常驻图片为全部范围的并集
+        self._img_scopes: dict[str, list[str]] = {}
+        self._task_images: dict[str, frozenset[str]] = {}
+        self.hot_regions: HotRegionIndex = None
+        self.sleep_stats: SleepStats = None
+        self._entity_cache: EntityCache = None
+        self.template_pack: Optional[TemplatePack] = None
+        # 热重载后内容已变、模板包中已过期的图片 key（下次完整刷新重建模板包时清空）
+        self._stale_pack_keys: set[str] = set()
+        self._watcher: Optional[FileWatcher] = None
+        # 不开监视线程的进程（多进程模式的工作进程）用它在每次作业前比对文件快照
+        self._file_tracker: Optional[FileWatcher] = None
+        # 本进程自己写入的配置文件 → 写入后的 (size, mtime_ns)，监视线程据此跳过这些变化
+        self._own_writes: dict[str, tuple[int, int]] = {}
+        # 实体池每次（完整或增量）重载后递增，执行端据此丢弃基于旧实体的缓存
+        self.entity_version = 0
+        # ${section:option} 取值的扁平索引（(section, option) → 值，缺失记 None）与解析结果缓存，
+        # menu_config 重建 / 保存设置后 settings_version 递增
+        self._settings_index: dict[tuple[str, str], Optional[str]] = {}
+        self._placeholder_memo: dict[tuple[str, Optional[str]], str] = {}
+        self.settings_version = 0
         self.entity_pool = DictVariable()
         self.task_pool = DictVariable()
         self.log = log if log else Logger("TaskManage")
         self.ready_env()
     
+    @_synchronized
     def ready_env(self):
         if self.config_dir:
             self.fm.makedirs(self.config_dir)
@@ -48,10 +103,18 @@ class TaskManage:
             config_path = self.fm.join_p("Config", "Config.txt")
             self.fm.cp(config_path, self.main_config_path)
         self.main_config = Config(self.main_config_path).Config
+        self._init_hot_regions()
+        self._init_sleep_stats()
+        self._entity_cache = EntityCache(
+            self.fm.join(self.config_dir, "EntityCache.pickle", seq="\\"),
+            enabled=self.get_main_option("config.cache", "on") == "on",
+            log=self.log,
+        )
         if not self.fm.isfile(self.menu_config_path):
             menu_config_path = self.fm.join_p("Config", "MainMenu.txt")
             self.fm.cp(menu_config_path, self.menu_config_path)
         self.menu_config = Config(self.menu_config_path).Config
+        self._rebuild_settings_index()
         self.queue_config_path = self.fm.join(self.config_dir, "Queues.txt", seq="\\")
         if not self.fm.isfile(self.queue_config_path):
             queue_config_path = self.fm.join_p("Config", "Queues.txt")
@@ -65,6 +128,45 @@ class TaskManage:
         self.log.debug("刷新配置文件")
         self.ready_env()
 
+    def get_main_option(self, opt: str, default: str = "") -> str:
+        """读取 Config.txt 选项，缺键/空值回退默认（旧版用户配置可能缺少新增选项）。"""
+        try:
+            return self.main_config.get_config(opt=opt) or default
+        except (KeyError, TypeError, ValueError):
+            return default
+
+    def _init_hot_regions(self):
+        if self.hot_regions:
+            self.hot_regions.save()
+        try:
+            margin = int(self.get_main_option("match.hot_region.margin", "40"))
+        except ValueError:
+            margin = 40
+        self.hot_regions = HotRegionIndex(
+            self.fm.join(self.config_dir, "HotRegions.json", seq="\\"),
+            margin=margin,
+            enabled=self.get_main_option("match.hot_region", "on") == "on",
+            log=self.log,
+        )
+
+    def _init_sleep_stats(self):
+        if self.sleep_stats:
+            self.sleep_stats.save()
+        try:
+            pct = float(self.get_main_option("sleep.adaptive.percentile", "90"))
+            min_samples = int(self.get_main_option("sleep.adaptive.min_samples", "5"))
+            margin = float(self.get_main_option("sleep.adaptive.margin", "0.2"))
+        except ValueError:
+            pct, min_samples, margin = 90, 5, 0.2
+        self.sleep_stats = SleepStats(
+            self.fm.join(self.config_dir, "SleepStats.json", seq="\\"),
+            percentile=pct,
+            min_samples=min_samples,
+            margin=margin,
+            enabled=self.get_main_option("sleep.adaptive", "off") == "on",
+            log=self.log,
+        )
+
     @staticmethod
     def read_gray_img(img_path: str) -> MatLike:
         return cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
@@ -75,66 +177,240 @@ class TaskManage:
         return str(self.fm.get_obj_relative_path(rel_path, self))
     
     def load_img_pool(self):
-        """加载图片缓冲池
+        """重置图片缓冲池并重建 任务 → 图片 反向索引。
 
-        Args:
-            reboot (bool, optional): 是否重载图片. Defaults to False.
+        不再预加载全部实体的图片：任务/队列被选中时 preload_task / preload_queue 后台加载其可达图片，
+        其余由 get_img 按需加载。刷新配置时重新预加载当前登记的全部范围（选中的与运行中的）。
         """
-        self.img_pool.clear()
-        self.log.debug("开始加载图片缓冲池")
-        configs = self.entity_pool
-        put_size, fail_size = 0, 0
-        for config_entity in configs.values():
-            target = config_entity.target
-            if target:
-                if self._load_img_to_pool(target):
-                    put_size += 1
-                else:
-                    fail_size += 1
-            if config_entity.testFor_before:
-                if self._load_img_to_pool(config_entity.testFor_before):
-                    put_size += 1
-                else:
-                    fail_size += 1
-            if config_entity.testFor_after:
-                if self._load_img_to_pool(config_entity.testFor_after):
-                    put_size += 1
-                else:
-                    fail_size += 1
-            if config_entity.wait_target:
-                if self._load_img_to_pool(config_entity.wait_target):
-                    put_size += 1
-                else:
-                    fail_size += 1
-        self.log.debug(f"图片缓冲池加载完成，成功加载 {put_size} 张图片，失败 {fail_size} 张图片")
-
-    def _load_img_to_pool(self, target: str) -> bool:
-        if target in self.img_pool:
-            return True
+        with self._img_lock:
+            self.img_pool.clear()
+            self._img_names.clear()
+            self._img_pinned.clear()
+            self._img_lru.clear()
+        self._open_template_pack()
+        self._build_img_index()
+        self._preload_scopes()
+
+    def _build_img_index(self):
+        self._task_images = {key: frozenset(self.collect_images([key])) for key in self.task_pool}
+        total = len(set().union(*self._task_images.values())) if self._task_images else 0
+        self.log.debug(f"图片反向索引已建立：{len(self._task_images)} 个任务，共引用 {total} 张图片")
+
+    # 实体间引用：action 链、条件分支、match 引用、call 目标、extend 父实体
+    _REF_LIST_FIELDS = ("action", "condition_then", "condition_else")
+    _REF_FIELDS = ("match", "fn", "extend")
+    _IMG_FIELDS = ("target", "testFor_before", "testFor_after", "wait_target")
+    # 元素可以是实体 key 也可以是图片路径（wait_any 的 targets）
+    _REF_OR_IMG_LIST_FIELDS = ("targets",)
+
+    def collect_images(self, keys: Iterable[str]) -> set[str]:
+        """从给定实体出发，沿 action / condition_then/else / match / fn / extend / targets 传递收集可达图片。
+
+        含运行期占位符（@{} / %{} / &{}）的引用无法静态确定，跳过，由 get_img 按需加载。
+        """
+        images: set[str] = set()
+        visited: set[str] = set()
+        stack = list(keys)
+        while stack:
+            key = stack.pop()
+            if key in visited:
+                continue
+            visited.add(key)
+            entity = self.get_entity(key)
+            if entity is None:
+                continue
+            for name in self._IMG_FIELDS:
+                value = self._static_ref(getattr(entity, name), key)
+                if value and self.fm.isfile(self.get_resources_target(value)):
+                    images.add(value)
+            for name in self._REF_LIST_FIELDS:
+                stack.extend(ref for ref in (self._static_ref(v, key) for v in getattr(entity, name) or []) if ref)
+            for name in self._REF_FIELDS:
+                if ref := self._static_ref(getattr(entity, name), key):
+                    stack.append(ref)
+            for name in self._REF_OR_IMG_LIST_FIELDS:
+                for ref in (self._static_ref(v, key) for v in getattr(entity, name) or []):
+                    if not ref:
+                        continue
+                    if self.get_entity(ref) is not None:
+                        stack.append(ref)
+                    elif self.fm.isfile(self.get_resources_target(ref)):
+                        images.add(ref)
+        return images
+
+    def _static_ref(self, value, key: str) -> str | None:
+        if not value or not isinstance(value, str):
+            return None
+        value = self._resolve_placeholder(value, key)
+        return None if "{" in value else value
+
+    def get_task_images(self, task_key: str) -> frozenset[str]:
+        return self._task_images.get(task_key, frozenset())
+
+    def get_queue_images(self, queue_id: str) -> frozenset[str]:
+        queue = self.get_queue(queue_id)
+        if not queue:
+            return frozenset()
+        return frozenset().union(*(self.get_task_images(k) for k in queue.tasks))
+
+    def preload_task(self, task_key: str, owner: str = SCOPE_SELECTED) -> list[Future]:
+        """TUI 选中任务时调用：后台线程池加载该任务可达的全部图片并常驻。"""
+        return self.preload_tasks([task_key], owner)
+
+    def preload_queue(self, queue_id: str, owner: str = SCOPE_SELECTED) -> list[Future]:
+        queue = self.get_queue(queue_id)
+        return self.preload_tasks(queue.tasks if queue else [], owner)
+
+    def preload_tasks(self, task_keys: list[str], owner: str = SCOPE_SELECTED) -> list[Future]:
+        """替换 owner 的常驻范围：owner 之前范围内、其他范围也不用的图片降级进 LRU。"""
+        with self._img_lock:
+            self._img_scopes[owner] = list(task_keys)
+        return self._preload_scopes()
+
+    def release_scope(self, owner: str) -> None:
+        """作业结束时调用：撤销 owner 的常驻范围，其他范围仍在用的图片继续常驻。"""
+        with self._img_lock:
+            if self._img_scopes.pop(owner, None) is not None:
+                self._pin_scopes()
+
+    @contextmanager
+    def job_scope(self, owner: str, task_keys: list[str]):
+        """作业执行期间常驻其可达图片；其他设备启动或选中别的任务/队列不会把它们降级进 LRU。"""
+        self.preload_tasks(task_keys, owner)
+        try:
+            yield
+        finally:
+            self.release_scope(owner)
+
+    def _pin_scopes(self) -> list[str]:
+        """常驻图片改为全部范围的并集，返回尚未加载的图片（需持有 _img_lock）。"""
+        names = frozenset().union(*(self.get_task_images(k) for keys in self._img_scopes.values() for k in keys))
+        # 不再被任何范围引用的图片降级进 LRU，而不是立即丢弃（可能马上又被选中）
+        for name in self._img_pinned - names:
+            if name in self.img_pool:
+                self._touch_lru(name)
+        self._img_pinned = set(names)
+        for name in names:
+            self._img_lru.pop(name, None)
+        self._evict_lru()
+        return [name for name in names if name not in self.img_pool]
+
+    def _preload_scopes(self) -> list[Future]:
+        with self._img_lock:
+            pending = self._pin_scopes()
+        if not pending:
+            return []
+        self.log.debug(f"后台预加载 {len(pending)} 张图片（{', '.join(self._img_scopes)}）")
+        loader = self._get_img_loader()
+        return [loader.submit(self._load_img_to_pool, name) for name in pending]
+
+    def _get_img_loader(self) -> ThreadPoolExecutor:
+        if self._img_loader is None:
+            try:
+                workers = int(self.get_main_option("thread.max_workers", "4"))
+            except ValueError:
+                workers = 4
+            self._img_loader = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="img-loader")
+        return self._img_loader
+
+    def _img_cache_size(self) -> int:
+        try:
+            return int(self.get_main_option("match.img_cache.size", "128"))
+        except ValueError:
+            return 128
+
+    def _touch_lru(self, name: str):
+        self._img_lru[name] = None
+        self._img_lru.move_to_end(name)
+
+    def _evict_lru(self):
+        limit = self._img_cache_size()
+        while len(self._img_lru) > max(0, limit):
+            name, _ = self._img_lru.popitem(last=False)
+            img = self.img_pool.pop(name, None)
+            if img is not None:
+                self._img_names.pop(id(img), None)
+
+    def _load_img_to_pool(self, target: str) -> MatLike | None:
+        """加载图片进池并返回；文件不存在返回 None。"""
+        if (img := self.img_pool.get(target)) is not None:
+            return img
         rel_target = self.get_resources_target(target)
         if not self.fm.isfile(rel_target):
             self.log.debug(f"图片路径 {target} 不存在，跳过加载")
-            return False
+            return None
         self.log.debug(f"加载图片 {target} 到缓冲池")
-        self.img_pool[target] = self.read_gray_img(rel_target)
-        return True
+        img = None
+        pack_key = self._pack_key(self._resolve_placeholder(target))
+        if self.template_pack and pack_key not in self._stale_pack_keys:
+            img = self.template_pack.get(pack_key)
+        if img is None:
+            # cv2.imread 解码期间释放 GIL，预加载线程可并行
+            img = self.read_gray_img(rel_target)
+        with self._img_lock:
+            if (loaded := self.img_pool.get(target)) is not None:
+                return loaded
+            self.img_pool[target] = img
+            self._img_names[id(img)] = (img, target)
+            if target not in self._img_pinned:
+                self._touch_lru(target)
+                self._evict_lru()
+        return img
     
     def load_task_entity_pool(self):
+        """加载实体池：MainMenu.txt + 全部 type: file 外部配置，解析 extend 继承。
+
+        解析结果经 EntityCache 缓存：所有文件未变时直接载入上次的完整实体图；
+        部分文件变化时只重新解析变化的文件，其余文件的实体从缓存反序列化。
+        外部配置的 TxtConfig 仍每次读取（合并进 menu_config 供 ${} 占位符与保存使用）。
+        """
         self.log.debug("开始加载任务实体池")
         self._entity_source.clear()
         self._external_configs.clear()
-        configs = self.menu_config.trans_entity_dict(JczxSectionEntity)
-
-        file_entities = []
-        task_configs = {}
-        for key, value in configs.items():
-            if value.type == SectionType.FILE.value:
-                file_entities.append((key, value))
-            else:
-                task_configs[key] = value
+        includes = self._file_includes()
+        paths = [self.menu_config_path] + [path for _, _, path in includes]
+        graph = self._entity_cache.get_graph(paths)
+        if graph is None:
+            task_configs = self._parse_entity_graph(includes)
+            self._entity_cache.put_graph(paths, (task_configs, dict(self._entity_source)))
+        else:
+            task_configs, sources = graph
+            self._entity_source.update(sources)
+            self.log.debug(f"实体图缓存命中，跳过解析（{len(paths)} 个文件）")
+        for _, target, external_path in includes:
+            external_config = Config(external_path).Config
+            self._external_configs.append((external_path, external_config))
+            self.menu_config.merge(external_config)
+            external_config.init_configs()
+            self.log.debug(f"已加载外部配置 {target}")
+        self._rebuild_settings_index()
+        self._entity_cache.save()
 
-        for key, file_entity in file_entities:
-            target = file_entity.target
+        entity_pool, task_pool = DictVariable(), DictVariable()
+        for key, value in task_configs.items():
+            entity_pool[key] = value
+            self.log.debug(f"加载实体 {key} 到实体池，{value}")
+            if value.type == SectionType.TASK.value:
+                task_pool[key] = value
+        # 建好后整体替换，无锁读取不会看到加载到一半的池
+        self.entity_pool, self.task_pool = entity_pool, task_pool
+        self.entity_version += 1
+        self.log.debug(f"任务实体池加载完成，共 {len(entity_pool)} 个实体，其中 {len(task_pool)} 个任务")
+
+    def _file_includes(self) -> list[tuple[str, str, str]]:
+        """MainMenu.txt 中的 type: file 引入 → [(实体 key, target, 外部文件路径)]，直接读原始配置，不做实体转换。"""
+        includes = []
+        for key in self.menu_config.sections():
+            try:
+                if self.menu_config.get_config(key, "type") != SectionType.FILE.value:
+                    continue
+            except KeyError:
+                # 未写 type 的普通段
+                continue
+            try:
+                target = self.menu_config.get_config(key, "target")
+            except KeyError:
+                target = None
             if not target:
                 self.log.warning(f"file 实体 {key} 缺少 target，跳过")
                 continue
@@ -143,21 +419,27 @@ class TaskManage:
             if not self.fm.isfile(external_path):
                 self.log.error(f"外部配置文件不存在: {external_path}")
                 continue
-            external_config = Config(external_path).Config
-            self._external_configs.append((external_path, external_config))
-            external_configs = external_config.trans_entity_dict(JczxSectionEntity)
+            includes.append((key, target, external_path))
+        return includes
+
+    def _parse_entity_graph(self, includes: list[tuple[str, str, str]]) -> dict[str, JczxSectionEntity]:
+        """逐文件取实体（未变化的文件走缓存），检查 key 冲突，解析 extend 并写入 only_key。"""
+        configs = self._entity_cache.file_entities(
+            self.menu_config_path, lambda: self.menu_config.trans_entity_dict(JczxSectionEntity))
+        task_configs = {k: v for k, v in configs.items() if v.type != SectionType.FILE.value}
+        for _, target, external_path in includes:
+            external_configs = self._entity_cache.file_entities(
+                external_path, lambda: Config(external_path).Config.trans_entity_dict(JczxSectionEntity))
             external_configs = {k: v for k, v in external_configs.items() if v.type != SectionType.FILE.value}
             dup_keys = set(external_configs.keys()) & set(task_configs.keys())
             if dup_keys:
                 dup_detail = ", ".join(f'"{k}"' for k in dup_keys)
                 raise ValueError(
                     f"实体 key 冲突: {target} 与已加载实体中重复定义了 {dup_detail}")
-            for e_key, e_val in external_configs.items():
+            for e_key in external_configs:
                 self._entity_source[e_key] = external_path
             task_configs.update(external_configs)
-            self.menu_config.merge(external_config)
-            external_config.init_configs()
-            self.log.debug(f"已加载外部配置 {target}，{len(external_configs)} 个实体")
+            self.log.debug(f"已解析外部配置 {target}，{len(external_configs)} 个实体")
 
         for key in task_configs:
             if key not in self._entity_source:
@@ -166,11 +448,7 @@ class TaskManage:
         self._resolve_extends(task_configs)
         for key, value in task_configs.items():
             value.only_key = key
-            self.entity_pool[key] = value
-            self.log.debug(f"加载实体 {key} 到实体池，{value}")
-            if value.type == SectionType.TASK.value:
-                self.task_pool[key] = value
-        self.log.debug(f"任务实体池加载完成，共 {len(self.entity_pool)} 个实体，其中 {len(self.task_pool)} 个任务")
+        return task_configs
 
     def _resolve_extends(self, configs: dict[str, JczxSectionEntity]) -> None:
         default_entity = JczxSectionEntity()
@@ -189,6 +467,209 @@ class TaskManage:
                 if child_val == getattr(default_entity, field_name):
                     setattr(entity, field_name, getattr(parent, field_name))
     
+    # ── 增量热重载 ──────────────────────────────────────
+
+    def start_watch(self, on_reload: Callable[[set[str]], None] = None) -> None:
+        """监视配置目录（*.txt）与 resources（*.png），文件变化时增量重载。
+
+        Args:
+            on_reload: 重载完成后回调（在监视线程中调用），参数为本次变化的文件路径
+        """
+        self.stop_watch()
+        if self.get_main_option("config.watch", "on") != "on":
+            return
+        try:
+            interval = float(self.get_main_option("config.watch.interval", "1"))
+        except ValueError:
+            interval = 1.0
+
+        def on_change(paths: set[str]):
+            if self.apply_file_changes(paths) and on_reload:
+                on_reload(paths)
+
+        self._watcher = FileWatcher(self._watch_roots(), on_change, interval=interval, log=self.log)
+        self._watcher.start()
+
+    def _watch_roots(self) -> list[tuple[str, tuple[str, ...]]]:
+        # 只监视 *.txt / *.png：本进程写入的 HotRegions.json、SleepStats.json、EntityCache.pickle 及其 .lock / .tmp 不在监视范围内
+        return [(str(self.config_dir), (".txt",)), (self._resources_root(), (".png",))]
+
+    def track_files(self) -> None:
+        """记录配置与模板文件的当前快照，之后 reload_changed_files 重载此后被修改的文件。"""
+        self._file_tracker = FileWatcher(self._watch_roots(), lambda paths: None, log=self.log)
+
+    def reload_changed_files(self) -> bool:
+        """重载 track_files 之后（或上次调用以来）被其他进程修改的文件，如 TUI 保存的任务设置与队列编辑。
+
+        多进程模式的工作进程不开监视线程，在每次执行任务/队列前调用，不受 config.watch 开关影响。
+        """
+        if self._file_tracker is None:
+            self.track_files()
+            return False
+        changed = self._file_tracker.sync()
+        return bool(changed) and self.apply_file_changes(changed)
+
+    def stop_watch(self) -> None:
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+
+    @staticmethod
+    def _norm_path(path) -> str:
+        return os.path.normcase(os.path.abspath(str(path).replace("\\", os.sep)))
+
+    def note_own_write(self, path) -> None:
+        """记录本进程刚保存的文件：监视线程看到的变化与写入后的状态一致时不再重载。"""
+        path = self._norm_path(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self._own_writes[path] = (st.st_size, st.st_mtime_ns)
+
+    def _is_own_write(self, path: str) -> bool:
+        """文件当前状态仍是本进程写入后的状态；之后被外部修改过则不算（并清除记录）。"""
+        stamp = self._own_writes.get(path)
+        if stamp is None:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and (st.st_size, st.st_mtime_ns) == stamp:
+            return True
+        self._own_writes.pop(path, None)
+        return False
+
+    def apply_file_changes(self, paths: Iterable[str]) -> bool:
+        """按变化的文件增量重载，不影响正在执行的任务（执行端每步都经 get_entity / get_img 取最新对象）。
+
+        - Config.txt / Queues.txt：只重读该文件
+        - MainMenu.txt 与 type: file 引入的任务文件：只重新解析变化的文件，替换内容有变化的实体
+        - resources 下的 PNG：只重新读取已在图片池中的这几张
+        - 本进程自己保存的文件（save_task_values / save_queue 等）跳过，内存中已是最新内容
+
+        Returns:
+            是否有配置或图片被重载
+        """
+        res_root = self._norm_path(self._resources_root())
+        changed = {self._norm_path(p) for p in paths}
+        own = {p for p in changed if self._is_own_write(p)}
+        if own:
+            self.log.debug(f"跳过本进程写入的文件: {', '.join(sorted(own))}")
+            changed -= own
+        images = {os.path.relpath(p, res_root).replace(os.sep, "\\")
+                  for p in changed if p.startswith(res_root + os.sep) and p.endswith(".png")}
+        configs = {p for p in changed if p.endswith(".txt") and not p.startswith(res_root + os.sep)}
+        reloaded = False
+        with self._lock:
+            if self._norm_path(self.main_config_path) in configs:
+                self.main_config = Config(self.main_config_path).Config
+                self.log.info("热重载：Config.txt")
+                reloaded = True
+            if self._norm_path(self.queue_config_path) in configs:
+                self.queue_config = Config(self.queue_config_path).Config
+                self.load_queues()
+                self.log.info("热重载：Queues.txt")
+                reloaded = True
+            entity_files = {self._norm_path(self.menu_config_path)}
+            entity_files.update(self._norm_path(path) for path, _ in self._external_configs)
+            if configs & entity_files:
+                self.reload_entity_files(configs & entity_files)
+                reloaded = True
+        if images:
+            self.reload_images(images)
+            reloaded = True
+        return reloaded
+
+    @_synchronized
+    def reload_entity_files(self, changed: set[str]) -> set[str]:
+        """重新解析变化的任务配置文件（其余文件的实体取自 EntityCache），只替换内容有变化的实体。
+
+        key 冲突、文件读取失败等任何错误时保留原配置与实体池。
+
+        Args:
+            changed: 变化文件的 _norm_path 路径
+
+        Returns:
+            新增 / 修改 / 删除的实体 key
+        """
+        previous = (self.menu_config, list(self._external_configs), dict(self._entity_source))
+        old_configs = {self._norm_path(path): config for path, config in self._external_configs}
+        self._entity_source.clear()
+        self._external_configs.clear()
+        try:
+            self.menu_config = Config(self.menu_config_path).Config
+            self._rebuild_settings_index()
+            includes = self._file_includes()
+            graph = self._parse_entity_graph(includes)
+            for _, target, external_path in includes:
+                norm = self._norm_path(external_path)
+                external_config = old_configs.get(norm) if norm not in changed else None
+                if external_config is None:
+                    external_config = Config(external_path).Config
+                self._external_configs.append((external_path, external_config))
+                self.menu_config.merge(external_config)
+                external_config.init_configs()
+        except Exception as e:
+            # 不只是 key 冲突（ValueError）：读文件 / 解析中的任何异常都恢复原 menu_config 与来源表
+            self.menu_config, external_configs, entity_source = previous
+            self._external_configs[:] = external_configs
+            self._entity_source.clear()
+            self._entity_source.update(entity_source)
+            self._rebuild_settings_index()
+            self.log.error(f"热重载失败，保留原配置: {e}")
+            return set()
+        self._rebuild_settings_index()
+        paths = [self.menu_config_path] + [path for _, _, path in includes]
+        self._entity_cache.put_graph(paths, (graph, dict(self._entity_source)))
+        self._entity_cache.save()
+
+        keys = self._swap_entity_pool(graph)
+        self._build_img_index()
+        self._preload_scopes()
+        self.log.info(f"热重载：{len(changed)} 个配置文件，{len(keys)} 个实体变化 {sorted(keys)}")
+        return keys
+
+    def _swap_entity_pool(self, graph: dict[str, JczxSectionEntity]) -> set[str]:
+        """用新实体图替换实体池：内容未变的实体沿用原对象，设置实体（懒加载）丢弃后按需重建。"""
+        old = {k: v for k, v in self.entity_pool.items() if isinstance(v, JczxSectionEntity)}
+        entity_pool, task_pool = DictVariable(), DictVariable()
+        keys = set(old) - set(graph)
+        for key, value in graph.items():
+            current = old.get(key)
+            if current == value:
+                value = current
+            else:
+                keys.add(key)
+            entity_pool[key] = value
+            if value.type == SectionType.TASK.value:
+                task_pool[key] = value
+        self.entity_pool, self.task_pool = entity_pool, task_pool
+        self.entity_version += 1
+        return keys
+
+    def reload_images(self, names: set[str]) -> None:
+        """模板图片变化：常驻图片立即重新读取，LRU 中的丢弃（下次按需加载），并清除其热区记录。"""
+        reload = []
+        with self._img_lock:
+            self._stale_pack_keys.update(names)
+            for key in [k for k in self.img_pool if self._pack_key(k) in names]:
+                img = self.img_pool.pop(key)
+                self._img_names.pop(id(img), None)
+                self._img_lru.pop(key, None)
+                if key in self._img_pinned:
+                    reload.append(key)
+        if self.hot_regions:
+            for name in names:
+                self.hot_regions.clear(name)
+        for key in reload:
+            self._load_img_to_pool(key)
+        with self._lock:
+            # 新增 / 删除的图片会改变任务可达图片集合
+            self._build_img_index()
+        self.log.info(f"热重载：{len(names)} 张图片，重新读取 {len(reload)} 张")
+
     def get_task(self, task_name: str) -> JczxSectionEntity:
         """获取任务实体"""
         try:
@@ -220,11 +701,55 @@ class TaskManage:
     def get_img(self, img_path: str) -> MatLike:
         """获取图片：池未命中且文件存在时按需加载（支持 call/method 动态参数）。"""
         name = self._resolve_placeholder(img_path)
-        if name in self.img_pool:
-            return self.img_pool[name]
-        if self._load_img_to_pool(name):
-            return self.img_pool[name]
-        return None
+        with self._img_lock:
+            img = self.img_pool.get(name)
+            if img is not None:
+                if name in self._img_lru:
+                    self._img_lru.move_to_end(name)
+                return img
+        return self._load_img_to_pool(name)
+
+    def _open_template_pack(self):
+        """映射预解码模板包（发布包自带或用户目录下运行时生成），关闭或失败时逐张 imread。"""
+        self._stale_pack_keys.clear()
+        if self.get_main_option("match.template_pack", "on") != "on":
+            self.template_pack = None
+            return
+        root = self._resources_root()
+        self.template_pack = TemplatePack.open(
+            root,
+            [self.fm.join(root, PACK_NAME, seq="\\"), self.fm.join(self.config_dir, PACK_NAME, seq="\\")],
+            levels=parse_levels(self.get_main_option("match.template_pack.levels", "2")),
+            log=self.log,
+        )
+
+    def _resources_root(self) -> str:
+        return str(self.fm.get_obj_relative_path("resources", self))
+
+    def list_resources(self, folder: str) -> list[str]:
+        """resources/<folder> 下的文件名（不递归，已排序），目录不存在返回空列表。"""
+        try:
+            return sorted(entry.name for entry in os.scandir(os.path.join(self._resources_root(), folder)) if entry.is_file())
+        except OSError:
+            return []
+
+    @staticmethod
+    def _pack_key(target: str) -> str:
+        return target.replace("/", "\\")
+
+    def get_img_scaled(self, img: MatLike, scale: int) -> MatLike | None:
+        """图片池数组的预计算缩小图（模板包 levels 内才有），供金字塔匹配复用。"""
+        name = self.get_img_name(img)
+        if name is None or self.template_pack is None or self._pack_key(name) in self._stale_pack_keys:
+            return None
+        return self.template_pack.get(self._pack_key(name), scale)
+
+    def get_img_name(self, img: MatLike) -> str | None:
+        """图片池数组 → 资源 key（热区索引用），非池内图片返回 None。"""
+        entry = self._img_names.get(id(img))
+        if entry is None or entry[0] is not img:
+            return None
+        return entry[1]
 
     def get_entity(self, entity_name: str, after_key: str = None) -> JczxSectionEntity:
         """获取实体"""
@@ -276,6 +801,7 @@ class TaskManage:
             return entity
         return None
 
+    @_synchronized
     def get_task_values(self, task_key: str) -> dict[str, str]:
         """读取任务已保存的设置值。"""
         section = f"{task_key}-values"
@@ -285,6 +811,7 @@ class TaskManage:
             return {}
         return {opt: entry.value for opt, entry in sec_data.items()}
 
+    @_synchronized
     def save_task_values(self, task_key: str, values: dict[str, object]) -> None:
         section = f"{task_key}-values"
         source = self._entity_source.get(task_key, self.menu_config_path)
@@ -297,12 +824,15 @@ class TaskManage:
             target_config.set_config(section, field_name, str(val))
             if target_config is not self.menu_config:
                 self.menu_config.set_config(section, field_name, str(val))
+            self._settings_index[(section, field_name)] = str(val)
+        self._bump_settings_version()
         if target_config is self.menu_config:
             self._save_menu_config_clean(section)
         else:
             # 外部任务的 values 段属于外部文件本身，只落盘外部文件即可；
             # menu_config 已通过 merge/set_config 在内存中同步，供 ${...} 占位符即时解析。
             target_config.save()
+        self.note_own_write(source)
         self.log.debug(f"任务 {task_key} 设置已保存到 {source}: {values}")
         self._update_entities_after_save(task_key)
 
@@ -358,9 +888,56 @@ class TaskManage:
             resolved.append(result)
         return resolved
     
+    # 解析缓存条目上限，超出时整体清空（正常配置下远达不到）
+    _PLACEHOLDER_MEMO_LIMIT = 4096
+
+    def _rebuild_settings_index(self) -> None:
+        """menu_config 重建后调用：预先展开全部 *-values 段，其余 (section, option) 首次引用时补入。"""
+        index = {}
+        for section in self.menu_config.sections():
+            if not section.endswith("-values"):
+                continue
+            try:
+                sec_data = self.menu_config.get_section(section)
+            except KeyError:
+                continue
+            for opt in sec_data:
+                index[(section, opt)] = self.menu_config.get_config(section, opt)
+        self._settings_index = index
+        self._bump_settings_version()
+
+    def _bump_settings_version(self) -> None:
+        # 换新字典而不是 clear：锁外读到旧缓存的线程不会把旧值写进新缓存
+        self._placeholder_memo = {}
+        self.settings_version += 1
+
+    def _config_value(self, section: str, option: str) -> Optional[str]:
+        key = (section, option)
+        try:
+            return self._settings_index[key]
+        except KeyError:
+            pass
+        try:
+            val = self.menu_config.get_config(section, option)
+        except KeyError:
+            val = None
+        self._settings_index[key] = val
+        return val
+
     def _resolve_placeholder(self, arg: str, task_key: str = None) -> str:
-        if not isinstance(arg, str):
+        if not isinstance(arg, str) or "${" not in arg:
             return arg
+        memo_key = (arg, task_key)
+        if (cached := self._placeholder_memo.get(memo_key)) is not None:
+            return cached
+        with self._lock:
+            return self._resolve_placeholder_locked(arg, task_key, memo_key)
+
+    def _resolve_placeholder_locked(self, arg: str, task_key: Optional[str], memo_key: tuple) -> str:
+        """缓存未命中：在锁内读取设置索引（未索引的项回落 menu_config）并写入当前缓存。"""
+        memo = self._placeholder_memo
+        if (cached := memo.get(memo_key)) is not None:
+            return cached
         result = arg
         for match in self._PLACEHOLDER_PATTERN.findall(arg):
             parts = match.split(":", 2)
@@ -373,13 +950,14 @@ class TaskManage:
                 default = ""
             else:
                 section, option, default = parts
-            try:
-                val = self.menu_config.get_config(section, option)
-            except KeyError:
-                val = default
+            val = self._config_value(section, option)
             result = result.replace("${" + match + "}", val if val else default)
+        if len(memo) >= self._PLACEHOLDER_MEMO_LIMIT:
+            memo.clear()
+        memo[memo_key] = result
         return result
 
+    @_synchronized
     def load_queues(self) -> None:
         self._queue_cache.clear()
         for sec in self.queue_config.sections():
@@ -395,19 +973,24 @@ class TaskManage:
             self._queue_cache[sec] = QueueEntity(id=sec, name=name, tasks=task_list)
         self.log.debug(f"加载 {len(self._queue_cache)} 个队列")
 
+    @_synchronized
     def get_queues(self) -> list[QueueEntity]:
         return list(self._queue_cache.values())
 
+    @_synchronized
     def get_queue(self, queue_id: str) -> QueueEntity | None:
         return self._queue_cache.get(queue_id)
 
+    @_synchronized
     def save_queue(self, queue_id: str, name: str, tasks: list[str]) -> None:
         self.queue_config.set_config(queue_id, "name", name)
         self.queue_config.set_config(queue_id, "tasks", ",".join(tasks))
         self.queue_config.save()
+        self.note_own_write(self.queue_config_path)
         self._queue_cache[queue_id] = QueueEntity(id=queue_id, name=name, tasks=tasks)
         self.log.debug(f"队列 {queue_id} 已保存")
 
+    @_synchronized
     def delete_queue(self, queue_id: str) -> None:
         if queue_id not in self._queue_cache:
             return
@@ -415,5 +998,6 @@ class TaskManage:
         for opt in list(sec_data.keys()):
             self.queue_config.remove_config(queue_id, opt)
         self.queue_config.save()
+        self.note_own_write(self.queue_config_path)
         del self._queue_cache[queue_id]
         self.log.debug(f"队列 {queue_id} 已删除")
\ No newline at end of file
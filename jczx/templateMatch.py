@@ -0,0 +1,142 @@
+"""模板匹配算法（纯 cv2/numpy，不依赖设备）：多目标 NMS、金字塔粗到细匹配。"""
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+MATCH_FULL = "full"
+MATCH_PYRAMID = "pyramid"
+
+# 缩小后模板边长低于此值时特征丢失严重，金字塔不适用
+PYRAMID_MIN_SIDE = 6
+# 缩小后相关系数整体偏低（采样相位不对齐时更明显），粗匹配阈值按每 2 倍缩放放宽一次
+PYRAMID_COARSE_SLACK = 0.15
+PYRAMID_MAX_CANDIDATES = 32
+# 超阈值点多于此数时 NMS 先取局部极大值
+NMS_DENSE_LIMIT = 20000
+# 帧签名：缩略图尺寸与量化位移（256 级灰度 >> 3 = 32 级，抵消编码噪声）
+SIGNATURE_SIZE = (32, 18)
+SIGNATURE_SHIFT = 3
+
+
+def nms_peaks(scores: MatLike, per: float, tw: int, th: int) -> list[tuple[int, int, float]]:
+    """得分图非极大值抑制：取 > per 的点，按得分从高到低保留，模板半尺寸邻域内的其余点剔除。
+
+    超阈值点过多（大面积纯色等退化场景）时先用一次 dilate 只留局部极大值，控制抑制轮次的开销。
+
+    Returns:
+        [(x, y, score), ...] 左上角坐标，按得分降序
+    """
+    rw, rh = max(1, tw // 2), max(1, th // 2)
+    mask = scores > per
+    if not mask.any():
+        return []
+    if np.count_nonzero(mask) > NMS_DENSE_LIMIT:
+        kernel = np.ones((2 * rh + 1, 2 * rw + 1), np.uint8)
+        mask &= scores >= cv2.dilate(scores, kernel)
+    idx = np.flatnonzero(mask)  # 比 np.nonzero 的二维索引快约 3 倍
+    ys, xs = np.divmod(idx, scores.shape[1])
+    vals = scores.ravel()[idx]
+    order = np.argsort(-vals, kind="stable")
+    return _suppress(xs[order], ys[order], vals[order], rw, rh)
+
+
+def _suppress(xs, ys, vals, rw: int, rh: int) -> list[tuple[int, int, float]]:
+    """候选已按得分降序：取剩余最高者，整批剔除其 (rw, rh) 邻域内的候选，轮次 = 目标数。"""
+    kept: list[tuple[int, int, float]] = []
+    while len(xs):
+        x, y = xs[0], ys[0]
+        kept.append((int(x), int(y), float(vals[0])))
+        rest = (np.abs(xs - x) > rw) | (np.abs(ys - y) > rh)
+        xs, ys, vals = xs[rest], ys[rest], vals[rest]
+    return kept
+
+
+def sort_row_major(hits: list[tuple[int, int, float]]) -> list[tuple[int, int, float]]:
+    """按从上到下、从左到右排序：DSL 的 index 与旧版 find*Locations 依赖此顺序。"""
+    return sorted(hits, key=lambda p: (p[1], p[0]))
+
+
+def match_locations(gray: MatLike, template: MatLike, per: float) -> list[tuple[int, int, float]]:
+    """全分辨率匹配 + NMS，返回 [(x, y, score), ...]（gray 坐标系，按得分降序）。"""
+    th, tw = template.shape[:2]
+    if th > gray.shape[0] or tw > gray.shape[1]:
+        return []
+    scores = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+    return nms_peaks(scores, per, tw, th)
+
+
+def parse_match_mode(text: str, default_scale: int = 2) -> tuple[str, int]:
+    """``full`` / ``pyramid`` / ``pyramid|4`` → (模式, 缩放倍数)。无法识别按 full 处理。"""
+    if not text:
+        return MATCH_FULL, default_scale
+    mode, _, scale = str(text).strip().partition("|")
+    if mode != MATCH_PYRAMID:
+        return MATCH_FULL, default_scale
+    try:
+        scale = int(scale) if scale else int(default_scale)
+    except ValueError:
+        scale = int(default_scale)
+    return (MATCH_PYRAMID, scale) if scale >= 2 else (MATCH_FULL, default_scale)
+
+
+def downscale(gray: MatLike, scale: int) -> MatLike:
+    h, w = gray.shape[:2]
+    return cv2.resize(gray, (max(1, w // scale), max(1, h // scale)), interpolation=cv2.INTER_AREA)
+
+
+def frame_signature(gray: MatLike) -> bytes:
+    """整帧的低成本签名：32x18 区域均值缩略图量化后的字节串。签名相同可视为画面未变化。"""
+    thumb = cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+    return (thumb >> SIGNATURE_SHIFT).tobytes()
+
+
+def pyramid_match(gray: MatLike, template: MatLike, per: float, scale: int = 2,
+                  small_gray: MatLike = None, small_template: MatLike = None) -> list[tuple[int, int, float]] | None:
+    """粗到细匹配：1/scale 灰度图上找候选，再在原分辨率候选小窗口内确认。
+
+    Args:
+        gray: 搜索区域灰度图
+        template: 灰度模板
+        per: 原分辨率匹配阈值（> per 视为命中，与全分辨率匹配一致）
+        scale: 缩小倍数（2 或 4）
+        small_gray: 可选，预先缩小好的 gray（同帧多模板共享）
+        small_template: 可选，预先缩小好的模板（模板包 levels）
+
+    Returns:
+        [(x, y, score), ...] 左上角坐标（gray 坐标系），按得分降序；
+        模板过小或大于搜索区域时返回 None，调用方应回退全分辨率匹配。
+    """
+    th, tw = template.shape[:2]
+    gh, gw = gray.shape[:2]
+    if th > gh or tw > gw:
+        return None
+    if tw // scale < PYRAMID_MIN_SIDE or th // scale < PYRAMID_MIN_SIDE:
+        return None
+    if small_gray is None:
+        small_gray = downscale(gray, scale)
+    small_tpl = small_template if small_template is not None else downscale(template, scale)
+    sth, stw = small_tpl.shape[:2]
+    if sth > small_gray.shape[0] or stw > small_gray.shape[1]:
+        return None
+    coarse = cv2.matchTemplate(small_gray, small_tpl, cv2.TM_CCOEFF_NORMED)
+    slack = PYRAMID_COARSE_SLACK * scale / 2
+    candidates = nms_peaks(coarse, per - slack, stw, sth)[:PYRAMID_MAX_CANDIDATES]
+    pad = scale + 2
+    hits: list[tuple[int, int, float]] = []
+    for cx, cy, _ in candidates:
+        x0 = max(0, cx * scale - pad)
+        y0 = max(0, cy * scale - pad)
+        x1 = min(gw, cx * scale + pad + tw)
+        y1 = min(gh, cy * scale + pad + th)
+        if x1 - x0 < tw or y1 - y0 < th:
+            continue
+        fine = cv2.matchTemplate(gray[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (fx, fy) = cv2.minMaxLoc(fine)
+        if score > per:
+            hits.append((x0 + fx, y0 + fy, float(score)))
+    if not hits:
+        return []
+    # 相邻候选窗口可能收敛到同一位置，与全分辨率结果一样做一次抑制
+    xs, ys, vals = (np.array(v) for v in zip(*sorted(hits, key=lambda p: -p[2])))
+    return _suppress(xs, ys, vals, max(1, tw // 2), max(1, th // 2))
+
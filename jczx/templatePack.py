@@ -0,0 +1,218 @@
+"""模板包：把 resources 下的 PNG 预解码为灰度数组打包成单文件，运行时 np.memmap 映射加载。
+
+文件结构：``MAGIC | uint64 头长度 | JSON 头 | 对齐填充 | 数据区``。
+JSON 头记录内容哈希、文件 stat 指纹、预计算的缩小倍数（levels）与每张图各层在数据区的 (偏移, 高, 宽)。
+
+- 冷启动 / 刷新配置时只需 stat 全部 PNG 比对指纹，不再逐张 imread 解码
+- stat 指纹不一致（例如 git checkout 改了 mtime）时再比对内容哈希，内容变了才重建
+- 多进程映射同一文件，只读页由操作系统共享
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+from logging import Logger
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from .templateMatch import downscale
+
+MAGIC = b"JCZXTPK1"
+ALIGN = 64
+PACK_NAME = "templates.pack"
+# 非模板的大图（工具图表），不打包
+PACK_EXCLUDE_DIRS = ("toolChart",)
+
+
+def scan_resources(root: str) -> list[tuple[str, str]]:
+    """resources 下的 PNG → [(资源 key, 绝对路径)]，key 与任务配置 target 写法一致（反斜杠分隔）。"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if os.path.samefile(dirpath, root):
+            dirnames[:] = [d for d in dirnames if d not in PACK_EXCLUDE_DIRS]
+        for name in filenames:
+            if name.lower().endswith(".png"):
+                path = os.path.join(dirpath, name)
+                files.append((os.path.relpath(path, root).replace(os.sep, "\\"), path))
+    files.sort()
+    return files
+
+
+def stat_fingerprint(files: list[tuple[str, str]]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for key, path in files:
+        st = os.stat(path)
+        h.update(f"{key}|{st.st_size}|{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def content_hash(files: list[tuple[str, str]]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for key, path in files:
+        h.update(key.encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def parse_levels(text: str) -> tuple[int, ...]:
+    """``"2,4"`` → (1, 2, 4)；原图（1）总是包含，非法值忽略。"""
+    levels = {1}
+    for part in str(text or "").split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) >= 2:
+            levels.add(int(part))
+    return tuple(sorted(levels))
+
+
+def build_pack(root: str, pack_path: str, levels: tuple[int, ...] = (1,), log: Logger = None) -> dict:
+    """解码 root 下全部模板写入 pack_path（先写临时文件再替换），返回 JSON 头。"""
+    log = log if log else Logger("TemplatePack")
+    levels = tuple(sorted(set(levels) | {1}))
+    files = scan_resources(root)
+    entries: dict[str, list[list[int]]] = {}
+    blobs: list[bytes] = []
+    offset = 0
+    for key, path in files:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            log.warning(f"模板包跳过无法解码的图片: {key}")
+            continue
+        layers = []
+        for level in levels:
+            arr = np.ascontiguousarray(img if level == 1 else downscale(img, level))
+            size = arr.nbytes
+            pad = -size % ALIGN
+            layers.append([offset, arr.shape[0], arr.shape[1]])
+            blobs.append(arr.tobytes() + b"\0" * pad)
+            offset += size + pad
+        entries[key] = layers
+    header = {
+        "hash": content_hash(files),
+        "stat": stat_fingerprint(files),
+        "levels": list(levels),
+        "entries": entries,
+    }
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + struct.pack("<Q", len(head)) + head
+    prefix += b"\0" * (-len(prefix) % ALIGN)
+    tmp = f"{pack_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        for blob in blobs:
+            f.write(blob)
+    try:
+        os.replace(tmp, pack_path)
+    except OSError:
+        # Windows 下目标文件仍被其他进程映射时无法替换
+        os.remove(tmp)
+        raise
+    log.info(f"模板包已生成 {len(entries)} 张（levels={list(levels)}）: {pack_path}")
+    return header
+
+
+def read_header(pack_path: str) -> tuple[dict, int] | None:
+    """读取 JSON 头与数据区起始偏移，文件缺失或格式不符返回 None。"""
+    try:
+        with open(pack_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(length).decode("utf-8"))
+    except (OSError, ValueError, struct.error):
+        return None
+    start = len(MAGIC) + 8 + length
+    return header, start + (-start % ALIGN)
+
+
+class TemplatePack:
+    """已映射的模板包：get(key, level) 返回只读灰度数组（memmap 视图），未收录返回 None。"""
+
+    # 同进程多个 TaskManage 共享同一映射：资源目录 → (stat 指纹, TemplatePack)
+    _shared: dict[str, tuple[str, "TemplatePack"]] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pack_path: str, header: dict, data_start: int):
+        self.path = pack_path
+        self.hash: str = header["hash"]
+        self.levels: tuple[int, ...] = tuple(header["levels"])
+        self._entries: dict[str, list[list[int]]] = header["entries"]
+        self._mm = np.memmap(pack_path, dtype=np.uint8, mode="r") if self._entries else None
+        self._data_start = data_start
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, level: int = 1) -> MatLike | None:
+        layers = self._entries.get(key)
+        if layers is None or level not in self.levels:
+            return None
+        offset, h, w = layers[self.levels.index(level)]
+        start = self._data_start + offset
+        return self._mm[start:start + h * w].reshape(h, w)
+
+    @classmethod
+    def open(cls, root: str, pack_paths: list[str], levels: tuple[int, ...] = (1,),
+             log: Logger = None) -> "TemplatePack | None":
+        """按顺序查找可用的模板包（发布包自带 → 用户目录），都失效时在最后一个路径重建。
+
+        Args:
+            root: resources 目录
+            pack_paths: 候选包路径，最后一个为运行时重建的写入位置
+            levels: 需要的缩小倍数（包内缺少时视为失效）
+        """
+        log = log if log else Logger("TemplatePack")
+        files = scan_resources(root)
+        stat = stat_fingerprint(files)
+        levels = tuple(sorted(set(levels) | {1}))
+        with cls._shared_lock:
+            shared = cls._shared.get(root)
+            if shared and shared[0] == stat and set(levels) <= set(shared[1].levels):
+                return shared[1]
+            pack = cls._open_valid(files, stat, pack_paths, levels, log)
+            if pack is None:
+                try:
+                    build_pack(root, pack_paths[-1], levels, log)
+                except OSError as e:
+                    log.warning(f"模板包生成失败，回退逐张解码: {e}")
+                    return None
+                found = read_header(pack_paths[-1])
+                if found is None:
+                    return None
+                pack = cls(pack_paths[-1], *found)
+            cls._shared[root] = (stat, pack)
+            return pack
+
+    @classmethod
+    def _open_valid(cls, files, stat: str, pack_paths: list[str], levels, log: Logger):
+        digest = None
+        for path in pack_paths:
+            found = read_header(path)
+            if found is None:
+                continue
+            header, start = found
+            if not set(levels) <= set(header.get("levels", ())):
+                continue
+            if header.get("stat") != stat:
+                digest = digest or content_hash(files)
+                if header.get("hash") != digest:
+                    log.debug(f"模板包内容已过期: {path}")
+                    continue
+            log.debug(f"模板包已映射 {len(header['entries'])} 张: {path}")
+            return cls(path, header, start)
+        return None
+
+
+if __name__ == "__main__":
+    # build.py 打包前调用：python -m jczx.templatePack [levels]
+    import sys
+
+    _root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+    _header = build_pack(_root, os.path.join(_root, PACK_NAME), parse_levels(sys.argv[1] if len(sys.argv) > 1 else "2"))
+    print(f"templates.pack: {len(_header['entries'])} 张, levels={_header['levels']}")
@@ -665,6 +665,11 @@ class QueuePanel(Section):
             self.queue_id = queue_id
             super().__init__()
 
+    class Selected(Message):
+        def __init__(self, queue_id: str) -> None:
+            self.queue_id = queue_id
+            super().__init__()
+
     def __init__(self, queues: list[tuple[str, str]] | None = None, id: str | None = None):
         super().__init__("任务队列", id=id)
         qs = queues or []
@@ -689,6 +694,8 @@ class QueuePanel(Section):
         has_queue = bool(event.value)
         self.query_one("#queue-toggle", ToggleButton).disabled = not has_queue
         self.query_one("#queue-edit", LabelButton).disabled = not has_queue
+        if has_queue:
+            self.post_message(self.Selected(event.value))
 
     def on_toggle_button_toggled(self, event: ToggleButton.Toggled) -> None:
         event.stop()
@@ -716,9 +723,11 @@ class QueuePanel(Section):
         w = self.query_one("#queue-select", CompactSelect)
         w.value = queue_id
 
-    def update_progress(self, name: str, idx: int, total: int, task_name: str) -> None:
+    def update_progress(self, lines: list[str]) -> None:
+        """每台执行中的设备一行进度。"""
         self.body.query(".queue-progress").remove()
-        self.body.mount(Label(f"{name} → {idx + 1}/{total} {task_name}", classes="queue-progress"))
+        for line in lines:
+            self.body.mount(Label(line, classes="queue-progress"))
 
     def clear_progress(self) -> None:
         self.body.query(".queue-progress").remove()
@@ -1,5 +1,7 @@
-"""共享 fixture：方案 3（regression）基于真实 jczx/Config 的只读副本。"""
+"""共享 fixture：方案 3（regression）基于真实 jczx/Config 的只读副本；方案 1 微基准的计时工具。"""
+import os
 import shutil
+import time
 from os.path import abspath, dirname, join
 
 import pytest
@@ -7,6 +9,19 @@ import pytest
 PROJECT_ROOT = dirname(dirname(abspath(__file__)))
 CONFIG_DIR = join(PROJECT_ROOT, "jczx", "Config")
 
+# 微基准的耗时对比受机器负载影响，默认只打印耗时；设置 JCZX_BENCHMARK=1 才断言新实现更快
+benchmark = pytest.mark.skipif(not os.environ.get("JCZX_BENCHMARK"), reason="未设置 JCZX_BENCHMARK，跳过耗时断言")
+
+
+def best_of(fn, repeat=5):
+    """执行 repeat 次，返回 (最短耗时秒, 最后一次的结果)。"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
 
 @pytest.fixture
 def real_config_dir(tmp_path):
@@ -112,6 +112,10 @@ def make_gaming(real_config_dir, *, matcher=None, clicks=None, recorder=None,
     g.log = logging.getLogger("engine-test")
     g._recorder = recorder
     g._context = {}
+    g._match_mode = "full"
+    g._plans = {}
+    g._named_entities = {}
+    g._plan_version = -1
     g.ocr = None
     # —— 设备 I/O 全部替换 ——
     g.task_manage.get_img = lambda target: target  # target 字符串直通 matcher
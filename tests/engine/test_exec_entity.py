@@ -1,4 +1,6 @@
 """方案 2：_exec_entity 模板流程 — times / testFor 门控 / wait_target / action 链 / testFor_after 重试。"""
+import numpy as np
+
 from jczx.configEntity import JczxSectionEntity
 
 from tests.engine.fake_device import make_match, patch_clock
@@ -78,3 +80,172 @@ class TestTestForAfter:
         e = _entity(type="task", testFor_after="buttons\\home.png", times=2)
         gaming._exec_entity(e, lambda ent: count.append(1), testFor=True)
         assert len(count) == 2  # 可见则不再重试，times 正常执行
+
+
+class TestExecPlan:
+    def test_pool_entity_plan_reused(self, gaming):
+        gaming.record_step = lambda tag: None
+        step = _entity(type="func", func="record_step", args=["x"], only_key="step-plan")
+        gaming.task_manage.entity_pool["step-plan"] = step
+        gaming.exec("step-plan")
+        plan = gaming._plans[id(step)]
+        gaming.exec("step-plan")
+        assert gaming._plans[id(step)] is plan
+
+    def test_reload_invalidates_plans(self, gaming):
+        gaming.record_step = lambda tag: None
+        step = _entity(type="func", func="record_step", args=["x"], only_key="step-plan")
+        gaming.task_manage.entity_pool["step-plan"] = step
+        gaming.exec("step-plan")
+        gaming.task_manage.entity_version += 1
+        gaming.exec("step-plan")
+        assert gaming._plan_version == gaming.task_manage.entity_version
+        assert list(gaming._plans) == [id(step)]
+
+    def test_context_placeholder_evaluated_per_exec(self, gaming):
+        calls = []
+        e = _entity(type="task", times="%{n}", only_key="task-plan")
+        gaming.task_manage.entity_pool["task-plan"] = e
+        for n in ("1", "3"):
+            gaming._context["n"] = n
+            gaming._exec_entity(e, lambda ent: calls.append(n), action_chain=False)
+        assert calls == ["1", "3", "3", "3"]
+
+    def test_unknown_type_returns_none(self, gaming):
+        assert gaming.exec(_entity(type="settings")) is None
+
+
+class TestTracer:
+    def test_entity_and_stage_spans(self, gaming):
+        from jczx.debug import ExecTracer
+        gaming.record_step = lambda tag: None
+        step = _entity(type="func", func="record_step", args=["x"], only_key="step-trace")
+        gaming.task_manage.entity_pool["step-trace"] = step
+        tracer = gaming._tracer = ExecTracer("test")
+        try:
+            gaming.exec("step-trace")
+        finally:
+            gaming._tracer = None
+        events = [e for e in tracer.chrome_trace()["traceEvents"] if e["ph"] == "X"]
+        assert {"entity", "stage"} <= {e["cat"] for e in events}
+        assert any(e["name"] == "step-trace" and e["cat"] == "entity" for e in events)
+        assert any(e["name"] == "on_exec" and e["args"]["key"] == "step-trace" for e in events)
+
+
+class TestAdaptiveSleep:
+    def _run(self, gaming, e):
+        before = len(gaming.token.sleeps)
+        gaming._exec_entity(e, lambda ent: None, action_chain=False)
+        return sum(gaming.token.sleeps[before:])
+
+    def test_sleep_shortened_after_learning(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)  # 假屏幕恒定 → 画面立即稳定
+        gaming.device_id = "fake"
+        stats = gaming.task_manage.sleep_stats
+        stats.enabled = True
+        e = _entity(type="task", sleep=2.0, only_key="adaptive-sleep")
+        learning = [self._run(gaming, e) for _ in range(stats.min_samples)]
+        assert all(abs(t - 2.0) < 1e-6 for t in learning), "样本不足时等待配置值"
+        assert self._run(gaming, e) < 1.0
+        assert len(stats.samples("fake", "adaptive-sleep:sleep")) == stats.min_samples + 1
+
+    def test_unsettled_records_configured(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        frames = iter(range(1000))
+        gaming._screen_cache._capture = lambda: np.full((200, 200, 3), 40 * (next(frames) % 2 + 1), np.uint8)
+        gaming.device_id = "fake"
+        stats = gaming.task_manage.sleep_stats
+        stats.enabled = True
+        self._run(gaming, _entity(type="task", sleep=1.0, only_key="adaptive-anim"))
+        assert stats.samples("fake", "adaptive-anim:sleep") == [1.0], "画面一直在变：按配置值记录"
+
+    def test_disabled_sleeps_configured(self, gaming):
+        e = _entity(type="task", sleep=1.5, only_key="adaptive-sleep")
+        gaming._exec_entity(e, lambda ent: None, action_chain=False)
+        assert 1.5 in gaming.token.sleeps
+
+
+class TestSettle:
+    def _animate(self, gaming, frames: int, box=(0, 0, 200, 200)):
+        """前 frames 次截图画面在 box 区域内变化，之后静止。"""
+        shots = iter(range(frames))
+        x0, y0, x1, y1 = box
+
+        def capture():
+            img = np.zeros((200, 200, 3), np.uint8)
+            n = next(shots, None)
+            if n is not None:
+                img[y0:y1, x0:x1] = 40 * (n % 2 + 1)
+            return img
+        gaming._screen_cache._capture = capture
+
+    def test_static_screen_settles_after_one_step(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        assert gaming.wait_settle(3) is True
+        assert sum(gaming.token.sleeps) < 0.5
+
+    def test_waits_until_animation_stops(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        self._animate(gaming, 6)
+        assert gaming.wait_settle("5") is True
+        assert 0.8 < sum(gaming.token.sleeps) < 2.0
+
+    def test_timeout_when_never_settles(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        self._animate(gaming, 1000)
+        assert gaming.wait_settle(1) is False
+        assert abs(sum(gaming.token.sleeps) - 1) < 1e-6
+
+    def test_slow_capture_still_compares(self, gaming, monkeypatch):
+        """截图本身耗时 0.3s（真机 screencap）：不能在第一帧之后直接判定稳定。"""
+        patch_clock(monkeypatch, gaming)
+        self._animate(gaming, 4)
+        animate = gaming._screen_cache._capture
+        captures = []
+
+        def slow_capture():
+            gaming.token._now += 0.3
+            captures.append(1)
+            return animate()
+        gaming._screen_cache._capture = slow_capture
+        assert gaming.wait_settle(5) is True
+        assert len(captures) > 4, "应等到动画停止后的一对画面相同才返回"
+
+    def test_changes_outside_region_ignored(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        self._animate(gaming, 1000, box=(0, 0, 100, 100))
+        assert gaming.wait_settle(1, cutPoints=((100, 100), (200, 200))) is True
+
+    def test_entity_settle_after_exec(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        order = []
+        e = _entity(type="task", settle_timeout=2)
+        gaming.wait_settle = lambda timeout, cutPoints=None: order.append(("settle", timeout)) or True
+        gaming._exec_entity(e, lambda ent: order.append("exec"), action_chain=False)
+        assert order == ["exec", ("settle", 2.0)]
+
+
+class TestFrameGate:
+    def _polls(self, gaming, gate: bool) -> int:
+        gaming._frame_gate = gate
+        before = len(gaming.matcher.calls)
+        assert gaming._wait_for_image("buttons\\missing.png", 5) is False
+        return len(gaming.matcher.calls) - before
+
+    def test_static_screen_skips_rematch(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)  # 假屏幕恒定
+        ungated = self._polls(gaming, False)
+        gated = self._polls(gaming, True)
+        assert gated < ungated / 2
+        assert gated >= 2, "超过 max_gap 仍应强制匹配"
+
+    def test_match_found_when_gated(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        gaming._frame_gate = True
+        gaming.matcher.results["buttons\\fight.png"] = make_match(10, 10, 20, 20)
+        assert gaming._wait_for_image("buttons\\fight.png", 2) is True
+
+    def test_gate_off_when_cache_disabled(self, gaming):
+        gaming._frame_gate = True
+        gaming._screen_cache.set_ttl(0)
+        assert gaming._poll_gate() is None
@@ -0,0 +1,127 @@
+"""方案 2：_ocr_match_region 经 OcrService 识别 — 识别期间预取下一帧、关闭 / 调试记录时不预取、同步 OCR 不变、
+单行裁剪图仅识别（ocr_mode 与按尺寸自动选择）、语料记录。"""
+from jczx.ocrService import OCR_FULL, OCR_REC, OcrService
+
+from tests.engine.fake_device import RecordingRecorder, make_match
+
+
+class SlowOcr:
+    """识别时记录截图缓存版本（判断下一帧是否已在识别期间截取）。"""
+
+    def __init__(self, gaming):
+        self.gaming = gaming
+        self.seen_versions = []
+        self.det = []
+
+    def readtext(self, img, det=True, cls=False):
+        self.seen_versions.append(self.gaming._screen_cache.version)
+        self.det.append(det)
+        return ["123"]
+
+
+def _service(gaming):
+    ocr = SlowOcr(gaming)
+    return OcrService(lambda: ocr, batch_wait=0), ocr
+
+
+class TestPrefetch:
+    def test_next_frame_captured_while_recognizing(self, gaming):
+        gaming._ocr_prefetch = True
+        gaming.ocr, _ = _service(gaming)
+        try:
+            gaming.screenshot()
+            version = gaming._screen_cache.version
+            assert gaming._ocr_match_region(make_match(10, 10, 40, 30)) == "123"
+            assert gaming._screen_cache.version == version + 1
+            gaming.screenshot()
+            assert gaming._screen_cache.version == version + 1, "TTL 内应复用预取的帧"
+        finally:
+            gaming.ocr.shutdown()
+
+    def test_disabled(self, gaming):
+        gaming._ocr_prefetch = False
+        gaming.ocr, _ = _service(gaming)
+        try:
+            gaming.screenshot()
+            version = gaming._screen_cache.version
+            gaming._ocr_match_region(make_match(10, 10, 40, 30))
+            assert gaming._screen_cache.version == version
+        finally:
+            gaming.ocr.shutdown()
+
+    def test_no_prefetch_when_recording(self, gaming):
+        gaming._ocr_prefetch = True
+        gaming._recorder = RecordingRecorder()
+        gaming.ocr, _ = _service(gaming)
+        try:
+            gaming.screenshot()
+            version = gaming._screen_cache.version
+            gaming._ocr_match_region(make_match(10, 10, 40, 30))
+            assert gaming._screen_cache.version == version
+        finally:
+            gaming.ocr.shutdown()
+
+
+class TestSyncOcr:
+    def test_plain_readtext_unchanged(self, gaming):
+        gaming._ocr_prefetch = True
+        gaming.ocr = SlowOcr(gaming)
+        gaming.screenshot()
+        version = gaming._screen_cache.version
+        assert gaming._ocr_match_region(make_match(10, 10, 40, 30)) == "123"
+        assert gaming._screen_cache.version == version
+
+
+class FakeCorpus:
+    def __init__(self):
+        self.samples = []
+
+    def add(self, crop, text, mode=""):
+        self.samples.append((crop.shape, text, mode))
+
+
+class TestRecOnly:
+    def test_mode_overrides_size(self, gaming):
+        gaming.ocr = SlowOcr(gaming)
+        gaming._ocr_rec_max_height = 0
+        gaming._ocr_match_region(make_match(10, 10, 40, 30), OCR_REC)
+        gaming._ocr_rec_max_height = 100
+        gaming._ocr_match_region(make_match(10, 10, 40, 30), OCR_FULL)
+        assert gaming.ocr.det == [False, True]
+
+    def test_auto_single_line_crop(self, gaming):
+        gaming.ocr = SlowOcr(gaming)
+        gaming._ocr_rec_max_height = 48
+        gaming._ocr_match_region(make_match(10, 10, 110, 40))   # 100x30 单行
+        gaming._ocr_match_region(make_match(10, 10, 110, 110))  # 100x100 多行区域
+        gaming._ocr_match_region(make_match(10, 10, 30, 40))    # 20x30 竖向
+        assert gaming.ocr.det == [False, True, True]
+
+    def test_auto_disabled(self, gaming):
+        gaming.ocr = SlowOcr(gaming)
+        gaming._ocr_rec_max_height = 0
+        gaming._ocr_match_region(make_match(10, 10, 110, 40))
+        assert gaming.ocr.det == [True]
+
+    def test_through_service(self, gaming):
+        gaming.ocr, ocr = _service(gaming)
+        try:
+            assert gaming._ocr_match_region(make_match(10, 10, 40, 30), OCR_REC) == "123"
+            assert ocr.det == [False]
+        finally:
+            gaming.ocr.shutdown()
+
+
+class TestCorpus:
+    def test_recognized_crop_recorded(self, gaming):
+        gaming.ocr = SlowOcr(gaming)
+        gaming._ocr_corpus = FakeCorpus()
+        gaming._ocr_match_region(make_match(10, 10, 40, 30))
+        assert gaming._ocr_corpus.samples == [((20, 30, 3), "123", OCR_REC)]
+
+    def test_empty_result_recorded_with_mode(self, gaming):
+        gaming.ocr = SlowOcr(gaming)
+        gaming.ocr.readtext = lambda img, det=True, cls=False: []
+        gaming._ocr_corpus = FakeCorpus()
+        gaming._ocr_match_region(make_match(10, 10, 110, 110))
+        assert gaming._ocr_corpus.samples == [((100, 100, 3), "", OCR_FULL)]
@@ -0,0 +1,128 @@
+"""方案 2：findImageDetail 同帧记忆化 — 同帧复用 / 键区分 / click 后失效 / 结果隔离。"""
+import numpy as np
+import pytest
+
+from jczx.jczxCli import Device
+
+from tests.engine.fake_device import make_gaming, make_match
+
+
+@pytest.fixture
+def memo_gaming(real_config_dir, monkeypatch):
+    """保留真实 JCZXGaming.findImageDetail，只替换底层 Device.findImageDetail。"""
+    calls = []
+
+    def fake_detail(self, img, cutPoints=None, per=0.9, grayScreenshot=None):
+        calls.append((img, cutPoints, per))
+        return make_match(10, 10, 20, 20)
+
+    monkeypatch.setattr(Device, "findImageDetail", fake_detail, raising=False)
+    g = make_gaming(real_config_dir)
+    del g.findImageDetail
+    g.device_calls = calls
+    return g
+
+
+class TestSameFrameMemo:
+    def test_same_frame_matches_once(self, memo_gaming):
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        assert len(memo_gaming.device_calls) == 1, "同帧同模板同阈值只应匹配一次"
+
+    def test_key_includes_roi_and_threshold(self, memo_gaming):
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.9)
+        memo_gaming.findImageDetail("buttons\\fight.png", cutPoints=((0, 0), (50, 50)), per=0.8)
+        assert len(memo_gaming.device_calls) == 3
+
+    def test_invalidate_forces_rematch(self, memo_gaming):
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        memo_gaming._screen_cache.invalidate()  # click/swipe 后的效果
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        assert len(memo_gaming.device_calls) == 2
+
+    def test_explicit_gray_bypasses_memo(self, memo_gaming):
+        gray = memo_gaming.grayScreenshot()
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8, grayScreenshot=gray)
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8, grayScreenshot=gray)
+        assert len(memo_gaming.device_calls) == 2
+
+
+class TestResultIsolation:
+    def test_transform_does_not_leak_into_cache(self, memo_gaming):
+        """exec_match 会原地 transform 结果，缓存对象不能被污染。"""
+        first = memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        first.transform("left|1")
+        second = memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        assert second.matchTempletePoint[0] == (10, 10)
+        assert second.baseGrayScreenshot is first.baseGrayScreenshot, "截图数组应共享不复制"
+
+
+class TestHotRegion:
+    def test_learned_region_searched_first(self, memo_gaming):
+        tm = memo_gaming.task_manage
+        tm.get_img_name = lambda img: img
+        tm.hot_regions.margin = 5
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        memo_gaming._screen_cache.invalidate()
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        assert memo_gaming.device_calls[0][1] is None, "首次无学习记录，全屏匹配"
+        assert memo_gaming.device_calls[1][1] == ((5, 5), (25, 25)), "再次匹配先搜热区"
+        assert len(memo_gaming.device_calls) == 2, "热区命中不再全屏匹配"
+
+    def test_explicit_region_not_overridden(self, memo_gaming):
+        tm = memo_gaming.task_manage
+        tm.get_img_name = lambda img: img
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        memo_gaming._screen_cache.invalidate()
+        memo_gaming.findImageDetail("buttons\\fight.png", cutPoints=((0, 0), (100, 100)), per=0.8)
+        assert memo_gaming.device_calls[-1][1] == ((0, 0), (100, 100))
+
+    def test_bypass_searches_full_screen(self, memo_gaming):
+        tm = memo_gaming.task_manage
+        tm.get_img_name = lambda img: img
+        memo_gaming.findImageDetail("buttons\fight.png", per=0.8)
+        memo_gaming._screen_cache.invalidate()
+        memo_gaming._hot_bypass = True
+        memo_gaming.findImageDetail("buttons\fight.png", per=0.8)
+        assert [c[1] for c in memo_gaming.device_calls] == [None, None], "点击 index>0 时不走热区"
+
+    def test_multi_hit_inside_region_learned(self, memo_gaming, monkeypatch):
+        tm = memo_gaming.task_manage
+        tm.get_img_name = lambda img: img
+        memo_gaming.findImageDetail("buttons\fight.png", per=0.8)
+        two = make_match(10, 10, 20, 20)
+        two.matchTempletePoints = two.matchTempletePoints * 2
+        two.matchTempleteCenterPoints = two.matchTempleteCenterPoints * 2
+        monkeypatch.setattr(Device, "findImageDetail", lambda self, *a, **k: two, raising=False)
+        memo_gaming._screen_cache.invalidate()
+        memo_gaming.findImageDetail("buttons\fight.png", per=0.8)
+        assert tm.hot_regions.lookup("buttons\fight.png", 200, 200) is None, "热区内命中多处应标记 multi"
+
+
+class TestMatchMode:
+    def test_mode_in_memo_key(self, memo_gaming):
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        memo_gaming._match_mode = "pyramid"
+        memo_gaming.findImageDetail("buttons\\fight.png", per=0.8)
+        assert len(memo_gaming.device_calls) == 2, "切换匹配模式不应复用另一模式的结果"
+
+    def test_pyramid_small_template_falls_back(self, memo_gaming, monkeypatch):
+        full = []
+        monkeypatch.setattr("jczx.jczxCli.match_locations", lambda *a: full.append(a) or [])
+        memo_gaming._match_mode = "pyramid|4"
+        memo_gaming.findImageDetail(np.zeros((8, 8), np.uint8), per=0.8)
+        assert len(full) == 1, "缩小后过小的模板应回退全分辨率匹配"
+
+    def test_array_template_matched_in_engine(self, memo_gaming):
+        for mode in ("full", "pyramid"):
+            memo_gaming._match_mode = mode
+            mt = memo_gaming.findImageDetail(np.zeros((40, 40), np.uint8), per=0.8)
+            assert mt is not None
+        assert memo_gaming.device_calls == [], "模板数组由引擎自行匹配（NMS 去重）"
+
+    def test_hits_in_row_major_order(self, memo_gaming, monkeypatch):
+        monkeypatch.setattr("jczx.jczxCli.match_locations",
+                            lambda *a: [(50, 80, 0.99), (10, 20, 0.95), (90, 20, 0.91)])
+        mt = memo_gaming.findImageDetail(np.zeros((10, 10), np.uint8), per=0.8)
+        assert mt.matchTempleteCenterPoints == [(15, 25), (95, 25), (55, 85)], "index 按行优先，与旧版一致"
@@ -8,9 +8,12 @@ import logging
 import os
 from types import SimpleNamespace
 
-from jczx.jczxCli import JczxCli
+from jczx.devicePool import DevicePool
+from jczx.jczxCli import JczxCli, TaskExecutionManager
 from jczx.mcpServer import JczxMcpServer
 
+from tests.engine.fake_device import make_gaming
+
 
 def make_host(gaming):
     return SimpleNamespace(device=gaming, logger=logging.getLogger("mcp-test"))
@@ -32,13 +35,13 @@ def make_save_host(gaming, tmp_path):
 
 
 class TestToolRegistration:
-    def test_nine_tools_registered(self, gaming):
+    def test_tools_registered(self, gaming):
         server = JczxMcpServer(make_host(gaming), 8765, logging.getLogger("mcp-test"))
         names = {t.name for t in asyncio.run(server._mcp.list_tools())}
         assert names == {
             "screenshot", "click", "swipe", "drag",
             "get_resolution", "crop_screenshot", "save_screenshot", "get_screenshot_mode",
-            "run_entity",
+            "run_entity", "list_devices", "run_queue", "stop_device",
         }
 
 
@@ -297,6 +300,103 @@ class TestRunEntity:
         assert any("MCP 执行实体 [click-a]" in r.message for r in caplog.records)
 
 
+class TestMultiDevice:
+    """device 参数路由到设备池中的引擎；list_devices / run_queue / stop_device。"""
+
+    def _host(self, gaming, real_config_dir, started=None):
+        gaming.device_id = "emulator-5554"
+        other = make_gaming(real_config_dir)
+        other.device_id = "emulator-5556"
+        other._exec_mgr = TaskExecutionManager()
+        pool = DevicePool(lambda serial: other)
+        pool.add(gaming.device_id, gaming)
+        host = make_host(gaming)
+        host.pool = pool
+        started = started if started is not None else []
+        host.start_queue = lambda queue_id, serial=None: started.append((queue_id, serial)) or ""
+        return host, other
+
+    def test_device_param_routes_to_pool(self, gaming, real_config_dir):
+        host, other = self._host(gaming, real_config_dir)
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        other.exec = lambda name: other.clicks.append(name)
+        gaming.exec = lambda name: gaming.clicks.append(name)
+        server._do_run_entity("goto-home", device="emulator-5556")
+        assert other.clicks == ["goto-home"] and gaming.clicks == []
+
+    def test_list_devices_marks_current(self, gaming, real_config_dir):
+        host, _ = self._host(gaming, real_config_dir)
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        host.pool.acquire("emulator-5556")
+        devices = {d["serial"]: d for d in server._do_list_devices()}
+        assert devices["emulator-5554"]["current"] is True
+        assert devices["emulator-5556"]["current"] is False
+        assert not devices["emulator-5556"]["running"]
+
+    def test_run_queue_delegates_to_host(self, gaming, real_config_dir):
+        started = []
+        host, _ = self._host(gaming, real_config_dir, started)
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        assert "emulator-5556" in server._do_run_queue("queue-daily", device="emulator-5556")
+        assert started == [("queue-daily", "emulator-5556")]
+
+    def test_run_queue_error_raises(self, gaming, real_config_dir):
+        host, _ = self._host(gaming, real_config_dir)
+        host.start_queue = lambda queue_id, serial=None: "队列不存在: x"
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        try:
+            server._do_run_queue("x")
+            assert False, "应抛启动失败原因"
+        except RuntimeError as e:
+            assert "队列不存在" in str(e)
+
+    def test_stop_device(self, gaming, real_config_dir):
+        host, other = self._host(gaming, real_config_dir)
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        other._exec_mgr.start("queue-daily")
+        server._do_stop_device(device="emulator-5556")
+        assert other._exec_mgr.token.is_cancelled()
+
+    def test_host_status_and_stop_preferred(self, gaming, real_config_dir):
+        """多进程模式：状态与停止走宿主（工作进程监督者），不操作本进程引擎。"""
+        host, other = self._host(gaming, real_config_dir)
+        stopped = []
+        host.device_status = lambda: [{"serial": "emulator-5556", "running": True, "job": "q", "progress": "",
+                                       "elapsed": 1.0, "pid": 42, "restarts": 0}]
+        host.stop_device = lambda serial=None: stopped.append(serial)
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        assert server._do_list_devices()[0]["pid"] == 42
+        server._do_stop_device(device="emulator-5556")
+        assert stopped == ["emulator-5556"]
+        assert not other._exec_mgr.token.is_cancelled()
+
+    def test_unconnected_serial_rejected(self, gaming, real_config_dir):
+        started = []
+        host, other = self._host(gaming, real_config_dir, started)
+        other.exec = lambda name: other.clicks.append(name)
+        host.connected_serials = lambda: ["emulator-5554", "emulator-5556"]
+        server = JczxMcpServer(host, 8765, logging.getLogger("mcp-test"))
+        for call in (lambda: server._do_screenshot(device="emulator-5557"),
+                     lambda: server._do_run_queue("queue-daily", device="emulator-5557")):
+            try:
+                call()
+                assert False, "未连接的 serial 应报错"
+            except RuntimeError as e:
+                assert "未连接" in str(e)
+        assert started == []
+        assert [st["serial"] for st in host.pool.status()] == ["emulator-5554"], "不应加入设备池"
+        server._do_run_entity("goto-home", device="emulator-5556")
+        assert other.clicks == ["goto-home"]
+
+    def test_no_pool_raises(self, gaming):
+        server = JczxMcpServer(make_host(gaming), 8765, logging.getLogger("mcp-test"))
+        try:
+            server._do_screenshot(device="emulator-5556")
+            assert False, "无设备池时应报错"
+        except RuntimeError as e:
+            assert "多设备" in str(e)
+
+
 class TestInitMcp:
     def test_init_mcp_starts_daemon_thread(self, monkeypatch):
         cli = object.__new__(JczxCli)
@@ -0,0 +1,73 @@
+"""方案 2：region / testFor_region / wait_target_region 搜索区域 — 解析与 cutPoints 透传。"""
+from jczx.configEntity import JczxSectionEntity
+from jczx.jczxCli import JCZXGaming
+
+from tests.engine.fake_device import make_match
+
+# fake_device 截图为 200x200
+
+
+def _entity(**kw):
+    e = JczxSectionEntity()
+    for k, v in kw.items():
+        setattr(e, k, v)
+    return e
+
+
+class TestParseRegion:
+    def test_proportion(self):
+        assert JCZXGaming._parse_region("0.5,0,1,0.5", 2400, 1080) == ((1200, 0), (2400, 540))
+
+    def test_grid_cell_matches_legacy_screen_cut(self):
+        """cut3x3|2,0 与旧版 ScreenCut.cut3x3(2, 0) 相同。"""
+        assert JCZXGaming._parse_region("cut3x3|2,0", 1920, 1080) == ((1280, 0), (1920, 360))
+
+    def test_grid_span(self):
+        assert JCZXGaming._parse_region("cut4x2|1,0|2,1", 1920, 1080) == ((480, 0), (1440, 1080))
+
+    def test_clamped_to_screen(self):
+        assert JCZXGaming._parse_region("0.5,0.5,1.2,1.5", 200, 100) == ((100, 50), (200, 100))
+
+    def test_invalid_returns_none(self):
+        for text in ("abc", "0.1,0.2", "cut3x3|a,b", "cut0x3|0,0", "0.5,0.5,0.5,1"):
+            assert JCZXGaming._parse_region(text, 200, 200) is None, text
+
+
+class TestRegionPassThrough:
+    def test_match_uses_region(self, gaming):
+        gaming.matcher.results["buttons\\Some.png"] = make_match(150, 10, 160, 20)
+        e = _entity(type="match", target="buttons\\Some.png", region="0.5,0,1,0.5")
+        gaming.exec_match(e)
+        assert gaming.matcher.calls[-1][1] == ((100, 0), (200, 100))
+
+    def test_region_placeholder_resolved(self, gaming):
+        gaming._context["corner"] = "cut2x2|1,1"
+        e = _entity(type="match", target="buttons\\Some.png", region="%{corner}")
+        gaming.exec_match(e)
+        assert gaming.matcher.calls[-1][1] == ((100, 100), (200, 200))
+
+    def test_invalid_region_falls_back_to_full_screen(self, gaming):
+        e = _entity(type="match", target="buttons\\Some.png", region="oops")
+        gaming.exec_match(e)
+        assert gaming.matcher.calls[-1][1] is None
+
+    def test_no_region_full_screen(self, gaming):
+        e = _entity(type="match", target="buttons\\Some.png")
+        gaming.exec_match(e)
+        assert gaming.matcher.calls[-1][1] is None
+
+    def test_testFor_before_uses_testFor_region(self, gaming):
+        gaming.matcher.results["buttons\\fight.png"] = make_match(10, 10, 20, 20)
+        e = _entity(type="task", testFor_before="buttons\\fight.png", testFor_region="cut2x2|0,0",
+                    testFor_max_wait=1.0)
+        gaming._exec_entity(e, lambda ent: None, testFor=True)
+        cut = [c[1] for c in gaming.matcher.calls if c[0] == "buttons\\fight.png"]
+        assert cut and cut[0] == ((0, 0), (100, 100))
+
+    def test_wait_target_uses_wait_target_region(self, gaming):
+        gaming.matcher.results["buttons\\giftPackage.png"] = make_match(0, 0, 10, 10)
+        e = _entity(type="task", wait_target="buttons\\giftPackage.png", max_wait=2,
+                    wait_target_region="0,0,0.5,1")
+        gaming._exec_entity(e, lambda ent: None)
+        cut = [c[1] for c in gaming.matcher.calls if c[0] == "buttons\\giftPackage.png"]
+        assert cut and cut[0] == ((0, 0), (100, 200))
@@ -0,0 +1,80 @@
+"""方案 2：界面识别 — classify_scene 同帧批量匹配 / 优先级 / 已知区域 / 上下文；in_scene 只匹配指定场景。"""
+from tests.engine.fake_device import make_match
+
+WIN = "locations\\fightWin.png"
+ON_FIGHT = "locations\\onFight.png"
+
+
+class TestClassifyScene:
+    def test_unrecognized(self, gaming):
+        assert gaming.classify_scene() == ""
+        assert gaming._context["scene"] == ""
+
+    def test_priority_and_all_hits(self, gaming):
+        gaming.matcher.results[WIN] = make_match(10, 10, 20, 20)
+        gaming.matcher.results[ON_FIGHT] = make_match(10, 10, 20, 20)
+        assert gaming.classify_scene() == "onFight"
+        assert gaming._context["scenes"] == "onFight,fightWin"
+
+    def test_known_region_used(self, gaming):
+        gaming.matcher.results[WIN] = make_match(10, 10, 20, 20)
+        gaming.classify_scene()
+        calls = {img: (cut, per) for img, cut, per in gaming.matcher.calls}
+        assert calls[WIN] == (((0, 0), (100, 100)), 0.9)  # cut2x2|0,0 on 200x200
+        assert calls["locations\\hasNew.png"][0] is None
+
+    def test_one_capture_per_pass(self, gaming):
+        captures = []
+        capture = gaming._screen_cache._capture
+        gaming._screen_cache._capture = lambda: captures.append(1) or capture()
+        gaming._screen_cache.invalidate()
+        gaming.classify_scene()
+        assert len(captures) == 1
+
+
+class TestInScene:
+    def test_only_requested_scenes_matched(self, gaming):
+        gaming.matcher.results[WIN] = make_match(10, 10, 20, 20)
+        assert gaming.in_scene("fightWin", "fightLoss1") is True
+        assert {c[0] for c in gaming.matcher.calls} == {WIN, "locations\\fightLoss1.png"}
+
+    def test_not_in_scene(self, gaming):
+        assert gaming.in_scene("levels") is False
+
+
+class TestGotoScene:
+    """goto_scene：按标志图定位起点、沿真实配置的导航图执行、到达校验与重新规划。"""
+
+    JJC_ROUTE = ["goto-home", "click-fight", "click-simulate", "click-jjc"]
+
+    def _run(self, gaming, arrive_after=None):
+        executed = []
+
+        def fake_exec(key):
+            executed.append(key)
+            if key == arrive_after:
+                gaming.matcher.results["locations\\competitionTimesLoc.png"] = make_match(10, 10, 20, 20)
+            gaming._screen_cache.invalidate()
+        gaming.exec = fake_exec
+        return executed
+
+    def test_unknown_start_goes_home_first(self, gaming):
+        executed = self._run(gaming, arrive_after="click-jjc")
+        assert gaming.goto_scene("jjc") is True
+        assert executed == self.JJC_ROUTE
+
+    def test_known_start_skips_home(self, gaming):
+        gaming.matcher.results["buttons\\activities.png"] = make_match(10, 10, 20, 20)
+        executed = self._run(gaming, arrive_after="click-jjc")
+        assert gaming.goto_scene("jjc") is True
+        assert executed == ["click-simulate", "click-jjc"]
+
+    def test_replans_from_unknown_when_not_arrived(self, gaming):
+        gaming.matcher.results["buttons\\activities.png"] = make_match(10, 10, 20, 20)
+        executed = self._run(gaming)
+        assert gaming.goto_scene("jjc") is False
+        assert executed == ["click-simulate", "click-jjc"] + self.JJC_ROUTE
+
+    def test_locate_scene(self, gaming):
+        gaming.matcher.results["buttons\\fight.png"] = make_match(10, 10, 20, 20)
+        assert gaming.locate_scene() == "home"
@@ -0,0 +1,70 @@
+"""方案 2：wait_any — 同帧多模板、列表顺序优先、match 实体候选、按位置分支、超时与 context_key。"""
+from jczx.configEntity import JczxSectionEntity
+
+from tests.engine.fake_device import make_match, patch_clock
+
+WIN = "battle\\win.png"
+LOSE = "battle\\lose.png"
+
+
+def _entity(**kw):
+    e = JczxSectionEntity()
+    for k, v in kw.items():
+        setattr(e, k, v)
+    return e
+
+
+def _pool(gaming, **entities):
+    for key, e in entities.items():
+        e.only_key = key
+        gaming.task_manage.entity_pool[key] = e
+
+
+class TestWaitAny:
+    def test_first_hit_in_list_order(self, gaming):
+        gaming.matcher.results[WIN] = make_match(10, 10, 20, 20)
+        gaming.matcher.results[LOSE] = make_match(30, 30, 40, 40)
+        e = _entity(type="wait_any", targets=f"{LOSE},{WIN}")
+        assert gaming.exec(e) == LOSE
+
+    def test_all_candidates_matched_on_one_frame(self, gaming):
+        captures = []
+        capture = gaming._screen_cache._capture
+        gaming._screen_cache._capture = lambda: captures.append(1) or capture()
+        gaming._screen_cache.invalidate()
+        e = _entity(type="wait_any", targets=f"{WIN},{LOSE},buttons\\popup.png")
+        assert gaming.exec(e) is None
+        assert {c[0] for c in gaming.matcher.calls} == {WIN, LOSE, "buttons\\popup.png"}
+        assert len(captures) == 1
+
+    def test_match_entity_candidate_uses_its_region(self, gaming):
+        gaming.matcher.results[WIN] = make_match(10, 10, 20, 20)
+        _pool(gaming, **{"match-win": _entity(type="match", target=WIN, region="0,0,0.5,0.5", per=0.9)})
+        e = _entity(type="wait_any", targets="match-win")
+        assert gaming.exec(e) == "match-win"
+        img, cut, per = gaming.matcher.calls[-1]
+        assert img == WIN and cut == ((0, 0), (100, 100)) and per == 0.9
+
+    def test_branch_by_position(self, gaming):
+        order = []
+        gaming.record_step = lambda tag: order.append(tag)
+        _pool(gaming, **{
+            "on-win": _entity(type="func", func="record_step", args=["win"]),
+            "on-lose": _entity(type="func", func="record_step", args=["lose"]),
+        })
+        gaming.matcher.results[LOSE] = make_match(10, 10, 20, 20)
+        e = _entity(type="wait_any", targets=f"{WIN},{LOSE}", condition_then="on-win,on-lose",
+                    context_key="battle_result")
+        gaming.exec(e)
+        assert order == ["lose"]
+        assert gaming._context["battle_result"] == LOSE
+
+    def test_timeout_runs_else(self, gaming, monkeypatch):
+        patch_clock(monkeypatch, gaming)
+        order = []
+        gaming.record_step = lambda tag: order.append(tag)
+        _pool(gaming, **{"on-timeout": _entity(type="func", func="record_step", args=["timeout"])})
+        e = _entity(type="wait_any", targets=f"{WIN},{LOSE}", max_wait=3, condition_else="on-timeout")
+        assert gaming.exec(e) is None
+        assert order == ["timeout"]
+        assert gaming.token.now >= 3
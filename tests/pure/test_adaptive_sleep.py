@@ -0,0 +1,103 @@
+"""方案 1（纯逻辑）：SleepStats 分位数建议 / 配置上限 / 按设备隔离 / 持久化（多进程合并）；frame_delta。"""
+import numpy as np
+
+from jczx.adaptiveSleep import SleepStats, frame_delta, percentile
+
+
+def _stats(tmp_path, **kw):
+    kw.setdefault("min_samples", 3)
+    kw.setdefault("margin", 0.0)
+    return SleepStats(str(tmp_path / "SleepStats.json"), **kw)
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        assert percentile([0.1, 0.2, 0.3, 0.4, 1.0], 90) == 1.0
+        assert percentile([0.1, 0.2, 0.3, 0.4, 1.0], 50) == 0.3
+        assert percentile([0.5], 90) == 0.5
+
+
+class TestSuggest:
+    def test_configured_until_enough_samples(self, tmp_path):
+        stats = _stats(tmp_path)
+        stats.record("dev", "goto:sleep", 0.4)
+        stats.record("dev", "goto:sleep", 0.4)
+        assert stats.suggest("dev", "goto:sleep", 2.0) == 2.0
+
+    def test_learned_percentile_plus_margin(self, tmp_path):
+        stats = _stats(tmp_path, margin=0.2)
+        for v in (0.3, 0.4, 0.5):
+            stats.record("dev", "goto:sleep", v)
+        assert stats.suggest("dev", "goto:sleep", 2.0) == 0.7
+
+    def test_configured_is_upper_bound(self, tmp_path):
+        stats = _stats(tmp_path)
+        for _ in range(3):
+            stats.record("dev", "goto:sleep", 5.0)
+        assert stats.suggest("dev", "goto:sleep", 2.0) == 2.0
+
+    def test_per_device(self, tmp_path):
+        stats = _stats(tmp_path)
+        for _ in range(3):
+            stats.record("fast", "goto:sleep", 0.1)
+        assert stats.suggest("slow", "goto:sleep", 2.0) == 2.0
+
+    def test_disabled_never_shortens(self, tmp_path):
+        stats = _stats(tmp_path, enabled=False)
+        for _ in range(3):
+            stats.record("dev", "goto:sleep", 0.1)
+        assert stats.samples("dev", "goto:sleep") == []
+        assert stats.suggest("dev", "goto:sleep", 2.0) == 2.0
+
+    def test_keeps_recent_samples(self, tmp_path):
+        stats = _stats(tmp_path, max_samples=3)
+        for v in (1.0, 1.0, 1.0, 0.1, 0.1, 0.1):
+            stats.record("dev", "k", v)
+        assert stats.samples("dev", "k") == [0.1, 0.1, 0.1]
+
+
+class TestPersistence:
+    def test_save_and_reload(self, tmp_path):
+        stats = _stats(tmp_path)
+        stats.record("dev", "k", 0.25)
+        stats.save()
+        assert _stats(tmp_path).samples("dev", "k") == [0.25]
+
+    def test_processes_merge_per_device(self, tmp_path):
+        """多进程模式：两个进程各自加载同一文件，后保存的不覆盖另一台设备的样本。"""
+        a, b = _stats(tmp_path), _stats(tmp_path)
+        a.record("dev-a", "k", 0.1)
+        b.record("dev-b", "k", 0.2)
+        a.save()
+        b.save()
+        again = _stats(tmp_path)
+        assert again.samples("dev-a", "k") == [0.1] and again.samples("dev-b", "k") == [0.2]
+
+    def test_clear_device_removed_on_save(self, tmp_path):
+        stats = _stats(tmp_path)
+        stats.record("dev-a", "k", 0.1)
+        stats.record("dev-b", "k", 0.2)
+        stats.save()
+        other = _stats(tmp_path)
+        other.clear("dev-a")
+        other.save()
+        again = _stats(tmp_path)
+        assert again.samples("dev-a", "k") == [] and again.samples("dev-b", "k") == [0.2]
+
+    def test_corrupt_file_relearns(self, tmp_path):
+        (tmp_path / "SleepStats.json").write_text("{bad", encoding="utf-8")
+        assert _stats(tmp_path).samples("dev", "k") == []
+
+
+class TestFrameDelta:
+    def test_identical_frames(self):
+        a = np.full((10, 10), 100, np.uint8)
+        assert frame_delta(a, a.copy()) == 0.0
+
+    def test_changed_frames(self):
+        a = np.zeros((10, 10), np.uint8)
+        b = np.full((10, 10), 50, np.uint8)
+        assert frame_delta(a, b) == 50.0
+
+    def test_shape_change_is_infinite(self):
+        assert frame_delta(np.zeros((10, 10), np.uint8), np.zeros((5, 5), np.uint8)) == float("inf")
@@ -0,0 +1,67 @@
+"""方案 1（纯逻辑）：CPU 预算 — 核列表解析、按设备槽位分配核组、OpenCV 线程数、进程亲和性。"""
+import os
+import sys
+
+import cv2
+import pytest
+
+from jczx.cpuBudget import apply_cv_threads, parse_cpus, plan_affinity, set_affinity
+
+
+class TestParseCpus:
+    def test_ranges_and_singles(self):
+        assert parse_cpus("0-3,6") == [0, 1, 2, 3, 6]
+
+    def test_dedup_sorted(self):
+        assert parse_cpus("3, 1,1-2") == [1, 2, 3]
+
+    @pytest.mark.parametrize("text", ["", "3-1", "-1", "a"])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_cpus(text)
+
+
+class TestPlanAffinity:
+    def test_off(self):
+        assert plan_affinity("off", 0, 2, 8) is None
+        assert plan_affinity("", 3, 2, 8) is None
+
+    def test_auto_consecutive_groups(self):
+        assert [plan_affinity("auto", slot, 2, 8) for slot in range(3)] == [[0, 1], [2, 3], [4, 5]]
+
+    def test_auto_wraps_when_more_devices_than_cores(self):
+        assert plan_affinity("auto", 4, 2, 8) == [0, 1]
+        assert plan_affinity("auto", 1, 3, 4) == [0, 1, 3]
+
+    def test_auto_cores_capped(self):
+        assert plan_affinity("auto", 0, 16, 4) == [0, 1, 2, 3]
+
+    def test_explicit_groups_by_slot(self):
+        assert plan_affinity("0-3;4-7", 1, 2, 8) == [4, 5, 6, 7]
+        assert plan_affinity("0-3;4-7", 2, 2, 8) == [0, 1, 2, 3]
+
+    def test_explicit_drops_missing_cores(self):
+        assert plan_affinity("2-5", 0, 2, 4) == [2, 3]
+        assert plan_affinity("6-7", 0, 2, 4) is None
+
+
+class TestApply:
+    def test_cv_threads(self):
+        before = cv2.getNumThreads()
+        try:
+            apply_cv_threads(1)
+            assert cv2.getNumThreads() == 1
+            apply_cv_threads(-1)
+            assert cv2.getNumThreads() == 1
+        finally:
+            cv2.setNumThreads(before)
+
+    @pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="仅 Linux 可读取亲和性")
+    def test_set_affinity_current_process(self):
+        before = os.sched_getaffinity(0)
+        try:
+            target = [min(before)]
+            assert set_affinity(target) is True
+            assert os.sched_getaffinity(0) == set(target)
+        finally:
+            os.sched_setaffinity(0, before)
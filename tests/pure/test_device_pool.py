@@ -0,0 +1,178 @@
+"""方案 1（纯逻辑）：设备池 — 按 serial 懒创建引擎、同设备互斥 / 不同设备并行、结束复位、进度与状态、断开移除。"""
+import logging
+import threading
+import time
+
+from jczx.devicePool import DeviceLog, DevicePool
+
+
+class FakeMgr:
+    """TaskExecutionManager 的最小替身。"""
+
+    def __init__(self):
+        self.task_id = None
+        self.cancelled = False
+
+    def is_running(self) -> bool:
+        return self.task_id is not None and not self.cancelled
+
+    def start(self, task_id: str) -> None:
+        self.task_id, self.cancelled = task_id, False
+
+    def stop(self) -> None:
+        self.cancelled = True
+
+    def reset(self) -> None:
+        self.task_id, self.cancelled = None, False
+
+
+class FakeDevice:
+    def __init__(self, serial: str):
+        self.device_id = serial
+        self._exec_mgr = FakeMgr()
+
+
+def _pool(created=None) -> DevicePool:
+    def factory(serial):
+        if created is not None:
+            created.append(serial)
+        return FakeDevice(serial)
+    return DevicePool(factory, max_devices=4)
+
+
+def _blocking_job():
+    """返回 (job, release)：job 阻塞到 release 被调用。"""
+    gate = threading.Event()
+    return (lambda device: gate.wait(5)), gate.set
+
+
+class TestRegistry:
+    def test_acquire_creates_once(self):
+        created = []
+        pool = _pool(created)
+        assert pool.acquire("a") is pool.acquire("a")
+        assert created == ["a"]
+
+    def test_add_rebinds_serial(self):
+        pool = _pool()
+        device = FakeDevice("a")
+        pool.add("a", device)
+        pool.add("b", device)
+        assert pool.serials == ["b"]
+
+    def test_sync_removes_disconnected_idle(self):
+        pool = _pool()
+        pool.acquire("a")
+        pool.acquire("b")
+        assert pool.sync(["a"]) == ["b"]
+        assert pool.serials == ["a"]
+
+    def test_sync_keeps_running(self):
+        pool = _pool()
+        job, release = _blocking_job()
+        pool.start("a", "q", job)
+        assert pool.sync([]) == []
+        release()
+        pool.shutdown()
+
+
+class TestRun:
+    def test_same_device_exclusive(self):
+        pool = _pool()
+        job, release = _blocking_job()
+        assert pool.start("a", "q1", job) is True
+        assert pool.start("a", "q2", job) is False
+        release()
+        pool.shutdown()
+
+    def test_devices_run_in_parallel(self):
+        pool = _pool()
+        both = threading.Barrier(2, timeout=5)
+        done = []
+        finished = threading.Event()
+
+        def on_done(serial, job_id):
+            done.append((serial, job_id))
+            if len(done) == 2:
+                finished.set()
+
+        assert pool.start("a", "q1", lambda d: both.wait(), on_done)
+        assert pool.start("b", "q2", lambda d: both.wait(), on_done)
+        assert finished.wait(5), "两台设备应同时执行（互相等待）"
+        assert sorted(done) == [("a", "q1"), ("b", "q2")]
+
+    def test_finish_resets_manager_even_on_error(self):
+        pool = _pool()
+        finished = threading.Event()
+
+        def boom(device):
+            raise RuntimeError("x")
+
+        pool.start("a", "q", boom, lambda s, j: finished.set())
+        assert finished.wait(5)
+        assert pool.get("a")._exec_mgr.task_id is None
+        assert not pool.is_running("a")
+
+    def test_stop_only_target_device(self):
+        pool = _pool()
+        job, release = _blocking_job()
+        pool.start("a", "q1", job)
+        pool.start("b", "q2", job)
+        pool.stop("a")
+        assert pool.get("a")._exec_mgr.cancelled and not pool.get("b")._exec_mgr.cancelled
+        release()
+        pool.shutdown()
+
+
+class TestStatus:
+    def test_progress_reported_per_device(self):
+        pool = _pool()
+        job, release = _blocking_job()
+        pool.acquire("idle")
+        pool.start("a", "queue-daily", job)
+        pool.set_progress("a", "日常 2/5 领取邮件")
+        status = {st["serial"]: st for st in pool.status()}
+        assert status["a"]["running"] and status["a"]["job"] == "queue-daily"
+        assert status["a"]["progress"] == "日常 2/5 领取邮件"
+        assert status["idle"] == {"serial": "idle", "running": False, "job": "", "progress": "", "elapsed": 0,
+                                  "cpu": 0}
+        release()
+        pool.shutdown()
+
+
+class TestDeviceLog:
+    def test_prefix(self, caplog):
+        log = DeviceLog(logging.getLogger("pool-test"), "127.0.0.1:7555")
+        with caplog.at_level(logging.INFO, logger="pool-test"):
+            log.info("开始")
+        assert caplog.records[-1].getMessage() == "[127.0.0.1:7555] 开始"
+
+
+class TestCpu:
+    def test_job_thread_cpu_accumulates(self):
+        pool = _pool()
+        finished = threading.Event()
+
+        def busy(device):
+            end = time.thread_time() + 0.1
+            while time.thread_time() < end:
+                pass
+            pool.set_progress("a", "x")
+
+        pool.start("a", "q", busy, lambda s, j: finished.set())
+        assert finished.wait(5)
+        first = pool.status()[0]["cpu"]
+        assert first >= 0.09
+        finished.clear()
+        pool.start("a", "q", busy, lambda s, j: finished.set())
+        assert finished.wait(5)
+        assert pool.status()[0]["cpu"] >= first + 0.09
+
+    def test_progress_from_other_thread_keeps_cpu(self):
+        pool = _pool()
+        job, release = _blocking_job()
+        pool.start("a", "q", job)
+        pool.set_progress("a", "y")
+        assert pool.status()[0]["cpu"] == 0
+        release()
+        pool.shutdown()
@@ -0,0 +1,215 @@
+"""方案 1（纯逻辑）：多进程监督者 — 命令下发、日志 / 进度 / 结束事件、设备互斥、崩溃自动重启与上限、关闭、CPU 预算。
+
+工作进程入口替换为本模块的 fake_worker（spawn 启动需可按模块名导入），不连接设备。
+"""
+import logging
+import os
+import threading
+import time
+
+from jczx.cpuBudget import plan_affinity
+from jczx.deviceWorker import DONE_CANCELLED, DONE_CRASHED, DONE_OK, JOB_QUEUE, JOB_TASK, WorkerSupervisor
+
+WAIT = 30
+
+
+def fake_worker(serial, options, conn):
+    """按 job id 模拟：hold = 等待 stop，crash = 进程异常退出，其余立即完成。启动时以日志回报收到的 cpus。
+
+    options 中的 start_delay 模拟初始化耗时（秒），之后才回报就绪。
+    """
+    time.sleep(options.get("start_delay", 0))
+    conn.send(("ready",))
+    conn.send(("log", logging.INFO, f"worker {serial} up"))
+    conn.send(("log", logging.INFO, f"cpus {options.get('cpus')}"))
+    current = None
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg[0] in (JOB_QUEUE, JOB_TASK):
+            conn.send(("started", msg[1]))
+            conn.send(("progress", f"{msg[1]} 1/2"))
+            conn.send(("cpu", 1.5))
+            if msg[1] == "crash":
+                os._exit(3)
+            if msg[1] == "hold":
+                current = msg[1]
+                continue
+            conn.send(("done", msg[1], DONE_OK))
+        elif msg[0] == "stop" and current:
+            conn.send(("done", current, DONE_CANCELLED))
+            current = None
+        elif msg[0] == "exit":
+            return
+
+
+class Events:
+    def __init__(self):
+        self.done = []
+        self._cond = threading.Condition()
+
+    def on_done(self, serial, job_id, kind, status):
+        with self._cond:
+            self.done.append((serial, job_id, kind, status))
+            self._cond.notify_all()
+
+    def wait_done(self, count: int) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.done) >= count, WAIT)
+
+
+def _supervisor(events: Events, log=None, **kw) -> WorkerSupervisor:
+    return WorkerSupervisor({}, log or logging.getLogger("worker-test"), on_done=events.on_done,
+                            restart_delay=0, target=fake_worker, **kw)
+
+
+def _wait(predicate) -> bool:
+    for _ in range(WAIT * 20):
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestJobs:
+    def test_queue_runs_and_reports_done(self, caplog):
+        events = Events()
+        sup = _supervisor(events)
+        try:
+            with caplog.at_level(logging.INFO, logger="worker-test"):
+                assert sup.start_queue("dev-a", "queue-daily") == ""
+                assert events.wait_done(1)
+                assert _wait(lambda: any("[dev-a] worker dev-a up" in r.getMessage() for r in caplog.records))
+            assert events.done == [("dev-a", "queue-daily", JOB_QUEUE, DONE_OK)]
+            assert not sup.is_running("dev-a")
+        finally:
+            sup.shutdown()
+
+    def test_same_device_exclusive_and_stop(self):
+        events = Events()
+        sup = _supervisor(events)
+        try:
+            assert sup.start_task("dev-a", "hold") == ""
+            assert sup.start_queue("dev-a", "other") != ""
+            status = {st["serial"]: st for st in sup.status()}
+            assert status["dev-a"]["running"] and status["dev-a"]["job"] == "hold"
+            assert _wait(lambda: sup.status()[0]["progress"] == "hold 1/2")
+            sup.stop("dev-a")
+            assert events.wait_done(1)
+            assert events.done == [("dev-a", "hold", JOB_TASK, DONE_CANCELLED)]
+        finally:
+            sup.shutdown()
+
+    def test_devices_have_separate_processes(self):
+        events = Events()
+        sup = _supervisor(events)
+        try:
+            sup.start_task("dev-a", "hold")
+            sup.start_task("dev-b", "hold")
+            pids = {st["serial"]: st["pid"] for st in sup.status()}
+            assert len({pids["dev-a"], pids["dev-b"], os.getpid()}) == 3
+            sup.stop()
+            assert events.wait_done(2)
+        finally:
+            sup.shutdown()
+
+
+class TestRestart:
+    def test_crashed_worker_restarted(self):
+        events = Events()
+        sup = _supervisor(events)
+        try:
+            sup.ensure("dev-a")
+            old_pid = sup.status()[0]["pid"]
+            sup.start_queue("dev-a", "crash")
+            assert events.wait_done(1)
+            assert events.done[0][3] == DONE_CRASHED
+            assert _wait(lambda: sup.status() and sup.status()[0]["pid"] != old_pid)
+            assert sup.status()[0]["restarts"] == 1
+            assert _wait(lambda: sup.start_queue("dev-a", "again") == "")
+            assert events.wait_done(2)
+            assert events.done[1][1:] == ("again", JOB_QUEUE, DONE_OK)
+        finally:
+            sup.shutdown()
+
+    def test_restart_limit(self):
+        events = Events()
+        sup = _supervisor(events, max_restarts=0)
+        try:
+            sup.start_queue("dev-a", "crash")
+            assert events.wait_done(1)
+            assert _wait(lambda: sup.serials == [])
+        finally:
+            sup.shutdown()
+
+
+class TestLifecycle:
+    def test_sync_closes_idle_disconnected(self):
+        sup = _supervisor(Events())
+        try:
+            sup.sync(["dev-a", "dev-b"])
+            process = {w: sup._workers[w].process for w in sup.serials}
+            sup.sync(["dev-a"])
+            assert _wait(lambda: sup.serials == ["dev-a"])
+            assert not process["dev-b"].is_alive()
+        finally:
+            sup.shutdown()
+
+    def test_shutdown_does_not_restart(self):
+        sup = _supervisor(Events())
+        sup.ensure("dev-a")
+        process = sup._workers["dev-a"].process
+        sup.shutdown()
+        assert not process.is_alive()
+        assert _wait(lambda: sup.serials == [])
+
+
+class TestStatus:
+    def test_starting_until_ready(self):
+        events = Events()
+        sup = WorkerSupervisor({"start_delay": 1}, logging.getLogger("worker-test"), on_done=events.on_done,
+                               restart_delay=0, target=fake_worker)
+        try:
+            assert sup.start_task("dev-a", "hold") == ""
+            status = sup.status()[0]
+            assert not status["ready"] and status["progress"] == "启动中"
+            assert _wait(lambda: sup.status()[0]["ready"])
+            assert _wait(lambda: sup.status()[0]["progress"] == "hold 1/2")
+            sup.stop("dev-a")
+            assert events.wait_done(1)
+        finally:
+            sup.shutdown()
+
+
+class TestCpuBudget:
+    def test_cpu_reported_in_status(self):
+        events = Events()
+        sup = _supervisor(events)
+        try:
+            sup.start_task("dev-a", "hold")
+            assert _wait(lambda: sup.status()[0]["cpu"] == 1.5)
+            sup.stop("dev-a")
+            assert events.wait_done(1)
+        finally:
+            sup.shutdown()
+
+    def test_affinity_slots_per_device(self, caplog):
+        sup = WorkerSupervisor({"affinity": "0;1;2"}, logging.getLogger("worker-test"), restart_delay=0,
+                               target=fake_worker)
+        try:
+            with caplog.at_level(logging.INFO, logger="worker-test"):
+                sup.sync(["dev-a", "dev-b"])
+                assert _wait(lambda: sum(" cpus " in r.getMessage() for r in caplog.records) == 2)
+            messages = {r.getMessage() for r in caplog.records}
+            expected = {f"[dev-{name}] cpus {plan_affinity('0;1;2', slot, 1, os.cpu_count())}"
+                        for slot, name in enumerate("ab")}
+            assert expected <= messages
+            assert sup._slots == {"dev-a": 0, "dev-b": 1}
+            sup.sync(["dev-b"])
+            assert _wait(lambda: sup.serials == ["dev-b"])
+            sup.ensure("dev-c")
+            assert sup._slots == {"dev-b": 1, "dev-c": 0}
+        finally:
+            sup.shutdown()
@@ -0,0 +1,122 @@
+"""方案 1（纯逻辑）：EntityCache 按文件缓存实体 / 内容哈希判定 / 实体图命中 / 持久化与版本。"""
+import os
+
+from jczx.configEntity import JczxSectionEntity
+from jczx.entityCache import EntityCache
+
+
+def _cache(tmp_path, **kw):
+    return EntityCache(str(tmp_path / "EntityCache.pickle"), **kw)
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+class _Parser:
+    """记录被调用次数的解析函数。"""
+
+    def __init__(self, target="buttons\\a.png"):
+        self.calls = 0
+        self.target = target
+
+    def __call__(self):
+        self.calls += 1
+        return {"a": JczxSectionEntity(type="click", target=self.target)}
+
+
+class TestFileEntities:
+    def test_unchanged_file_not_reparsed(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache, parse = _cache(tmp_path), _Parser()
+        cache.file_entities(path, parse)
+        entities = cache.file_entities(path, parse)
+        assert parse.calls == 1
+        assert entities["a"].target == "buttons\\a.png"
+
+    def test_changed_file_reparsed(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache, parse = _cache(tmp_path), _Parser()
+        cache.file_entities(path, parse)
+        _write(tmp_path / "a.txt", "[a]\ntype : click\n")
+        cache.file_entities(path, parse)
+        assert parse.calls == 2
+
+    def test_touch_only_keeps_cache(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache, parse = _cache(tmp_path), _Parser()
+        cache.file_entities(path, parse)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        cache.file_entities(path, parse)
+        assert parse.calls == 1
+
+    def test_results_are_fresh_copies(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache = _cache(tmp_path)
+        cache.file_entities(path, _Parser())
+        first = cache.file_entities(path, _Parser())
+        first["a"].target = "changed"
+        assert cache.file_entities(path, _Parser())["a"].target == "buttons\\a.png"
+
+    def test_disabled_always_parses(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache, parse = _cache(tmp_path, enabled=False), _Parser()
+        cache.file_entities(path, parse)
+        cache.file_entities(path, parse)
+        assert parse.calls == 2
+
+
+class TestGraph:
+    def test_hit_until_any_file_changes(self, tmp_path):
+        a = _write(tmp_path / "a.txt", "[a]\n")
+        b = _write(tmp_path / "b.txt", "[b]\n")
+        cache = _cache(tmp_path)
+        assert cache.get_graph([a, b]) is None
+        cache.put_graph([a, b], {"x": 1})
+        assert cache.get_graph([a, b]) == {"x": 1}
+        _write(tmp_path / "b.txt", "[b]\nx : 1\n")
+        assert cache.get_graph([a, b]) is None
+
+    def test_different_file_set_misses(self, tmp_path):
+        a = _write(tmp_path / "a.txt", "[a]\n")
+        b = _write(tmp_path / "b.txt", "[b]\n")
+        cache = _cache(tmp_path)
+        cache.put_graph([a, b], {"x": 1})
+        assert cache.get_graph([a]) is None
+
+    def test_missing_file_misses(self, tmp_path):
+        a = _write(tmp_path / "a.txt", "[a]\n")
+        cache = _cache(tmp_path)
+        assert cache.get_graph([a, str(tmp_path / "gone.txt")]) is None
+
+
+class TestPersistence:
+    def test_roundtrip(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache = _cache(tmp_path)
+        cache.file_entities(path, _Parser())
+        cache.put_graph([path], {"x": 1})
+        cache.save()
+        reloaded, parse = _cache(tmp_path), _Parser()
+        reloaded.file_entities(path, parse)
+        assert parse.calls == 0
+        assert reloaded.get_graph([path]) == {"x": 1}
+
+    def test_schema_mismatch_discarded(self, tmp_path, monkeypatch):
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        cache = _cache(tmp_path)
+        cache.file_entities(path, _Parser())
+        cache.save()
+        monkeypatch.setattr("jczx.entityCache._schema", lambda: "other")
+        parse = _Parser()
+        _cache(tmp_path).file_entities(path, parse)
+        assert parse.calls == 1
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        (tmp_path / "EntityCache.pickle").write_bytes(b"not a pickle")
+        path = _write(tmp_path / "a.txt", "[a]\n")
+        parse = _Parser()
+        _cache(tmp_path).file_entities(path, parse)
+        assert parse.calls == 1
@@ -0,0 +1,69 @@
+"""方案 1（纯逻辑）：ExecPlan 静态字段直取 / 动态字段闭包 / 静态 action 预取。"""
+from jczx.configEntity import JczxSectionEntity
+from jczx.execPlan import ExecPlan, compile_scalar, has_placeholder
+
+
+def _entity(**kw):
+    e = JczxSectionEntity()
+    for k, v in kw.items():
+        setattr(e, k, v)
+    return e
+
+
+class _Resolver:
+    def __init__(self, values):
+        self.values = values
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        for k, v in self.values.items():
+            text = text.replace(k, v)
+        return text
+
+
+class TestCompileScalar:
+    def test_static_value_not_compiled(self):
+        assert compile_scalar(1.5, "sleep", str) is None
+        assert compile_scalar("full", "match_mode", str) is None
+
+    def test_placeholder_converted_to_field_type(self):
+        fn = compile_scalar("%{n}", "times", _Resolver({"%{n}": "3"}))
+        assert fn() == 3
+
+    def test_conversion_failure_keeps_string(self):
+        fn = compile_scalar("%{n}", "times", _Resolver({"%{n}": "x"}))
+        assert fn() == "x"
+
+    def test_marks(self):
+        assert has_placeholder("${a}") and has_placeholder("@{a}") and has_placeholder("%{a}")
+        assert not has_placeholder("a{b}") and not has_placeholder(3)
+
+
+class TestExecPlan:
+    def test_static_scalar_skips_resolver(self):
+        resolve = _Resolver({})
+        plan = ExecPlan(_entity(type="click", sleep=2.0), None, resolve)
+        assert plan.scalar("sleep") == 2.0
+        assert plan.scalar("sleep") == 2.0
+        assert resolve.calls == 0
+
+    def test_dynamic_scalar_evaluated_each_time(self):
+        resolve = _Resolver({"%{n}": "2"})
+        plan = ExecPlan(_entity(type="click", times="%{n}"), None, resolve)
+        assert plan.scalar("times") == 2
+        resolve.values["%{n}"] = "5"
+        assert plan.scalar("times") == 5
+        assert resolve.calls == 2
+
+    def test_static_next_prefetched_once(self):
+        looked_up = []
+        plan = ExecPlan(_entity(type="task", action=["a", "b"]), None, str)
+        get = lambda key: looked_up.append(key) or key.upper()
+        assert plan.static_next(get) == ("A", "B")
+        assert plan.static_next(get) == ("A", "B")
+        assert looked_up == ["a", "b"]
+
+    def test_dynamic_action_not_prefetched(self):
+        plan = ExecPlan(_entity(type="task", action=["a", "%{next}"]), None, str)
+        assert plan.static_next(lambda key: key) is None
@@ -0,0 +1,132 @@
+"""方案 1（纯逻辑）：条件表达式微基准 — 真实配置中的 &{...} 表达式，对比旧版每次分词 + 递归解析。
+
+运行 ``pytest tests/pure/test_expr_benchmark.py -s`` 查看耗时，``JCZX_BENCHMARK=1`` 时断言编译缓存更快。
+"""
+import re
+from os.path import join
+
+from jczx.exprCompiler import compile_expression, tokenize
+from tests.conftest import CONFIG_DIR, benchmark, best_of
+
+_CONDITION = re.compile(r"^condition\s*:\s*&\{(.+)\}\s*$", re.M)
+_CTX = re.compile(r"%\{(.+?)\}")
+_EXEC = re.compile(r"@\{(.+?)\}")
+_CONFIG = re.compile(r"\$\{(.+?)\}")
+
+
+def _legacy_eval(expr, context, exec_fn, config_fn):
+    """旧版 PlaceholderResolver._parse_expression（条件模式，原样保留作对照）。"""
+    tokens = tokenize(expr)
+    pos = [0]
+
+    def parse_or():
+        left = parse_and()
+        while pos[0] < len(tokens) and tokens[pos[0]] == "|":
+            pos[0] += 1
+            left = bool(left) or bool(parse_and())
+        return left
+
+    def parse_and():
+        left = parse_cmp()
+        while pos[0] < len(tokens) and tokens[pos[0]] == "&":
+            pos[0] += 1
+            left = bool(left) and bool(parse_cmp())
+        return left
+
+    def parse_cmp():
+        left = parse_primary()
+        if pos[0] < len(tokens) and tokens[pos[0]] in (">=", "<=", ">", "<", "==", "!="):
+            op_token = tokens[pos[0]]
+            pos[0] += 1
+            right = parse_primary()
+            if op_token == ">=": return float(left) >= float(right)
+            if op_token == "<=": return float(left) <= float(right)
+            if op_token == ">":  return float(left) > float(right)
+            if op_token == "<":  return float(left) < float(right)
+            if op_token == "==": return str(left) == str(right)
+            if op_token == "!=": return str(left) != str(right)
+        return left
+
+    def parse_primary():
+        if pos[0] >= len(tokens):
+            return False
+        token = tokens[pos[0]]
+        pos[0] += 1
+        if token == "(":
+            result = parse_or()
+            if pos[0] < len(tokens) and tokens[pos[0]] == ")":
+                pos[0] += 1
+            return result
+        try:
+            if "." in token:
+                return float(token)
+            return int(token)
+        except (ValueError, TypeError):
+            pass
+        if _CTX.match(token):
+            return context.get(_CTX.match(token).group(1), "")
+        if _EXEC.match(token):
+            return exec_fn(_EXEC.match(token).group(1))
+        if _CONFIG.match(token):
+            return config_fn(token)
+        return exec_fn(token)
+
+    result = parse_or()
+    return bool(result) if result is not None else False
+
+
+def _config_expressions():
+    exprs = {}
+    for name in ("tasks/jjc.txt", "tasks/inllusion.txt", "tasks/receive.txt", "MainMenu.txt"):
+        with open(join(CONFIG_DIR, name), encoding="utf-8") as f:
+            for expr in _CONDITION.findall(f.read()):
+                exprs.setdefault(expr, name)
+    return list(exprs)
+
+
+# 各实体 / 变量取值让每个表达式都走完整分支（不被短路）
+_CONTEXT = {"near_ok": "1", "combat_power": "1000", "average_times": "5", "win_flag": "1",
+            "is_28": "", "in_getItem_flag": "1", "in_win_flag": ""}
+_ENTITIES = {"get-simulate-times": 3, "get-simulate-refresh-times": 1, "condition-jjc-in-28": True}
+
+
+def _exec(key):
+    return _ENTITIES.get(key, False)
+
+
+def _config(token):
+    return "2000"
+
+
+class TestConfigExpressions:
+    N = 2000
+
+    def test_jjc_expressions_collected(self):
+        exprs = _config_expressions()
+        assert "get-simulate-times > 0 & get-simulate-refresh-times > 0" in exprs
+        assert any("combat_power" in e for e in exprs)
+
+    def test_same_results_as_legacy(self):
+        for expr in _config_expressions():
+            assert compile_expression(expr, True)(_CONTEXT, _exec, _config) == \
+                _legacy_eval(expr, _CONTEXT, _exec, _config), expr
+
+    @benchmark
+    def test_compiled_faster(self):
+        exprs = _config_expressions()
+
+        def legacy():
+            for _ in range(self.N):
+                for expr in exprs:
+                    _legacy_eval(expr, _CONTEXT, _exec, _config)
+
+        def compiled():
+            for _ in range(self.N):
+                for expr in exprs:
+                    compile_expression(expr, True)(_CONTEXT, _exec, _config)
+
+        (t_old, _), (t_new, _) = best_of(legacy), best_of(compiled)
+        per_eval = self.N * len(exprs)
+        print(f"\n{len(exprs)} 个配置表达式：旧版 {t_old / per_eval * 1e6:.2f} us/次，"
+              f"编译缓存 {t_new / per_eval * 1e6:.2f} us/次（{t_old / t_new:.1f}x）")
+        assert t_new < t_old
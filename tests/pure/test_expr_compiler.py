@@ -0,0 +1,71 @@
+"""方案 1（纯逻辑）：表达式编译 — 运算优先级 / 三类变量 / 短路 / 缓存。"""
+import pytest
+
+from jczx.exprCompiler import compile_expression, is_context_expr, tokenize
+
+
+def _cond(expr, context=None, entities=None, config=None, calls=None):
+    def exec_fn(key):
+        if calls is not None:
+            calls.append(key)
+        return (entities or {}).get(key, False)
+    return compile_expression(expr, True)(context or {}, exec_fn, lambda token: (config or {}).get(token, ""))
+
+
+def _ctx(expr, context):
+    return compile_expression(expr, False)(context, lambda key: pytest.fail("上下文模式不应执行实体"), str)
+
+
+class TestTokenize:
+    def test_operators_and_placeholders(self):
+        assert tokenize("%{a} <= ${s:o} & (b|@{c})") == [
+            "%{a}", "<=", "${s:o}", "&", "(", "b", "|", "@{c}", ")"]
+
+
+class TestConditionMode:
+    def test_compare_numbers_from_context(self):
+        assert _cond("%{n} > 3", context={"n": "5"}) is True
+        assert _cond("%{n} > 3", context={"n": 2}) is False
+
+    def test_string_equality(self):
+        assert _cond("%{s} == abc", context={"s": "abc"}, entities={"abc": "abc"}) is True
+
+    def test_bare_name_executes_entity(self):
+        assert _cond("in-home", entities={"in-home": True}) is True
+
+    def test_config_placeholder(self):
+        assert _cond("%{p} <= ${v:th}", context={"p": 10}, config={"${v:th}": "20"}) is True
+
+    def test_and_binds_tighter_than_or(self):
+        assert _cond("a & b | c", entities={"c": True}) is True
+        assert _cond("a | b & c", entities={"a": True}) is True
+
+    def test_parentheses(self):
+        assert _cond("(a | b) & c", entities={"a": True}) is False
+        assert _cond("(a | b) & c", entities={"a": True, "c": True}) is True
+
+    def test_short_circuit_skips_entities(self):
+        calls = []
+        _cond("a | b", entities={"a": True}, calls=calls)
+        _cond("x & y", calls=calls)
+        assert calls == ["a", "x"]
+
+    def test_empty_expression_false(self):
+        assert _cond("") is False
+
+
+class TestContextMode:
+    def test_bare_names_read_context(self):
+        assert _ctx("a > b", {"a": 3, "b": 1}) is True
+
+    def test_placeholder_reads_context(self):
+        assert _ctx("%{a} == 1 & b", {"a": "1", "b": "x"}) is True
+
+    def test_detects_expression(self):
+        assert is_context_expr("a > 1") and not is_context_expr("name")
+
+
+class TestCache:
+    def test_compiled_once_per_source(self):
+        assert compile_expression("%{n} > 1", True) is compile_expression("%{n} > 1", True)
+        assert compile_expression("%{n} > 1", True) is not compile_expression("%{n} > 1", False)
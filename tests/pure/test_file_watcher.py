@@ -0,0 +1,77 @@
+"""方案 1（纯逻辑）：FileWatcher 轮询比对 / 后缀过滤 / 等待写入稳定后才报告 / 按需同步。"""
+import os
+
+from jczx.fileWatcher import FileWatcher
+
+
+def _watcher(tmp_path, suffixes=(".txt",)):
+    return FileWatcher([(str(tmp_path), suffixes)], on_change=lambda paths: None)
+
+
+def _bump(path, text):
+    """写入并推进 mtime，避免同一时钟刻度内的两次写入 stat 相同。"""
+    st = os.stat(path) if path.exists() else None
+    path.write_text(text, encoding="utf-8")
+    if st is not None:
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestPoll:
+    def test_no_change(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+        watcher = _watcher(tmp_path)
+        assert watcher.poll() == set()
+
+    def test_modified_reported_after_settle(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a", encoding="utf-8")
+        watcher = _watcher(tmp_path)
+        _bump(path, "ab")
+        assert watcher.poll() == set(), "本轮仍在变化，等待稳定"
+        assert watcher.poll() == {str(path)}
+        assert watcher.poll() == set()
+
+    def test_still_writing_merges_batches(self, tmp_path):
+        a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+        a.write_text("a", encoding="utf-8")
+        watcher = _watcher(tmp_path)
+        _bump(a, "ab")
+        watcher.poll()
+        b.write_text("b", encoding="utf-8")
+        assert watcher.poll() == set()
+        assert watcher.poll() == {str(a), str(b)}
+
+    def test_deleted_and_nested(self, tmp_path):
+        (tmp_path / "tasks").mkdir()
+        nested = tmp_path / "tasks" / "x.txt"
+        nested.write_text("x", encoding="utf-8")
+        watcher = _watcher(tmp_path)
+        nested.unlink()
+        watcher.poll()
+        assert watcher.poll() == {str(nested)}
+
+    def test_suffix_filter(self, tmp_path):
+        watcher = _watcher(tmp_path, (".png",))
+        (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+        (tmp_path / "b.PNG").write_bytes(b"x")
+        watcher.poll()
+        assert watcher.poll() == {str(tmp_path / "b.PNG")}
+
+
+class TestSync:
+    def test_reports_immediately_and_resets(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a", encoding="utf-8")
+        watcher = _watcher(tmp_path)
+        _bump(path, "ab")
+        (tmp_path / "b.png").write_text("x", encoding="utf-8")
+        assert watcher.sync() == {str(path)}
+        assert watcher.sync() == set()
+
+    def test_includes_pending_from_poll(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a", encoding="utf-8")
+        watcher = _watcher(tmp_path)
+        _bump(path, "ab")
+        assert watcher.poll() == set()
+        assert watcher.sync() == {str(path)}
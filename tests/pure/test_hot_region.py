@@ -0,0 +1,108 @@
+"""方案 1（纯逻辑）：HotRegionIndex 学习 / 边距裁剪 / multi 排除 / 持久化（多进程合并）。"""
+from jczx.hotRegion import HotRegionIndex
+
+# make_match 风格的四角点
+def _pts(x0, y0, x1, y1):
+    return ((x0, y0), (x1, y0), (x0, y1), (x1, y1))
+
+
+def _index(tmp_path, **kw):
+    return HotRegionIndex(str(tmp_path / "HotRegions.json"), **kw)
+
+
+class TestLookup:
+    def test_unknown_template_full_screen(self, tmp_path):
+        assert _index(tmp_path).lookup("buttons\\fight.png", 1920, 1080) is None
+
+    def test_learned_box_with_margin(self, tmp_path):
+        idx = _index(tmp_path, margin=10)
+        idx.record("buttons\\fight.png", 1920, 1080, [_pts(100, 100, 150, 130)])
+        assert idx.lookup("buttons\\fight.png", 1920, 1080) == ((90, 90), (160, 140))
+
+    def test_margin_clamped_to_screen(self, tmp_path):
+        idx = _index(tmp_path, margin=50)
+        idx.record("a", 200, 100, [_pts(10, 10, 190, 90)])
+        assert idx.lookup("a", 200, 100) == ((0, 0), (200, 100))
+
+    def test_per_resolution(self, tmp_path):
+        idx = _index(tmp_path)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        assert idx.lookup("a", 2400, 1080) is None
+
+    def test_box_grows_to_union(self, tmp_path):
+        idx = _index(tmp_path, margin=0)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        idx.record("a", 1920, 1080, [_pts(50, 5, 60, 15)])
+        assert idx.lookup("a", 1920, 1080) == ((10, 5), (60, 20))
+
+    def test_multi_hit_template_excluded(self, tmp_path):
+        idx = _index(tmp_path)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20), _pts(10, 40, 20, 50)])
+        assert idx.lookup("a", 1920, 1080) is None
+
+    def test_disabled(self, tmp_path):
+        idx = _index(tmp_path, enabled=False)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        assert idx.lookup("a", 1920, 1080) is None
+
+
+class TestPersistence:
+    def test_save_and_reload(self, tmp_path):
+        idx = _index(tmp_path, margin=0)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        idx.save()
+        again = _index(tmp_path, margin=0)
+        assert again.lookup("a", 1920, 1080) == ((10, 10), (20, 20))
+
+    def test_save_skipped_when_clean(self, tmp_path):
+        idx = _index(tmp_path)
+        idx.save()
+        assert not (tmp_path / "HotRegions.json").exists()
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        (tmp_path / "HotRegions.json").write_text("{oops", encoding="utf-8")
+        assert _index(tmp_path).lookup("a", 1920, 1080) is None
+
+    def test_clear_single_template(self, tmp_path):
+        idx = _index(tmp_path)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        idx.record("b", 1920, 1080, [_pts(10, 10, 20, 20)])
+        idx.clear("a")
+        assert idx.lookup("a", 1920, 1080) is None
+        assert idx.lookup("b", 1920, 1080) is not None
+
+
+class TestMergeOnSave:
+    def test_processes_merge(self, tmp_path):
+        """多进程模式：两个进程各自加载同一文件，后保存的不覆盖另一个进程学到的模板。"""
+        a, b = _index(tmp_path, margin=0), _index(tmp_path, margin=0)
+        a.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        b.record("b", 1920, 1080, [_pts(30, 30, 40, 40)])
+        a.save()
+        b.save()
+        again = _index(tmp_path, margin=0)
+        assert again.lookup("a", 1920, 1080) == ((10, 10), (20, 20))
+        assert again.lookup("b", 1920, 1080) == ((30, 30), (40, 40))
+
+    def test_same_template_union_and_multi(self, tmp_path):
+        a, b = _index(tmp_path, margin=0), _index(tmp_path, margin=0)
+        a.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        b.record("a", 1920, 1080, [_pts(50, 50, 60, 60)])
+        a.save()
+        b.save()
+        assert _index(tmp_path, margin=0).lookup("a", 1920, 1080) == ((10, 10), (60, 60))
+        c = _index(tmp_path)
+        c.record("a", 1920, 1080, [_pts(10, 10, 20, 20), _pts(50, 50, 60, 60)])
+        c.save()
+        assert _index(tmp_path).lookup("a", 1920, 1080) is None
+
+    def test_clear_removed_on_save(self, tmp_path):
+        idx = _index(tmp_path)
+        idx.record("a", 1920, 1080, [_pts(10, 10, 20, 20)])
+        idx.record("b", 1920, 1080, [_pts(10, 10, 20, 20)])
+        idx.save()
+        other = _index(tmp_path)
+        other.clear("a")
+        other.save()
+        again = _index(tmp_path)
+        assert again.lookup("a", 1920, 1080) is None and again.lookup("b", 1920, 1080) is not None
@@ -0,0 +1,88 @@
+"""方案 1（纯逻辑）：场景导航图 — 建图（边 / 标志图）、最短路线、未知起点、识别优先级。"""
+from jczx.configEntity import JczxSectionEntity
+from jczx.navGraph import ANY_SCENE, NavGraph
+
+
+def _edge(scene_to, scene_from="", sleep=0, marker=None, wait_target=None) -> JczxSectionEntity:
+    e = JczxSectionEntity()
+    e.type = "click"
+    e.scene_from = scene_from
+    e.scene_to = scene_to
+    e.sleep = sleep
+    e.scene_marker = marker
+    e.wait_target = wait_target
+    return e
+
+
+def _menu() -> NavGraph:
+    return NavGraph.from_entities([
+        ("goto-home", _edge("home", marker="buttons\\fight.png")),
+        ("click-fight", _edge("fight", "home", sleep=2, wait_target="buttons\\activities.png")),
+        ("click-simulate", _edge("simulate", "fight", sleep=2, marker="buttons\\competition.png")),
+        ("click-jjc", _edge("jjc", "simulate", sleep=3)),
+        ("values", {"not": "an entity"}),
+    ])
+
+
+def _keys(path) -> list[str]:
+    return [edge.key for edge in path]
+
+
+class TestBuild:
+    def test_empty_scene_from_is_any(self):
+        graph = _menu()
+        assert [e.src for e in graph.edges if e.key == "goto-home"] == [ANY_SCENE]
+
+    def test_multiple_sources(self):
+        graph = NavGraph.from_entities([("back", _edge("home", "fight,simulate"))])
+        assert sorted(e.src for e in graph.edges) == ["fight", "simulate"]
+
+    def test_cost_includes_sleep(self):
+        costs = {e.key: e.cost for e in _menu().edges}
+        assert costs["goto-home"] == 1 and costs["click-jjc"] == 4
+
+    def test_markers_from_marker_and_wait_target(self):
+        graph = _menu()
+        assert graph.markers["home"] == ["buttons\\fight.png"]
+        assert graph.markers["fight"] == ["buttons\\activities.png"]
+        assert graph.markers["jjc"] == []
+
+    def test_markers_from_scene_templates(self):
+        graph = NavGraph.from_entities([("goto-home", _edge("home"))],
+                                       {"home": "locations\\home.png", "other": "locations\\other.png"})
+        assert graph.markers == {"home": ["locations\\home.png"]}
+
+    def test_placeholder_scene_skipped(self):
+        graph = NavGraph.from_entities([("dyn", _edge("%{scene}"))])
+        assert graph.edges == []
+
+
+class TestPlan:
+    def test_from_unknown_goes_home_first(self):
+        assert _keys(_menu().plan(None, "jjc")) == ["goto-home", "click-fight", "click-simulate", "click-jjc"]
+
+    def test_from_known_scene_skips_home(self):
+        assert _keys(_menu().plan("fight", "jjc")) == ["click-simulate", "click-jjc"]
+
+    def test_already_there(self):
+        assert _menu().plan("jjc", "jjc") == []
+
+    def test_unreachable(self):
+        assert _menu().plan("home", "nowhere") is None
+
+    def test_prefers_cheaper_route(self):
+        graph = NavGraph.from_entities([
+            ("goto-home", _edge("home")),
+            ("slow", _edge("shop", "home", sleep=10)),
+            ("a", _edge("mid", "home", sleep=1)),
+            ("b", _edge("shop", "mid", sleep=1)),
+        ])
+        assert _keys(graph.plan("home", "shop")) == ["a", "b"]
+
+    def test_any_edge_usable_from_known_scene(self):
+        assert _keys(_menu().plan("jjc", "fight")) == ["goto-home", "click-fight"]
+
+
+class TestLocateOrder:
+    def test_deeper_first_and_markerless_skipped(self):
+        assert _menu().locate_order() == ["simulate", "fight", "home"]
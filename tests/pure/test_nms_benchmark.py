@@ -0,0 +1,89 @@
+"""方案 1（纯逻辑）：多目标 NMS 微基准 — 密集命中帧（好友列表 / 编队选择）上对比旧版逐像素去重循环。
+
+运行 ``pytest tests/pure/test_nms_benchmark.py -s`` 查看耗时，``JCZX_BENCHMARK=1`` 时断言 NMS 更快。
+"""
+import cv2
+import numpy as np
+
+from jczx.templateMatch import nms_peaks, sort_row_major
+from tests.conftest import benchmark, best_of
+
+
+def _legacy_dedup(scores, per):
+    """旧版 findImageDetailLocations 的去重循环（原样保留作对照）。"""
+    locations = np.where(scores > per)
+    if not any(locations[0]):
+        return []
+    tmp_y = [locations[0][0]]
+    tmp_x = [locations[1][0]]
+    for y, x in zip(*locations):
+        if x - 10 >= tmp_x[-1]:
+            tmp_x.append(x)
+            tmp_y.append(y)
+            continue
+        if y - 10 >= tmp_y[-1]:
+            tmp_x.append(x)
+            tmp_y.append(y)
+            continue
+    return list(zip(tmp_x, tmp_y))
+
+
+def _smooth(rng, w, h, cell):
+    return cv2.resize(rng.integers(0, 256, (h // cell, w // cell), np.uint8), (w, h), interpolation=cv2.INTER_CUBIC)
+
+
+def _dense_frame(cols, rows, tw, th, gap, seed, origin=(200, 100)):
+    """1920x1080 截图上把 tw x th 的同一模板按 cols x rows 网格铺开（好友列表 = 1 列多行，编队 = 多行多列）。"""
+    rng = np.random.default_rng(seed)
+    tpl = _smooth(rng, tw, th, 8)
+    frame = _smooth(rng, 1920, 1080, 16)
+    ox, oy = origin
+    points = []
+    for r in range(rows):
+        for c in range(cols):
+            x, y = ox + c * (tw + gap), oy + r * (th + gap)
+            frame[y:y + th, x:x + tw] = tpl
+            points.append((x, y))
+    return frame, tpl, points
+
+
+# (名称, 列, 行, 模板宽, 模板高, 间距, 阈值, 随机种子)
+FRIEND_LIST = ("好友列表", 1, 8, 180, 60, 14, 0.5, 11)
+TEAM_SELECTION = ("编队选择", 6, 3, 120, 150, 12, 0.5, 12)
+
+
+def _bench(name, cols, rows, tw, th, gap, per, seed):
+    frame, tpl, points = _dense_frame(cols, rows, tw, th, gap, seed)
+    scores = cv2.matchTemplate(frame, tpl, cv2.TM_CCOEFF_NORMED)
+    t_old, old = best_of(lambda: _legacy_dedup(scores, per))
+    t_new, new = best_of(lambda: nms_peaks(scores, per, tw, th))
+    print(f"\n{name}: 超阈值像素 {int((scores > per).sum())}，"
+          f"旧版 {t_old * 1000:.2f} ms / {len(old)} 个，NMS {t_new * 1000:.2f} ms / {len(new)} 个")
+    return points, old, new, t_old, t_new
+
+
+class TestDenseFrames:
+    def test_friend_list(self):
+        points, old, new, _, _ = _bench(*FRIEND_LIST)
+        assert [(x, y) for x, y, _ in sort_row_major(new)] == points
+
+    def test_team_selection(self):
+        points, old, new, _, _ = _bench(*TEAM_SELECTION)
+        assert [(x, y) for x, y, _ in sort_row_major(new)] == points
+
+    def test_legacy_loop_duplicates(self):
+        """旧版 10px 启发式在宽峰上会产生重复命中，NMS 每个目标只保留一个。"""
+        points, old, new, _, _ = _bench("编队选择(低阈值)", 6, 3, 120, 150, 12, 0.3, seed=12)
+        assert len(new) == len(points)
+        assert len(old) > len(points)
+
+
+@benchmark
+class TestDenseFramesSpeed:
+    def test_friend_list_faster(self):
+        *_, t_old, t_new = _bench(*FRIEND_LIST)
+        assert t_new < t_old
+
+    def test_team_selection_faster(self):
+        *_, t_old, t_new = _bench(*TEAM_SELECTION)
+        assert t_new < t_old
@@ -0,0 +1,79 @@
+"""方案 1（纯逻辑）：OCR 基准 — 录制的裁剪图语料上对比 检测 + 识别 与 仅识别 的耗时与准确率。
+
+语料由 ``debug.ocr_corpus : on`` 记录（见 jczx.debug.corpus），核对 labels.tsv 后运行：
+``JCZX_OCR_CORPUS=<语料目录> pytest tests/pure/test_ocr_benchmark.py -s``
+未设置语料目录或 OCR 模型不可用（缺 CommonBuilder / 推理库）时跳过基准，只验证语料读写。
+"""
+import logging
+import os
+import time
+
+import numpy as np
+import pytest
+
+from jczx.debug.corpus import LABELS_FILE, OcrCorpus, load_corpus
+from jczx.ocrService import recognize_batch, supports_rec_only
+
+CORPUS_DIR = os.environ.get("JCZX_OCR_CORPUS", "")
+
+
+def _run(ocr, samples, rec_only: bool) -> tuple[float, float]:
+    """返回 (准确率, 每张平均毫秒)；识别文本拼接后与标注完全一致才算正确。"""
+    correct, elapsed = 0, 0.0
+    for _, img, label in samples:
+        t = time.perf_counter()
+        texts = recognize_batch(ocr, [img], rec_only)[0]
+        elapsed += time.perf_counter() - t
+        correct += "".join(texts) == label
+    return correct / len(samples), elapsed / len(samples) * 1000
+
+
+class TestCorpus:
+    def test_round_trip(self, tmp_path):
+        corpus = OcrCorpus(str(tmp_path), logging.getLogger("corpus-test"))
+        corpus.add(np.full((20, 60, 3), 255, np.uint8), "12\t345")
+        corpus.add(np.zeros((20, 60, 3), np.uint8), "剩余 3")
+        samples = load_corpus(str(tmp_path))
+        assert [(name, text) for name, _, text in samples] == [("1.png", "12 345"), ("2.png", "剩余 3")]
+        assert samples[0][1].shape == (20, 60, 3)
+
+    def test_index_continues(self, tmp_path):
+        log = logging.getLogger("corpus-test")
+        OcrCorpus(str(tmp_path), log).add(np.zeros((8, 8, 3), np.uint8), "a")
+        OcrCorpus(str(tmp_path), log).add(np.zeros((8, 8, 3), np.uint8), "b")
+        assert sorted(os.listdir(tmp_path)) == ["1.png", "2.png", LABELS_FILE]
+
+    def test_mode_column_and_unlabelled_skipped(self, tmp_path):
+        corpus = OcrCorpus(str(tmp_path), logging.getLogger("corpus-test"))
+        corpus.add(np.zeros((8, 8, 3), np.uint8), "", "rec")
+        corpus.add(np.zeros((8, 8, 3), np.uint8), "7", "full")
+        lines = (tmp_path / LABELS_FILE).read_text(encoding="utf-8").splitlines()
+        assert lines == ["1.png\t\trec", "2.png\t7\tfull"]
+        assert [(name, text) for name, _, text in load_corpus(str(tmp_path))] == [("2.png", "7")]
+        (tmp_path / LABELS_FILE).write_text("1.png\t5\n", encoding="utf-8")
+        assert [text for _, _, text in load_corpus(str(tmp_path))] == ["5"], "旧版两列格式仍可读"
+
+    def test_missing_image_skipped(self, tmp_path):
+        (tmp_path / LABELS_FILE).write_text("9.png\tx\nbad line\n", encoding="utf-8")
+        assert load_corpus(str(tmp_path)) == []
+
+
+@pytest.mark.skipif(not CORPUS_DIR, reason="未设置 JCZX_OCR_CORPUS 语料目录")
+class TestRecOnlyBenchmark:
+    def test_compare_latency_and_accuracy(self):
+        samples = load_corpus(CORPUS_DIR)
+        if not samples:
+            pytest.skip(f"语料为空: {CORPUS_DIR}")
+        create_ocr = pytest.importorskip("jczx.jczxCli").create_ocr
+        ocr = create_ocr()
+        if not supports_rec_only(ocr):
+            pytest.skip("OCR 实例的 readtext 不支持 det=False")
+        # 预热：首次推理包含会话初始化开销
+        recognize_batch(ocr, [samples[0][1]], False)
+        recognize_batch(ocr, [samples[0][1]], True)
+        acc_full, ms_full = _run(ocr, samples, False)
+        acc_rec, ms_rec = _run(ocr, samples, True)
+        print(f"\n{len(samples)} 张裁剪图：检测 + 识别 {ms_full:.1f} ms/张 准确率 {acc_full:.1%}，"
+              f"仅识别 {ms_rec:.1f} ms/张 准确率 {acc_rec:.1%}（{ms_full / ms_rec:.1f}x）")
+        assert ms_rec < ms_full
+        assert acc_rec >= acc_full - 0.02, "单行裁剪图仅识别不应明显降低准确率"
@@ -0,0 +1,243 @@
+"""方案 1（纯逻辑）：OCR 服务 — Future 结果、批量合并、逐张回退、仅识别模式、异常传递、有界队列、多会话并行、关闭（不阻塞、不遗留未完成的 Future）。"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from jczx.ocrService import OcrService, recognize_batch, supports_rec_only
+
+
+def _img(value: int):
+    return np.full((4, 4, 3), value, np.uint8)
+
+
+class FakeOcr:
+    """readtext / predict 返回图像像素值；记录每次调用的图片数，gate 未放行时阻塞。"""
+
+    def __init__(self, gate: threading.Event = None):
+        self.calls = []
+        self.rec_only = []
+        self.gate = gate
+
+    def _wait(self):
+        if self.gate is not None:
+            assert self.gate.wait(5)
+
+    def readtext(self, img, det=True, cls=False):
+        self._wait()
+        self.calls.append(1)
+        if not det:
+            self.rec_only.append(int(img[0, 0, 0]))
+        return [str(img[0, 0, 0])]
+
+    def predict(self, images):
+        self._wait()
+        self.calls.append(len(images))
+        return [{"rec_texts": [str(img[0, 0, 0])]} for img in images]
+
+
+class ReadOnlyOcr:
+    def __init__(self):
+        self.calls = 0
+
+    def readtext(self, img, *args, **kwargs):
+        self.calls += 1
+        return [str(img[0, 0, 0])]
+
+
+class TestRecognizeBatch:
+    def test_predict_used_for_batches(self):
+        ocr = FakeOcr()
+        assert recognize_batch(ocr, [_img(1), _img(2)]) == [["1"], ["2"]]
+        assert ocr.calls == [2]
+
+    def test_single_image_uses_readtext(self):
+        ocr = FakeOcr()
+        assert recognize_batch(ocr, [_img(3)]) == [["3"]]
+
+    def test_fallback_without_predict(self):
+        ocr = ReadOnlyOcr()
+        assert recognize_batch(ocr, [_img(1), _img(2)]) == [["1"], ["2"]]
+        assert ocr.calls == 2
+
+
+class TestRecOnly:
+    def test_supports_rec_only(self):
+        assert supports_rec_only(FakeOcr())
+        assert not supports_rec_only(ReadOnlyOcr())
+
+    def test_rec_only_skips_detection(self):
+        ocr = FakeOcr()
+        assert recognize_batch(ocr, [_img(1), _img(2)], rec_only=True) == [["1"], ["2"]]
+        assert ocr.rec_only == [1, 2] and ocr.calls == [1, 1]
+
+    def test_rec_only_falls_back_to_full(self):
+        ocr = ReadOnlyOcr()
+        assert recognize_batch(ocr, [_img(4)], rec_only=True) == [["4"]]
+
+    def test_service_splits_modes_in_batch(self):
+        gate = threading.Event()
+        ocr = FakeOcr(gate)
+        service = OcrService(lambda: ocr, batch_wait=0.5)
+        try:
+            futures = [service.submit(_img(i), rec_only=i % 2 == 1) for i in range(4)]
+            gate.set()
+            assert [f.result(5) for f in futures] == [[str(i)] for i in range(4)]
+            assert ocr.rec_only == [1, 3]
+        finally:
+            service.shutdown()
+
+    def test_service_readtext_det_flag(self):
+        ocr = FakeOcr()
+        service = OcrService(lambda: ocr)
+        try:
+            assert service.readtext(_img(5), det=False) == ["5"]
+            assert ocr.rec_only == [5]
+            assert supports_rec_only(service)
+        finally:
+            service.shutdown()
+
+
+class TestService:
+    def test_readtext_compatible(self):
+        service = OcrService(FakeOcr)
+        try:
+            assert service.readtext(_img(7)) == ["7"]
+        finally:
+            service.shutdown()
+
+    def test_close_submissions_batched(self):
+        gate = threading.Event()
+        ocr = FakeOcr(gate)
+        service = OcrService(lambda: ocr, batch_size=8, batch_wait=0.5)
+        try:
+            futures = [service.submit(_img(i)) for i in range(5)]
+            gate.set()
+            assert [f.result(5) for f in futures] == [[str(i)] for i in range(5)]
+            assert sum(ocr.calls) == 5 and len(ocr.calls) < 5, "相近提交的图片应合并识别"
+        finally:
+            service.shutdown()
+
+    def test_batch_size_caps_call(self):
+        ocr = FakeOcr()
+        service = OcrService(lambda: ocr, batch_size=2, batch_wait=0.2)
+        try:
+            futures = [service.submit(_img(i)) for i in range(5)]
+            for f in futures:
+                f.result(5)
+            assert max(ocr.calls) <= 2
+        finally:
+            service.shutdown()
+
+    def test_error_propagates(self):
+        class Broken:
+            def readtext(self, img, *args, **kwargs):
+                raise RuntimeError("model")
+
+        service = OcrService(Broken)
+        try:
+            with pytest.raises(RuntimeError, match="model"):
+                service.submit(_img(1)).result(5)
+            with pytest.raises(RuntimeError):
+                service.readtext(_img(1))
+        finally:
+            service.shutdown()
+
+    def test_bounded_queue_blocks_submitter(self):
+        gate = threading.Event()
+        service = OcrService(lambda: FakeOcr(gate), max_queue=1, batch_size=1)
+        try:
+            first = service.submit(_img(1))
+            assert _wait(lambda: service.pending == 0), "第一张应已被识别线程取走"
+            service.submit(_img(2))
+            blocked = threading.Thread(target=service.submit, args=(_img(3),), daemon=True)
+            blocked.start()
+            blocked.join(0.2)
+            assert blocked.is_alive(), "队列满时提交方应等待"
+            gate.set()
+            blocked.join(5)
+            assert not blocked.is_alive()
+            assert first.result(5) == ["1"]
+        finally:
+            service.shutdown()
+
+    def test_sessions_run_in_parallel(self):
+        both = threading.Barrier(2, timeout=5)
+
+        class Waiting:
+            def readtext(self, img, *args, **kwargs):
+                both.wait()
+                return ["ok"]
+
+        service = OcrService(Waiting, sessions=2, batch_size=1)
+        try:
+            futures = [service.submit(_img(i)) for i in range(2)]
+            assert [f.result(5) for f in futures] == [["ok"], ["ok"]], "两个会话应同时识别（互相等待）"
+        finally:
+            service.shutdown()
+
+    def test_shutdown_cancels_pending_and_rejects(self):
+        gate = threading.Event()
+        service = OcrService(lambda: FakeOcr(gate), batch_size=1)
+        running = service.submit(_img(1))
+        assert _wait(lambda: service.pending == 0)
+        queued = service.submit(_img(2))
+        service.shutdown()
+        gate.set()
+        assert running.result(5) == ["1"]
+        assert queued.cancelled()
+        with pytest.raises(RuntimeError):
+            service.submit(_img(3))
+
+    def test_shutdown_wakes_blocked_submitter(self):
+        gate = threading.Event()
+        service = OcrService(lambda: FakeOcr(gate), max_queue=1, batch_size=1)
+        service.submit(_img(1))
+        assert _wait(lambda: service.pending == 0)
+        service.submit(_img(2))
+        errors = []
+
+        def submit():
+            try:
+                service.submit(_img(3))
+            except RuntimeError as e:
+                errors.append(e)
+
+        blocked = threading.Thread(target=submit, daemon=True)
+        blocked.start()
+        blocked.join(0.2)
+        assert blocked.is_alive()
+        service.shutdown()
+        blocked.join(5)
+        assert not blocked.is_alive() and len(errors) == 1, "关闭后等待中的提交方应被唤醒并拒绝，而不是排到关闭标记后面"
+        gate.set()
+
+    def test_shutdown_does_not_block_on_full_queue(self):
+        gate = threading.Event()
+        service = OcrService(lambda: FakeOcr(gate), sessions=3, max_queue=1, batch_size=1)
+        futures = [service.submit(_img(i)) for i in range(3)]
+        assert _wait(lambda: service.pending == 0)
+        queued = service.submit(_img(9))
+        done = threading.Thread(target=service.shutdown, daemon=True)
+        done.start()
+        done.join(1)
+        assert not done.is_alive(), "关闭标记数多于队列上限时 shutdown 不应阻塞"
+        gate.set()
+        assert [f.result(5) for f in futures] == [[str(i)] for i in range(3)]
+        assert queued.cancelled()
+
+    def test_shutdown_waits_for_workers(self):
+        service = OcrService(FakeOcr, sessions=2)
+        assert service.readtext(_img(1)) == ["1"]
+        service.shutdown(timeout=5)
+        assert not any(thread.is_alive() for thread in service._threads)
+
+
+def _wait(predicate, timeout: float = 5) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
@@ -0,0 +1,35 @@
+"""方案 1（纯逻辑）：场景索引 — 已知区域优先、其余按 id 排序、非图片忽略；与 resources/locations 一致。"""
+import os
+
+from jczx.sceneIndex import DEFAULT_PER, KNOWN_REGIONS, SCENE_DIR, build_scenes
+
+LOCATIONS = os.path.join(os.path.dirname(__file__), "..", "..", "jczx", "resources", SCENE_DIR)
+
+
+class TestBuildScenes:
+    def test_known_regions_first_in_table_order(self):
+        scenes = build_scenes(["zeta.png", "levels.png", "fightWin.png", "alpha.png"])
+        assert [s.id for s in scenes] == ["fightWin", "levels", "alpha", "zeta"]
+
+    def test_known_region_and_per(self):
+        scene = build_scenes(["onFight.png"])[0]
+        assert scene.target == "locations\\onFight.png"
+        assert (scene.region, scene.per) == KNOWN_REGIONS["onFight"]
+
+    def test_unknown_full_screen(self):
+        scene = build_scenes(["hasNew.png"])[0]
+        assert scene.region is None and scene.per == DEFAULT_PER
+
+    def test_non_png_ignored(self):
+        assert build_scenes(["notes.txt", "a.PNG"])[0].id == "a"
+        assert len(build_scenes(["notes.txt"])) == 0
+
+
+class TestResources:
+    def test_every_location_template_is_a_scene(self):
+        files = os.listdir(LOCATIONS)
+        assert len(build_scenes(files)) == len([f for f in files if f.lower().endswith(".png")])
+
+    def test_known_regions_exist(self):
+        ids = {s.id for s in build_scenes(os.listdir(LOCATIONS))}
+        assert set(KNOWN_REGIONS) <= ids, "KNOWN_REGIONS 中的模板应存在于 resources/locations"
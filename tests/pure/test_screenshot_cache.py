@@ -1,9 +1,9 @@
-"""方案 1（纯逻辑）：ScreenshotCache TTL / invalidate / TTL=0 语义。"""
+"""方案 1（纯逻辑）：ScreenshotCache TTL / invalidate / TTL=0 语义；帧签名与 PollGate 门控。"""
 import time
 
 import numpy as np
 
-from jczx.jczxCli import ScreenshotCache
+from jczx.jczxCli import PollGate, ScreenshotCache
 
 
 def _make_cache(ttl_ms, counter):
@@ -53,3 +53,99 @@ class TestTtlBehavior:
         gray = cache.gray_screenshot()
         assert gray.ndim == 2
         assert gray.shape == (10, 10)
+
+
+class TestFrameVersion:
+    def test_version_increments_per_capture(self):
+        counter = []
+        cache = _make_cache(ttl_ms=1000, counter=counter)
+        cache.screenshot()
+        v1 = cache.version
+        cache.screenshot()
+        assert cache.version == v1, "同帧版本号不变"
+        cache.invalidate()
+        cache.screenshot()
+        assert cache.version == v1 + 1
+
+    def test_match_memo_same_frame(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        cache.screenshot()
+        tpl = np.zeros((2, 2), np.uint8)
+        key = (cache.version, id(tpl), None, 0.8)
+        cache.put_match(key, tpl, "mt")
+        assert cache.get_match(key, tpl) == (True, "mt")
+
+    def test_match_memo_requires_same_template_object(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        cache.screenshot()
+        tpl = np.zeros((2, 2), np.uint8)
+        key = (cache.version, id(tpl), None, 0.8)
+        cache.put_match(key, tpl, "mt")
+        assert cache.get_match(key, np.zeros((2, 2), np.uint8)) == (False, None)
+
+    def test_invalidate_clears_match_memo(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        cache.screenshot()
+        tpl = np.zeros((2, 2), np.uint8)
+        key = (cache.version, id(tpl), None, 0.8)
+        cache.put_match(key, tpl, "mt")
+        cache.invalidate()
+        assert cache.get_match(key, tpl) == (False, None)
+
+    def test_stale_version_not_stored(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        cache.screenshot()
+        tpl = np.zeros((2, 2), np.uint8)
+        old_key = (cache.version - 1, id(tpl), None, 0.8)
+        cache.put_match(old_key, tpl, "mt")
+        assert cache.get_match(old_key, tpl) == (False, None)
+
+
+class TestFrameSignature:
+    def test_signature_computed_once_per_frame(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr("jczx.jczxCli.frame_signature", lambda gray: calls.append(1) or b"sig")
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        cache.signature()
+        cache.signature()
+        assert calls == [1]
+        cache.invalidate()
+        cache.signature()
+        assert calls == [1, 1], "新帧应重新计算签名"
+
+
+class TestPollGate:
+    def test_skips_unchanged_frame_after_miss(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        gate = PollGate(cache, base=0.3, max_interval=1.0, max_gap=60)
+        assert gate.should_match()
+        gate.missed()
+        assert not gate.should_match()
+        assert gate.interval > 0.3, "画面未变化时轮询间隔应退避"
+
+    def test_backoff_capped(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        gate = PollGate(cache, base=0.3, max_interval=1.0, max_gap=60)
+        gate.should_match()
+        gate.missed()
+        for _ in range(10):
+            gate.should_match()
+        assert gate.interval == 1.0
+
+    def test_changed_frame_resets(self):
+        frames = iter([np.zeros((10, 10, 3), np.uint8), np.full((10, 10, 3), 200, np.uint8)])
+        cache = ScreenshotCache(screenshot_fn=lambda: next(frames), ttl_ms=1000)
+        gate = PollGate(cache, base=0.3, max_gap=60)
+        gate.should_match()
+        gate.missed()
+        gate.should_match()
+        cache.invalidate()
+        assert gate.should_match()
+        assert gate.interval == 0.3
+
+    def test_forced_match_after_max_gap(self):
+        cache = _make_cache(ttl_ms=1000, counter=[])
+        gate = PollGate(cache, max_gap=0)
+        gate.should_match()
+        gate.missed()
+        assert gate.should_match(), "超过 max_gap 应强制匹配"
@@ -0,0 +1,128 @@
+"""方案 1（纯逻辑）：金字塔粗到细匹配 — 模式解析 / 与全分辨率匹配结果一致 / 回退条件。"""
+import cv2
+import numpy as np
+
+from jczx.templateMatch import (MATCH_FULL, MATCH_PYRAMID, frame_signature, match_locations, nms_peaks,
+                                 parse_match_mode, pyramid_match, sort_row_major)
+
+
+def _frame(seed=0, w=640, h=360):
+    """带纹理的合成截图（纯色背景上相关系数无意义）。"""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (h // 8, w // 8), np.uint8)
+    return cv2.resize(noise, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def _template(seed=1, w=60, h=40):
+    rng = np.random.default_rng(seed)
+    tpl = cv2.resize(rng.integers(0, 256, (h // 4, w // 4), np.uint8), (w, h), interpolation=cv2.INTER_LINEAR)
+    cv2.rectangle(tpl, (4, 4), (w - 5, h - 5), 255, 2)
+    return tpl
+
+
+def _paste(frame, tpl, points):
+    th, tw = tpl.shape
+    for x, y in points:
+        frame[y:y + th, x:x + tw] = tpl
+    return frame
+
+
+class TestParseMode:
+    def test_default_full(self):
+        assert parse_match_mode(None) == (MATCH_FULL, 2)
+        assert parse_match_mode("full") == (MATCH_FULL, 2)
+
+    def test_pyramid_default_scale(self):
+        assert parse_match_mode("pyramid", 4) == (MATCH_PYRAMID, 4)
+
+    def test_pyramid_explicit_scale(self):
+        assert parse_match_mode("pyramid|4") == (MATCH_PYRAMID, 4)
+
+    def test_invalid_falls_back(self):
+        assert parse_match_mode("pyramid|x") == (MATCH_PYRAMID, 2)
+        assert parse_match_mode("pyramid|1")[0] == MATCH_FULL
+        assert parse_match_mode("fast")[0] == MATCH_FULL
+
+
+class TestPyramidMatch:
+    def test_finds_all_instances(self):
+        tpl = _template()
+        points = [(37, 21), (301, 150), (523, 297)]
+        frame = _paste(_frame(), tpl, points)
+        for scale in (2, 4):
+            hits = pyramid_match(frame, tpl, 0.9, scale)
+            assert sorted((x, y) for x, y, _ in hits) == sorted(points)
+
+    def test_agrees_with_full_resolution(self):
+        tpl = _template()
+        frame = _paste(_frame(seed=3), tpl, [(100, 80)])
+        full = cv2.matchTemplate(frame, tpl, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(full)
+        (x, y, s), = pyramid_match(frame, tpl, 0.9, 2)
+        assert (x, y) == loc
+        assert abs(s - score) < 1e-4
+
+    def test_no_match(self):
+        assert pyramid_match(_frame(), _template(), 0.9, 2) == []
+
+    def test_shared_small_gray(self):
+        from jczx.templateMatch import downscale
+        tpl = _template()
+        frame = _paste(_frame(), tpl, [(200, 100)])
+        hits = pyramid_match(frame, tpl, 0.9, 2, small_gray=downscale(frame, 2))
+        assert [(x, y) for x, y, _ in hits] == [(200, 100)]
+
+    def test_small_template_returns_none(self):
+        assert pyramid_match(_frame(), _template(w=16, h=16), 0.9, 4) is None
+
+    def test_template_larger_than_region_returns_none(self):
+        assert pyramid_match(_frame(w=40, h=40), _template(), 0.9, 2) is None
+
+
+class TestNms:
+    def test_single_peak_per_instance(self):
+        tpl = _template()
+        points = [(40, 40), (140, 40), (40, 120), (140, 120)]
+        frame = _paste(_frame(seed=5), tpl, points)
+        hits = match_locations(frame, tpl, 0.8)
+        assert sorted((x, y) for x, y, _ in hits) == sorted(points)
+
+    def test_sorted_by_score(self):
+        scores = np.zeros((50, 50), np.float32)
+        scores[10, 10], scores[30, 40] = 0.91, 0.97
+        assert [(x, y) for x, y, _ in nms_peaks(scores, 0.9, 10, 10)] == [(40, 30), (10, 10)]
+
+    def test_plateau_collapses(self):
+        scores = np.zeros((50, 50), np.float32)
+        scores[10:14, 10:30] = 0.95  # 并列得分的平台区
+        hits = nms_peaks(scores, 0.9, 40, 10)
+        assert len(hits) == 1
+
+    def test_neighbourhood_is_half_template(self):
+        scores = np.zeros((50, 100), np.float32)
+        scores[10, 10], scores[10, 31] = 0.95, 0.93
+        assert len(nms_peaks(scores, 0.9, 40, 10)) == 2, "间距超过模板半宽视为两个目标"
+        assert len(nms_peaks(scores, 0.9, 60, 10)) == 1
+
+    def test_row_major(self):
+        hits = [(50, 80, 0.99), (10, 20, 0.95), (90, 20, 0.91)]
+        assert sort_row_major(hits) == [(10, 20, 0.95), (90, 20, 0.91), (50, 80, 0.99)]
+
+
+class TestFrameSignature:
+    def test_same_frame_same_signature(self):
+        assert frame_signature(_frame(0)) == frame_signature(_frame(0).copy())
+
+    def test_encoding_noise_ignored(self):
+        frame = _frame(0)
+        noisy = cv2.add(frame, np.ones_like(frame))  # 全局 +1 灰度，量化后多数格不变
+        a, b = frame_signature(frame), frame_signature(noisy)
+        assert sum(x != y for x, y in zip(a, b)) < len(a) // 4
+
+    def test_changed_frame_differs(self):
+        frame = _frame(0)
+        changed = _paste(frame.copy(), _template(), [(100, 100)])
+        assert frame_signature(frame) != frame_signature(changed)
+
+    def test_fixed_size(self):
+        assert len(frame_signature(_frame(0, 1920, 1080))) == 32 * 18
@@ -0,0 +1,115 @@
+"""方案 1（纯逻辑）：模板包 — 打包/映射一致 / 预计算缩小层 / stat 与内容哈希失效 / 进程内共享。"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from jczx.templateMatch import downscale
+from jczx.templatePack import TemplatePack, build_pack, parse_levels, read_header, scan_resources
+
+
+@pytest.fixture(autouse=True)
+def _isolated_shared(monkeypatch):
+    monkeypatch.setattr(TemplatePack, "_shared", {})
+
+
+def _png(path, seed, w=40, h=30):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    img = np.random.default_rng(seed).integers(0, 256, (h, w), np.uint8)
+    cv2.imwrite(str(path), img)
+    return img
+
+
+@pytest.fixture
+def resources(tmp_path):
+    root = tmp_path / "resources"
+    imgs = {
+        "buttons\\fight.png": _png(root / "buttons" / "fight.png", 1),
+        "locations\\home.png": _png(root / "locations" / "home.png", 2, 64, 48),
+    }
+    _png(root / "toolChart" / "chart.png", 3)
+    return str(root), imgs
+
+
+def _open(root, tmp_path, levels=(1, 2)):
+    return TemplatePack.open(root, [str(tmp_path / "templates.pack")], levels)
+
+
+class TestScan:
+    def test_keys_backslash_and_exclusions(self, resources):
+        root, imgs = resources
+        assert [k for k, _ in scan_resources(root)] == sorted(imgs)
+
+    def test_parse_levels(self):
+        assert parse_levels("2,4") == (1, 2, 4)
+        assert parse_levels("") == (1,)
+        assert parse_levels("x, 1, 2") == (1, 2)
+
+
+class TestPack:
+    def test_roundtrip_matches_imread(self, resources, tmp_path):
+        root, imgs = resources
+        pack = _open(root, tmp_path)
+        for key, img in imgs.items():
+            assert np.array_equal(pack.get(key), img)
+        assert pack.get("buttons\\missing.png") is None
+
+    def test_precomputed_level(self, resources, tmp_path):
+        root, imgs = resources
+        pack = _open(root, tmp_path, (1, 2))
+        assert np.array_equal(pack.get("locations\\home.png", 2), downscale(imgs["locations\\home.png"], 2))
+        assert pack.get("locations\\home.png", 4) is None
+
+    def test_arrays_are_memory_mapped(self, resources, tmp_path):
+        root, _ = resources
+        img = _open(root, tmp_path).get("buttons\\fight.png")
+        assert isinstance(img, np.memmap)
+        assert not img.flags.writeable
+
+    def test_corrupt_pack_ignored(self, tmp_path):
+        path = tmp_path / "templates.pack"
+        path.write_bytes(b"not a pack")
+        assert read_header(str(path)) is None
+
+
+class TestInvalidation:
+    def test_reuses_valid_pack(self, resources, tmp_path):
+        root, _ = resources
+        build_pack(root, str(tmp_path / "templates.pack"), (1, 2))
+        mtime = os.path.getmtime(tmp_path / "templates.pack")
+        _open(root, tmp_path)
+        assert os.path.getmtime(tmp_path / "templates.pack") == mtime
+
+    def test_touched_but_unchanged_not_rebuilt(self, resources, tmp_path):
+        root, _ = resources
+        pack = _open(root, tmp_path)
+        os.utime(os.path.join(root, "buttons", "fight.png"), ns=(1, 1))
+        TemplatePack._shared.clear()
+        assert _open(root, tmp_path).hash == pack.hash
+
+    def test_content_change_rebuilds(self, resources, tmp_path):
+        root, _ = resources
+        old = _open(root, tmp_path)
+        new_img = _png(os.path.join(root, "buttons", "fight.png"), 9)
+        pack = _open(root, tmp_path)
+        assert pack.hash != old.hash
+        assert np.array_equal(pack.get("buttons\\fight.png"), new_img)
+
+    def test_missing_level_rebuilds(self, resources, tmp_path):
+        root, _ = resources
+        _open(root, tmp_path, (1,))
+        TemplatePack._shared.clear()
+        assert _open(root, tmp_path, (1, 4)).get("buttons\\fight.png", 4) is not None
+
+    def test_first_valid_candidate_wins(self, resources, tmp_path):
+        root, _ = resources
+        shipped = tmp_path / "shipped.pack"
+        build_pack(root, str(shipped), (1, 2))
+        pack = TemplatePack.open(root, [str(shipped), str(tmp_path / "user.pack")], (1, 2))
+        assert pack.path == str(shipped)
+        assert not (tmp_path / "user.pack").exists()
+
+    def test_shared_within_process(self, resources, tmp_path):
+        root, _ = resources
+        assert _open(root, tmp_path) is _open(root, tmp_path)
@@ -0,0 +1,58 @@
+"""方案 1（纯逻辑）：ExecTracer 区间记录 / Chrome trace 与 speedscope 导出。"""
+import json
+
+from jczx.debug.tracer import FORMAT_SPEEDSCOPE, NO_SPAN, ExecTracer
+
+
+def _nested():
+    tracer = ExecTracer("queue-daily")
+    with tracer.span("goto-home", "entity", key="goto-home", type="task"):
+        with tracer.span("pre_sleep", key="goto-home", type="task"):
+            pass
+        with tracer.span("findImageDetail", "device", template="buttons\\home.png"):
+            pass
+    return tracer
+
+
+class TestSpans:
+    def test_records_nested_spans(self):
+        tracer = _nested()
+        assert len(tracer) == 3
+
+    def test_exception_recorded_and_propagated(self):
+        tracer = ExecTracer()
+        try:
+            with tracer.span("on_exec"):
+                raise ValueError("x")
+        except ValueError:
+            pass
+        assert tracer.chrome_trace()["traceEvents"][-1]["args"]["error"] == "ValueError"
+
+    def test_disabled_span_is_shared(self):
+        with NO_SPAN as span:
+            assert span is None
+
+
+class TestChromeTrace:
+    def test_complete_events_nest_by_time(self):
+        events = [e for e in _nested().chrome_trace()["traceEvents"] if e["ph"] == "X"]
+        parent = next(e for e in events if e["cat"] == "entity")
+        for child in events:
+            assert child["ts"] >= parent["ts"]
+            assert child["ts"] + child["dur"] <= parent["ts"] + parent["dur"] + 1e-3
+        assert parent["args"] == {"key": "goto-home", "type": "task"}
+
+
+class TestSpeedscope:
+    def test_balanced_open_close(self):
+        data = _nested().speedscope()
+        names = [f["name"] for f in data["shared"]["frames"]]
+        assert names == ["goto-home", "pre_sleep [goto-home]", "findImageDetail"]
+        events = data["profiles"][0]["events"]
+        assert [e["type"] for e in events] == ["O", "O", "C", "O", "C", "C"]
+        assert [e["at"] for e in events] == sorted(e["at"] for e in events)
+
+    def test_save(self, tmp_path):
+        path = _nested().save(str(tmp_path / "t" / "run.speedscope.json"), FORMAT_SPEEDSCOPE)
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["profiles"][0]["type"] == "evented"
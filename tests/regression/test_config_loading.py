@@ -119,3 +119,301 @@ class TestGetImgLazyLoad:
         tm = TaskManage(real_config_dir)
         tm.get_resources_target = lambda target: "nonexistent\\path.png"
         assert tm.get_img("missing\\param.png") is None
+
+
+class TestTaskScopedImages:
+    """任务 → 图片 反向索引 / 选中后后台预加载 / 按需加载的 LRU 上限。"""
+
+    def test_no_eager_loading(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        assert len(tm.img_pool) == 0, "启动时不再预加载全部实体图片"
+
+    def test_index_follows_condition_branches(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        images = tm.collect_images(["goto-home"])
+        assert "locations\\mainMemuClose1.png" in images, "应沿 action → condition_else 传递收集"
+
+    def test_task_index_is_transitive(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        assert tm.collect_images(["goto-home"]) <= tm.get_task_images("task-favor")
+
+    def test_queue_images_union(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        queue = tm.get_queue("queue-daily")
+        expected = set().union(*(tm.get_task_images(k) for k in queue.tasks))
+        assert tm.get_queue_images("queue-daily") == expected
+        assert expected
+
+    def test_preload_pins_task_images(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        for future in tm.preload_task("task-favor"):
+            future.result()
+        images = tm.get_task_images("task-favor")
+        assert images and all(name in tm.img_pool for name in images)
+        assert not tm._img_lru, "预加载范围常驻，不计入 LRU"
+
+    def test_lru_caps_on_demand_loads(self, real_config_dir, tmp_path):
+        png = tmp_path / "lazy.png"
+        cv2.imwrite(str(png), np.zeros((5, 5, 3), np.uint8))
+        tm = TaskManage(real_config_dir)
+        tm.get_resources_target = lambda target: str(png)
+        tm._img_cache_size = lambda: 2
+        for i in range(4):
+            assert tm.get_img(f"dynamic\\{i}.png") is not None
+        assert list(tm._img_lru) == ["dynamic\\2.png", "dynamic\\3.png"]
+        assert "dynamic\\0.png" not in tm.img_pool
+
+    def test_previous_scope_demoted_to_lru(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        for future in tm.preload_task("task-get-ore"):
+            future.result()
+        ore_only = tm.get_task_images("task-get-ore") - tm.get_task_images("goto-home")
+        tm.preload_task("goto-home")
+        assert ore_only and ore_only <= set(tm._img_lru)
+        assert not set(tm._img_lru) & tm.get_task_images("goto-home")
+
+    def test_running_job_scope_survives_other_preload(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        ore_only = tm.get_task_images("task-get-ore") - tm.get_task_images("goto-home")
+        with tm.job_scope("job:emulator-5554", ["task-get-ore"]):
+            # 另一台设备启动 / TUI 选中别的任务，不影响运行中作业的常驻图片
+            tm.preload_task("goto-home")
+            tm.preload_task("goto-home", owner="job:emulator-5556")
+            assert ore_only and ore_only <= tm._img_pinned
+            assert not set(tm._img_lru) & ore_only
+        assert ore_only.isdisjoint(tm._img_pinned)
+        assert tm.get_task_images("goto-home") <= tm._img_pinned
+        tm.release_scope("job:emulator-5556")
+        tm.preload_task("task-favor")
+        assert tm.get_task_images("task-favor") == tm._img_pinned
+
+
+class TestSharedTaskManage:
+    """TUI 与设备引擎共用一个 TaskManage：保存即可见，刷新期间读取不会拿到半成品。"""
+
+    def test_saved_value_visible_without_sync(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        tm.save_task_values("task-favor", {"setting-favor-times": "50"})
+        assert tm._resolve_placeholder("${task-favor-values:setting-favor-times}") == "50"
+
+    def test_reads_during_refresh(self, real_config_dir):
+        import threading
+
+        tm = TaskManage(real_config_dir)
+        stop = threading.Event()
+        misses = []
+
+        def reader():
+            while not stop.is_set():
+                if tm.get_entity("goto-home") is None or tm.get_queue("queue-daily") is None:
+                    misses.append(1)
+
+        t = threading.Thread(target=reader)
+        t.start()
+        try:
+            for _ in range(3):
+                tm.refresh_config()
+        finally:
+            stop.set()
+            t.join()
+        assert not misses
+
+    def test_reads_do_not_take_lock(self, real_config_dir):
+        import threading
+
+        tm = TaskManage(real_config_dir)
+        text = "${task-favor-values:setting-favor-times}"
+        tm._resolve_placeholder(text)
+        results = []
+        reader = threading.Thread(target=lambda: results.extend(
+            [tm.get_entity("goto-home"), tm.get_task("task-favor"), tm._resolve_placeholder(text)]))
+        with tm._lock:
+            reader.start()
+            reader.join(5)
+            assert not reader.is_alive(), "实体查询与已缓存的占位符解析不应等待配置锁"
+        assert results[0] is not None and results[1] is not None and results[2] == "45"
+
+
+class TestFileIncludes:
+    def test_only_file_entities_without_target_warn(self, real_config_dir, caplog):
+        import logging
+
+        with open(join(real_config_dir, "MainMenu.txt"), "a", encoding="utf-8") as f:
+            f.write("\n[untyped-probe]\nname: x\n\n[file-probe]\ntype: file\n")
+        log = logging.getLogger("tm-includes-test")
+        with caplog.at_level(logging.WARNING, logger="tm-includes-test"):
+            TaskManage(real_config_dir, log)
+        warnings = [r.getMessage() for r in caplog.records if "缺少 target" in r.getMessage()]
+        assert warnings == ["file 实体 file-probe 缺少 target，跳过"]
+
+
+class TestHotReload:
+    """增量热重载：只重新解析变化的文件，未变化的实体沿用原对象。"""
+
+    @staticmethod
+    def _append(path, text):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_external_edit_replaces_only_changed(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        home, favor = tm.get_entity("goto-home"), tm.get_entity("task-favor")
+        version = tm.entity_version
+        path = join(real_config_dir, "tasks", "Favor.txt")
+        self._append(path, "\n[hot-reload-probe]\ntype: func\nfunc: click_proportion\nargs: 1,2\n")
+        assert tm.apply_file_changes({path})
+        assert tm.get_entity("hot-reload-probe").args == ["1", "2"]
+        assert tm.get_entity("goto-home") is home
+        assert tm.get_entity("task-favor") is favor
+        assert tm.entity_version > version
+
+    def test_removed_entity_dropped(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        path = join(real_config_dir, "tasks", "Favor.txt")
+        self._append(path, "\n[hot-reload-probe]\ntype: func\n")
+        tm.apply_file_changes({path})
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text.replace("\n[hot-reload-probe]\ntype: func\n", ""))
+        assert tm.reload_entity_files({tm._norm_path(path)}) == {"hot-reload-probe"}
+        assert tm.get_entity("hot-reload-probe") is None
+
+    def test_key_conflict_keeps_old_pool(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        home = tm.get_entity("goto-home")
+        path = join(real_config_dir, "tasks", "Favor.txt")
+        self._append(path, "\n[goto-home]\ntype: func\n")
+        tm.apply_file_changes({path})
+        assert tm.get_entity("goto-home") is home
+        assert tm.get_entity("task-favor") is not None
+
+    def test_any_reparse_error_restores_state(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        home = tm.get_entity("goto-home")
+        sources, externals = dict(tm._entity_source), list(tm._external_configs)
+
+        def broken(includes):
+            raise OSError("disk")
+
+        tm._parse_entity_graph = broken
+        assert tm.reload_entity_files({tm._norm_path(join(real_config_dir, "MainMenu.txt"))}) == set()
+        assert tm._entity_source == sources and tm._external_configs == externals
+        assert tm.get_entity("goto-home") is home
+        assert tm._resolve_placeholder("${task-favor-values:setting-favor-times}") == "45"
+
+    def test_menu_edit_keeps_external_values(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        path = join(real_config_dir, "MainMenu.txt")
+        self._append(path, "\n[hot-reload-probe]\ntype: func\n")
+        tm.apply_file_changes({path})
+        assert tm.get_entity("hot-reload-probe") is not None
+        assert tm._resolve_placeholder("${task-favor-values:setting-favor-times}") == "45"
+
+    def test_queue_file_reloaded(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        path = join(real_config_dir, "Queues.txt")
+        self._append(path, "\n[queue-probe]\nname: probe\ntasks: task-favor\n")
+        tm.apply_file_changes({path})
+        assert tm.get_queue("queue-probe").tasks == ["task-favor"]
+
+    def test_own_writes_skipped(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        favor = tm.get_entity("task-favor")
+        tm.save_task_values("task-favor", {"setting-favor-times": "50"})
+        tm.save_queue("queue-probe", "probe", ["task-favor"])
+        version = tm.entity_version
+        paths = {join(real_config_dir, "tasks", "Favor.txt"), join(real_config_dir, "Queues.txt")}
+        assert not tm.apply_file_changes(paths)
+        assert tm.entity_version == version
+        assert tm.get_entity("task-favor") is favor
+
+    def test_external_edit_after_own_write_reloaded(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        tm.save_task_values("task-favor", {"setting-favor-times": "50"})
+        path = join(real_config_dir, "tasks", "Favor.txt")
+        self._append(path, "\n[hot-reload-probe]\ntype: func\n")
+        assert tm.apply_file_changes({path})
+        assert tm.get_entity("hot-reload-probe") is not None
+
+    def test_other_process_writes_reloaded_on_sync(self, real_config_dir):
+        """多进程模式：工作进程每次作业前同步 TUI 进程保存的设置与队列。"""
+        worker, tui = TaskManage(real_config_dir), TaskManage(real_config_dir)
+        worker.track_files()
+        text = "${task-favor-values:setting-favor-times}"
+        assert worker._resolve_placeholder(text) == "45"
+        tui.save_task_values("task-favor", {"setting-favor-times": "50"})
+        tui.save_queue("queue-probe", "probe", ["task-favor"])
+        assert worker.reload_changed_files()
+        assert worker._resolve_placeholder(text) == "50"
+        assert worker.get_queue("queue-probe").tasks == ["task-favor"]
+        assert not worker.reload_changed_files()
+
+    def test_changed_png_reread_and_pack_bypassed(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        for future in tm.preload_task("goto-home"):
+            future.result()
+        name = sorted(tm.get_task_images("goto-home"))[0]
+        old = tm.get_img(name)
+        tm.reload_images({name})
+        new = tm.get_img(name)
+        assert new is not old and np.array_equal(new, old)
+        assert tm.get_img_scaled(new, 2) is None
+
+
+class TestSettingsIndex:
+    """${section:option} 扁平索引与解析缓存：保存 / 重载后版本递增，缓存不返回旧值。"""
+
+    def test_values_sections_indexed(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        assert tm._settings_index[("task-favor-values", "setting-favor-times")] == "45"
+
+    def test_memoized_per_task_key(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        text = "${setting-favor-times}"
+        assert tm._resolve_placeholder(text, "task-favor") == "45"
+        assert (text, "task-favor") in tm._placeholder_memo
+        assert tm._resolve_placeholder(text, "other-task") == ""
+
+    def test_save_bumps_version_and_updates(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        text = "${task-favor-values:setting-favor-times}"
+        assert tm._resolve_placeholder(text) == "45"
+        version = tm.settings_version
+        tm.save_task_values("task-favor", {"setting-favor-times": "60"})
+        assert tm.settings_version > version
+        assert tm._resolve_placeholder(text) == "60"
+
+    def test_missing_option_uses_default(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        assert tm._resolve_placeholder("${nope-values:x:7}") == "7"
+        assert tm._settings_index[("nope-values", "x")] is None
+
+    def test_reload_rebuilds_index(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        text = "${task-favor-values:setting-favor-times}"
+        tm._resolve_placeholder(text)
+        path = join(real_config_dir, "tasks", "Favor.txt")
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content.replace("setting-favor-times:45", "setting-favor-times:30"))
+        tm.apply_file_changes({path})
+        assert tm._resolve_placeholder(text) == "30"
+
+
+class TestNavGraph:
+    """真实配置中标注了 scene_from / scene_to 的实体构成的导航图。"""
+
+    def test_jjc_route(self, real_config_dir):
+        from jczx.navGraph import NavGraph
+        tm = TaskManage(real_config_dir)
+        graph = NavGraph.from_entities(tm.entity_pool.items())
+        assert [e.key for e in graph.plan(None, "jjc")] == ["goto-home", "click-fight", "click-simulate", "click-jjc"]
+        assert [e.key for e in graph.plan("fight", "jjc")] == ["click-simulate", "click-jjc"]
+
+    def test_goto_entities_use_planner(self, real_config_dir):
+        tm = TaskManage(real_config_dir)
+        for key, scene in (("goto-jjc", "jjc"), ("goto-inllusion-1", "illusion-gelike")):
+            entity = tm.get_entity(key)
+            assert (entity.func, entity.args) == ("goto_scene", [scene])